@@ -1,11 +1,13 @@
-from flask import Flask, request, jsonify, render_template, send_from_directory, Response
+from flask import Flask, request, jsonify, render_template, send_from_directory, send_file, Response
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from datetime import datetime
 import hashlib
 import shutil  # for moving generated videos
+import uuid
 import os
 import tempfile
+from concurrent.futures import TimeoutError as FutureTimeoutError
 import logging
 import io
 import time
@@ -78,6 +80,57 @@ CONFIDENCE_THRESHOLD = 0.8
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), 'outputs')
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Retention for outputs/: one-off reverse_* results expire quickly, reusable seg_* / comp_* renders live longer.
+# The sweep runs on a daemon thread started in __main__.
+from utils.output_janitor import OutputJanitor, RetentionRule
+output_janitor = OutputJanitor(
+    OUTPUT_DIR,
+    rules=[
+        RetentionRule('reverse_', ttl=float(os.getenv('OUTPUT_REVERSE_TTL', '3600')),
+                      max_bytes=int(os.getenv('OUTPUT_REVERSE_MAX_BYTES', str(1024 ** 3)))),
+        RetentionRule('hls_', ttl=float(os.getenv('OUTPUT_REVERSE_TTL', '3600')),
+                      max_bytes=int(os.getenv('OUTPUT_REVERSE_MAX_BYTES', str(1024 ** 3)))),
+        RetentionRule('seg_', ttl=float(os.getenv('OUTPUT_SEGMENT_TTL', str(7 * 86400))),
+                      max_bytes=int(os.getenv('OUTPUT_SEGMENT_MAX_BYTES', str(2 * 1024 ** 3)))),
+        RetentionRule('comp_', ttl=float(os.getenv('OUTPUT_SEGMENT_TTL', str(7 * 86400))),
+                      max_bytes=int(os.getenv('OUTPUT_SEGMENT_MAX_BYTES', str(2 * 1024 ** 3)))),
+    ],
+    interval=float(os.getenv('OUTPUT_SWEEP_INTERVAL', '300')),
+    min_age=float(os.getenv('OUTPUT_MIN_AGE', '120')),
+)
+
+# Composed gloss videos are content-addressed: (tokens, source, clip versions, codec, speed) -> comp_<sha1>.mp4
+from utils.composition_cache import CompositionCache, normalize_gloss_tokens
+composition_cache = CompositionCache(OUTPUT_DIR, max_entries=int(os.getenv('COMPOSITION_CACHE_ENTRIES', '1024')))
+COMPOSE_SOURCE = 'aslbrick'
+COMPOSE_CODEC = 'h264'
+
+# ffmpeg stream-copy concat; clips that do not match the common layout are re-encoded once into PREPARED_CLIP_DIR
+from utils.clip_concat import ClipConcatenator
+PREPARED_CLIP_DIR = os.getenv('PREPARED_CLIP_DIR', os.path.join(tempfile.gettempdir(), 'asl_prepared_clips'))
+clip_concatenator = ClipConcatenator(
+    PREPARED_CLIP_DIR,
+    timeout=float(os.getenv('FFMPEG_TIMEOUT', '120')),
+)
+# Prepared clips are only a cache: least recently used ones go past the TTL or the size cap
+prepared_clip_janitor = OutputJanitor(
+    PREPARED_CLIP_DIR,
+    rules=[RetentionRule('', ttl=float(os.getenv('PREPARED_CLIP_TTL', str(7 * 86400))),
+                         max_bytes=int(os.getenv('PREPARED_CLIP_MAX_BYTES', str(2 * 1024 ** 3))))],
+    interval=float(os.getenv('OUTPUT_SWEEP_INTERVAL', '300')),
+    min_age=float(os.getenv('OUTPUT_MIN_AGE', '120')),
+)
+
+# Progressive HLS composition: the playlist URL is returned at once and grows one gloss at a time
+from utils.stream_compose import StreamingComposer
+stream_composer = StreamingComposer(OUTPUT_DIR, probe=clip_concatenator.probe,
+                                    max_workers=int(os.getenv('STREAM_COMPOSE_WORKERS', '4')))
+# Longest wait for one token's clip (download + ingest); a slower token is reported missing
+CLIP_FETCH_TIMEOUT = float(os.getenv('CLIP_FETCH_TIMEOUT', '60'))
+# Playlist mode: raw per-gloss clips served from /gloss-clip/<clip_id>?v=<version>
+from utils.gloss_playlist import CLIP_MAX_AGE, build_playlist as build_clip_playlist, find_clip as find_gloss_clip
+CLASSROOM_STREAMING = os.getenv('CLASSROOM_STREAMING', '1') != '0'
+
 # Simple in-memory cache mapping text->deterministic output file for reverse translation segments
 _REVERSE_SEGMENT_CACHE: dict[str, str] = {}
 
@@ -152,6 +205,44 @@ def _map_tokens_to_available(tokens: list[str], available: list[str]):
 
 mp_hands = mp.solutions.hands
 
+from contextlib import ExitStack, contextmanager
+from utils.hands_pool import HandsPool
+from utils.hands_sessions import HandsSessionRegistry, SessionLimitError, clean_session_id
+
+# Pooled MediaPipe graphs: one pool for the 2-hand gesture path, one for the 1-hand letter path
+HANDS_POOL_SIZE = int(os.getenv('HANDS_POOL_SIZE', '2'))
+HANDS_POOL_TIMEOUT = float(os.getenv('HANDS_POOL_TIMEOUT', '10'))
+gesture_hands_pool = HandsPool(size=HANDS_POOL_SIZE, max_num_hands=2, name='gesture')
+letter_hands_pool = HandsPool(size=HANDS_POOL_SIZE, max_num_hands=1, name='letter')
+
+# Per-client video-mode trackers for callers that send a stable session_id
+hands_sessions = HandsSessionRegistry(
+    idle_ttl=float(os.getenv('HANDS_SESSION_IDLE_TTL', '60')),
+    max_sessions=int(os.getenv('HANDS_SESSION_MAX', '64')),
+    # New trackers one client (address or socket) may open per window
+    max_creations=int(os.getenv('HANDS_SESSION_CREATE_LIMIT', '8')),
+    creation_window=float(os.getenv('HANDS_SESSION_CREATE_WINDOW', '60'))
+)
+
+
+@contextmanager
+def _acquire_hands(pool: HandsPool, session_id: str | None = None, client: str | None = None):
+    """Yield a Hands graph: the client's tracker if session_id is set, else a pooled one.
+
+    A client over its tracker creation budget gets a pooled graph instead.
+    """
+    with ExitStack() as stack:
+        hands = None
+        if session_id:
+            try:
+                hands = stack.enter_context(hands_sessions.acquire(session_id, max_num_hands=pool.max_num_hands,
+                                                                   client=client))
+            except SessionLimitError as e:
+                logger.warning(f"⚠️ {e}; using a pooled graph")
+        if hands is None:
+            hands = stack.enter_context(pool.acquire(timeout=HANDS_POOL_TIMEOUT))
+        yield hands
+
 # Model Loading
 MODEL_FILE = "./pretrained/gesture_model.pkl"
 try:
@@ -170,122 +261,88 @@ except Exception as e:
     print(f"❌ Failed to load Letter PKL model: {e}")
     letter_model = None
 
+# Single-pass predict_proba wrappers (label from classes_, top-k alternatives)
+from utils.predictor import ClassifierAdapter
+from utils.microbatch import MicroBatcher
+PREDICTION_TOP_K = int(os.getenv('PREDICTION_TOP_K', '3'))
+# Concurrent frames are micro-batched into one predict_proba call; MICROBATCH_MAX_SIZE=1 disables it
+MICROBATCH_MAX_SIZE = int(os.getenv('MICROBATCH_MAX_SIZE', '8'))
+MICROBATCH_MAX_WAIT_MS = float(os.getenv('MICROBATCH_MAX_WAIT_MS', '2'))
 
 
-# Add these utility functions after the model loading:
+def _make_predictor(estimator, name: str):
+    if estimator is None:
+        return None
+    adapter = ClassifierAdapter(estimator, top_k=PREDICTION_TOP_K)
+    if MICROBATCH_MAX_SIZE <= 1:
+        return adapter
+    return MicroBatcher(adapter, max_batch=MICROBATCH_MAX_SIZE, max_wait_ms=MICROBATCH_MAX_WAIT_MS, name=name)
 
-def normalize_landmarks(landmarks):
-    """
-    Normalize landmarks like during training:
-    - Translate so wrist is at origin.
-    - Scale by wrist → middle finger MCP distance.
-    """
-    wrist = landmarks[0]
-    translated = [(lm.x - wrist.x, lm.y - wrist.y, lm.z - wrist.z) for lm in landmarks]
 
-    scale = math.sqrt(translated[9][0]**2 + translated[9][1]**2 + translated[9][2]**2)
-    if scale < 1e-6:
-        scale = 1.0
+gesture_predictor = _make_predictor(model, 'gesture')
+letter_predictor = _make_predictor(letter_model, 'letter')
 
-    normalized = [(x/scale, y/scale, z/scale) for (x, y, z) in translated]
-    return [coord for triple in normalized for coord in triple]
+# Server-side temporal smoothing for clients that send a session_id: EMA + majority vote with
+# hysteresis, plus a one-shot 'confirmed' label once a sign has been stable for K frames
+from utils.smoothing import SmoothingRegistry
+temporal_smoothing = SmoothingRegistry(
+    idle_ttl=float(os.getenv('HANDS_SESSION_IDLE_TTL', '60')),
+    window=int(os.getenv('SMOOTHING_WINDOW', '8')),
+    alpha=float(os.getenv('SMOOTHING_ALPHA', '0.5')),
+    confirm_frames=int(os.getenv('SMOOTHING_CONFIRM_FRAMES', '3')),
+    enter_threshold=float(os.getenv('SMOOTHING_ENTER_THRESHOLD', '0.6')),
+    exit_threshold=float(os.getenv('SMOOTHING_EXIT_THRESHOLD', '0.4'))
+)
 
-def empty_hand():
-    return [0.0] * (21 * 3)
 
+def _smooth_result(result: dict, session_id: str | None, mode: str) -> dict:
+    """Attach the session's smoothed label ('smoothed': {label, confidence, stable_frames, confirmed}).
 
-# Replace the entire run_inference_on_frame function:
-
-def run_inference_on_frame(frame_bgr: np.ndarray):
-    """Run model inference on a single BGR frame and return best detection with hand landmarks drawn.
-
-    Returns dict: {detected_sign, confidence, detections: [...], annotated_frame} or None if no detection.
+    Also removes the full 'probabilities' row, which is only used for smoothing and is not returned to clients.
     """
-    global model
-    if model is None:
-        raise RuntimeError("Model not loaded")
-
-    # Create a new MediaPipe hands instance for each request to avoid timestamp conflicts
-    hands = mp_hands.Hands(max_num_hands=2,
-                          min_detection_confidence=0.7,
-                          min_tracking_confidence=0.7)
+    probabilities = result.pop('probabilities', None)
+    if session_id:
+        predictor = letter_predictor if mode == 'letter' else gesture_predictor
+        classes = predictor.classes if predictor is not None else None
+        result['smoothed'] = temporal_smoothing.update(session_id, mode, result['detections'], probabilities, classes)
+    return result
 
-    try:
-        # Convert BGR to RGB for MediaPipe
-        rgb_frame = cv.cvtColor(frame_bgr, cv.COLOR_BGR2RGB)
-        results = hands.process(rgb_frame)
 
-        # Create a copy of the frame for annotation
-        annotated_frame = frame_bgr.copy()
+from utils.hand_inference import infer_gesture_frame, infer_letter_frame
+from utils.landmarks import parse_landmarks, parse_landmark_bytes, classify_landmarks
+from utils.process_inference import get_process_pool
 
-        left_hand, right_hand = None, None
+# Optional multi-process inference (each worker loads both models + its own MediaPipe graphs).
+# 0 keeps inference in-process; a session_id pins the session's tracker to one worker.
+INFERENCE_PROCESSES = int(os.getenv('INFERENCE_PROCESSES', '0'))
 
-        if results.multi_hand_landmarks and results.multi_handedness:
-            for hand_landmarks, handedness in zip(results.multi_hand_landmarks,
-                                                  results.multi_handedness):
-                label = handedness.classification[0].label  # "Left" or "Right"
-                score = handedness.classification[0].score
 
-                if score < 0.7:
-                    continue  # skip low-confidence
+def _process_pool():
+    return get_process_pool(INFERENCE_PROCESSES, MODEL_FILE, LETTER_MODEL_FILE, top_k=PREDICTION_TOP_K)
 
-                # Draw hand landmarks on the annotated frame - THIS WAS MISSING!
-                mp_drawing.draw_landmarks(
-                    annotated_frame, 
-                    hand_landmarks, 
-                    mp_hands.HAND_CONNECTIONS,
-                    mp_drawing.DrawingSpec(color=(0, 0, 255), thickness=2, circle_radius=2),
-                    mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2)
-                )
 
-                norm = normalize_landmarks(hand_landmarks.landmark)
 
-                if label == "Left":
-                    left_hand = norm
-                else:
-                    right_hand = norm
+# Replace the entire run_inference_on_frame function:
 
-        if left_hand is None:
-            left_hand = empty_hand()
-        if right_hand is None:
-            right_hand = empty_hand()
+def run_inference_on_frame(frame_bgr: np.ndarray, session_id: str | None = None, client: str | None = None):
+    """Run model inference on a single BGR frame and return best detection with hand landmarks drawn.
 
-        features = np.array([left_hand + right_hand])
+    Returns dict: {detected_sign, confidence, detections: [...], annotated_frame} or None if no detection.
+    """
+    global model
+    if model is None:
+        raise RuntimeError("Model not loaded")
 
-        # Only predict if at least one hand is visible
-        if any(v != 0.0 for v in features[0]):
-            pred = model.predict(features)[0]
+    # With the process-pool backend every frame goes to a worker; the session's tracker lives there
+    if INFERENCE_PROCESSES > 0:
+        result = _process_pool().infer('gesture', frame_bgr, session_id=session_id)
+    else:
+        # Borrow a pre-warmed static-image graph from the pool, or the caller's tracker when a session_id is given
+        with _acquire_hands(gesture_hands_pool, session_id, client) as hands:
+            result = infer_gesture_frame(frame_bgr, hands, gesture_predictor)
+    return _smooth_result(result, session_id, 'gesture')
 
-            if hasattr(model, "predict_proba"):
-                proba = model.predict_proba(features).max()
-                confidence = float(proba)
-                text = f"Gesture: {pred} ({confidence:.2f})"
-            else:
-                confidence = 1.0
-                text = f"Gesture: {pred}"
-
-            # Add text overlay on the annotated frame
-            cv.putText(annotated_frame, text, (10, 40),
-                      cv.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-
-            return {
-                "detected_sign": pred,
-                "confidence": confidence,
-                "detections": [{"class": pred, "confidence": confidence}],
-                "annotated_frame": annotated_frame
-            }
-        else:
-            return {
-                "detected_sign": None,
-                "confidence": 0.0,
-                "detections": [],
-                "annotated_frame": annotated_frame
-            }
-    finally:
-        # Clean up the MediaPipe instance
-        hands.close()
 
-        
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -360,8 +417,11 @@ def infer_frame():
         if frame is None:
             return jsonify({'error': 'Could not decode image'}), 415
 
+        # Optional per-client session id keeps a MediaPipe tracker alive across frames
+        session_id = clean_session_id(request.form.get('session_id'))
+
         t1 = time.time()
-        result = run_inference_on_frame(frame)
+        result = run_inference_on_frame(frame, session_id=session_id, client=request.remote_addr)
         t2 = time.time()
 
         # Check if client wants annotated frame
@@ -377,6 +437,8 @@ def infer_frame():
                 'total': t2 - t0
             }
         }
+        if 'smoothed' in result:
+            response_data['smoothed'] = result['smoothed']
 
         if return_annotated and 'annotated_frame' in result:
             # Encode annotated frame as base64 JPEG
@@ -416,7 +478,24 @@ def model_status():
         'letter_classes': letter_classes,
         'gesture_actions_count': len(gesture_classes),
         'letter_actions_count': len(letter_classes),
-        'demo_mode': model is None and letter_model is None
+        'demo_mode': model is None and letter_model is None,
+        'hands_pools': {
+            'gesture': gesture_hands_pool.stats(),
+            'letter': letter_hands_pool.stats()
+        },
+        'hands_sessions': hands_sessions.stats(),
+        'temporal_smoothing': temporal_smoothing.stats(),
+        'output_retention': output_janitor.stats(),
+        'prepared_clip_retention': prepared_clip_janitor.stats(),
+        'composition_cache': composition_cache.stats(),
+        'clip_concat': clip_concatenator.stats(),
+        'streaming_composition': stream_composer.stats(),
+        'llm_cache': _llm_cache_stats(),
+        'inference_processes': _process_pool().stats() if INFERENCE_PROCESSES > 0 else None,
+        'microbatch': {
+            name: p.stats() for name, p in (('gesture', gesture_predictor), ('letter', letter_predictor))
+            if isinstance(p, MicroBatcher)
+        }
     })
 # Replace the health_check function:
 
@@ -490,7 +569,8 @@ def test_llm():
 
 
 
-def run_letter_inference_on_frame(frame_bgr: np.ndarray):
+def run_letter_inference_on_frame(frame_bgr: np.ndarray, session_id: str | None = None,
+                                  client: str | None = None):
     """Run letter model inference on a single BGR frame and return detected letter.
 
     Returns dict: {detected_letter, confidence, detections: [...], annotated_frame} or None if no detection.
@@ -501,70 +581,16 @@ def run_letter_inference_on_frame(frame_bgr: np.ndarray):
         print("❌ Letter model is None!")  # Debug print
         raise RuntimeError("Letter model not loaded")
 
-    # Create a new MediaPipe hands instance for each request
-    hands = mp_hands.Hands(max_num_hands=1,  # Letters typically use one hand
-                          min_detection_confidence=0.7,
-                          min_tracking_confidence=0.7)
-
-    try:
-        # Convert BGR to RGB for MediaPipe
-        rgb_frame = cv.cvtColor(frame_bgr, cv.COLOR_BGR2RGB)
-        results = hands.process(rgb_frame)
+    if INFERENCE_PROCESSES > 0:
+        result = _process_pool().infer('letter', frame_bgr, session_id=session_id)
+    else:
+        # Letters typically use one hand, so borrow from the 1-hand pool (or the session tracker)
+        with _acquire_hands(letter_hands_pool, session_id, client) as hands:
+            result = infer_letter_frame(frame_bgr, hands, letter_predictor)
+    _smooth_result(result, session_id, 'letter')
 
-        # Create a copy of the frame for annotation
-        annotated_frame = frame_bgr.copy()
-
-        if results.multi_hand_landmarks and results.multi_handedness:
-            hand_landmarks = results.multi_hand_landmarks[0]  # Use first hand
-            handedness = results.multi_handedness[0]
-            
-            if handedness.classification[0].score >= 0.7:
-                # Draw hand landmarks
-                mp_drawing.draw_landmarks(
-                    annotated_frame, 
-                    hand_landmarks, 
-                    mp_hands.HAND_CONNECTIONS,
-                    mp_drawing.DrawingSpec(color=(255, 0, 0), thickness=2, circle_radius=2),
-                    mp_drawing.DrawingSpec(color=(0, 255, 255), thickness=2)
-                )
-
-                # Normalize landmarks for letter model
-                norm = normalize_landmarks(hand_landmarks.landmark)
-                features = np.array([norm])
-
-                # Predict letter
-                pred = letter_model.predict(features)[0]
-                print(f"🔤 Predicted letter: {pred}")  # Debug print
-
-                if hasattr(letter_model, "predict_proba"):
-                    proba = letter_model.predict_proba(features).max()
-                    confidence = float(proba)
-                    text = f"Letter: {pred} ({confidence:.2f})"
-                    print(f"🔤 Confidence: {confidence:.2f}")  # Debug print
-                else:
-                    confidence = 1.0
-                    text = f"Letter: {pred}"
-                    print(f"🔤 No probability available, using confidence: 1.0")  # Debug print
-
-                # Add text overlay
-                cv.putText(annotated_frame, text, (10, 40),
-                          cv.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 0), 2)
-
-                return {
-                    "detected_letter": pred,
-                    "confidence": confidence,
-                    "detections": [{"class": pred, "confidence": confidence}],
-                    "annotated_frame": annotated_frame
-                }
-
-        return {
-            "detected_letter": None,
-            "confidence": 0.0,
-            "detections": [],
-            "annotated_frame": annotated_frame
-        }
-    finally:
-        hands.close()
+    print(f"🔤 Predicted letter: {result['detected_letter']} ({result['confidence']:.2f})")  # Debug print
+    return result
 
 @app.route('/test-letter-model', methods=['GET'])
 def test_letter_model():
@@ -618,8 +644,10 @@ def infer_letter():
         if frame is None:
             return jsonify({'error': 'Could not decode image'}), 415
 
+        session_id = clean_session_id(request.form.get('session_id'))
+
         t1 = time.time()
-        result = run_letter_inference_on_frame(frame)
+        result = run_letter_inference_on_frame(frame, session_id=session_id, client=request.remote_addr)
         t2 = time.time()
 
         # Check if client wants annotated frame
@@ -635,6 +663,8 @@ def infer_letter():
                 'total': t2 - t0
             }
         }
+        if 'smoothed' in result:
+            response_data['smoothed'] = result['smoothed']
 
         if return_annotated and 'annotated_frame' in result:
             # Encode annotated frame as base64 JPEG
@@ -648,6 +678,64 @@ def infer_letter():
         logger.error("/infer-letter error: %s\n%s", str(e), traceback.format_exc())
         return jsonify({'error': str(e)}), 500
 
+def _landmark_request_args(payload, mode: str, hand: str):
+    """Parse landmarks for /infer-landmarks from JSON values or packed float32 bytes."""
+    if mode not in ('gesture', 'letter'):
+        raise ValueError("mode must be 'gesture' or 'letter'")
+    num_hands = 1 if mode == 'letter' else 2
+    if isinstance(payload, (bytes, bytearray)):
+        return parse_landmark_bytes(bytes(payload), num_hands=num_hands, hand=hand)
+    return parse_landmarks(payload, num_hands=num_hands, hand=hand)
+
+
+def run_landmark_inference(payload, mode: str = 'gesture', hand: str = 'right',
+                           session_id: str | None = None) -> dict:
+    """Classify client-side MediaPipe landmarks: normalization + classifier only, no image decoding."""
+    predictor = letter_predictor if mode == 'letter' else gesture_predictor
+    points = _landmark_request_args(payload, mode, hand)
+    if predictor is None:
+        raise RuntimeError(f"{mode.capitalize()} model not loaded")
+    return _smooth_result(classify_landmarks(points, mode, predictor), session_id, mode)
+
+
+@app.route('/infer-landmarks', methods=['POST'])
+def infer_landmarks():
+    """Classify raw hand landmarks sent as JSON or as packed little-endian float32 bytes.
+
+    JSON: {"mode": "gesture"|"letter", "landmarks": 21x3 or 2x21x3, "hand": "left"|"right"}.
+    Binary (application/octet-stream): 63 or 126 float32 values; mode/hand go in the query string.
+    """
+    t0 = time.time()
+    try:
+        if request.mimetype == 'application/octet-stream':
+            payload = request.get_data()
+            mode = request.args.get('mode', 'gesture')
+            hand = request.args.get('hand', 'right')
+            session_id = request.args.get('session_id')
+        else:
+            body = request.get_json(silent=True) or {}
+            if 'landmarks' not in body:
+                return jsonify({'error': 'No landmarks provided (expect JSON field "landmarks")'}), 400
+            payload = body['landmarks']
+            mode = body.get('mode', request.args.get('mode', 'gesture'))
+            hand = body.get('hand', 'right')
+            session_id = body.get('session_id', request.args.get('session_id'))
+
+        try:
+            result = run_landmark_inference(payload, mode=mode, hand=hand,
+                                            session_id=clean_session_id(session_id))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        except RuntimeError as e:
+            return jsonify({'error': str(e), 'model_loaded': False}), 503
+
+        elapsed = time.time() - t0
+        result['timing'] = {'inference': elapsed, 'total': elapsed}
+        return jsonify(result)
+    except Exception as e:
+        logger.error("/infer-landmarks error: %s\n%s", str(e), traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
 @app.errorhandler(413)
 def too_large(e):
     return jsonify({'error': 'Payload too large'}), 413
@@ -722,6 +810,12 @@ def serve_output_file(filename: str):
     range_header = request.headers.get('Range', None)
     if not range_header:
         resp = send_from_directory(OUTPUT_DIR, filename, as_attachment=False)
+        if filename.endswith('.m3u8'):
+            # Streaming playlists grow until #EXT-X-ENDLIST; players must re-fetch them
+            resp.headers['Cache-Control'] = 'no-cache'
+        # The body streams after we return; keep the janitor away until it is closed
+        output_janitor.acquire(filename)
+        resp.call_on_close(lambda: output_janitor.release(filename))
         # Advertise support for ranges to help the <video> element
         try:
             resp.headers.add('Accept-Ranges', 'bytes')
@@ -743,7 +837,7 @@ def serve_output_file(filename: str):
         end = min(end, file_size - 1)
         length = (end - start) + 1
 
-        with open(full_path, 'rb') as f:
+        with output_janitor.lease(filename), open(full_path, 'rb') as f:
             f.seek(start)
             data = f.read(length)
 
@@ -754,7 +848,28 @@ def serve_output_file(filename: str):
         return resp
     except Exception as e:
         logger.warning('Range request failed, falling back to full file: %s', e)
-        return send_from_directory(OUTPUT_DIR, filename, as_attachment=False)
+        resp = send_from_directory(OUTPUT_DIR, filename, as_attachment=False)
+        output_janitor.acquire(filename)
+        resp.call_on_close(lambda: output_janitor.release(filename))
+        return resp
+
+
+def _preload_wlasl_fetcher():
+    """Parse the WLASL mapper at startup so the first request does not pay for it."""
+    try:
+        from dynamic_video_fetcher import get_fetcher
+        fetcher = get_fetcher()
+        logger.info(f"✅ WLASL mapper preloaded: {len(fetcher.gloss_index)} glosses in {fetcher.load_seconds * 1000:.0f} ms")
+    except Exception as e:
+        logger.warning(f"⚠️ WLASL mapper preload failed: {e}")
+
+def _llm_cache_stats() -> dict | None:
+    """Translation cache metrics, or None when the LLM module is not available."""
+    try:
+        from revtrans import translation_cache
+        return translation_cache.stats()
+    except Exception:
+        return None
 
 
 def _list_available_video_tokens() -> list[str]:
@@ -766,12 +881,12 @@ def _list_available_video_tokens() -> list[str]:
     
     # Try to get WLASL glosses
     try:
-        from dynamic_video_fetcher import WLASLVideoFetcher
-        fetcher = WLASLVideoFetcher()
-        # Get all glosses from the index
-        wlasl_glosses = list(fetcher.gloss_index.keys())
+        from dynamic_video_fetcher import get_fetcher
+        fetcher = get_fetcher()
+        # Only glosses that actually have an aslbrick clip (the source compose_video_from_gloss uses)
+        wlasl_glosses = fetcher.glosses_for_source("aslbrick")
         tokens.update(wlasl_glosses)
-        logger.info(f"✅ Loaded {len(wlasl_glosses)} glosses from WLASL mapper")
+        logger.debug(f"Loaded {len(wlasl_glosses)} aslbrick glosses from WLASL mapper")
     except Exception as e:
         logger.warning(f"⚠️ Could not load WLASL glosses: {e}")
     
@@ -781,7 +896,7 @@ def _list_available_video_tokens() -> list[str]:
         for name in os.listdir(base_vid_dir):
             if name.lower().endswith('.mp4'):
                 tokens.add(os.path.splitext(name)[0].lower())
-        logger.info(f"✅ Added {len([n for n in os.listdir(base_vid_dir) if n.endswith('.mp4')])} local videos")
+        logger.debug(f"Added {len([n for n in os.listdir(base_vid_dir) if n.endswith('.mp4')])} local videos")
     
     return sorted(tokens)
 
@@ -878,11 +993,150 @@ def compose_video_from_gloss(gloss_tokens):
     
     Uses the dynamic_video_fetcher to fetch videos on-demand from WLASL dataset.
     Returns (filename, meta) where filename is the saved file name under OUTPUT_DIR.
+    Outputs are content-addressed (see utils/composition_cache.py): a token sequence
+    that was already composed from the same clips returns the existing file.
     """
+    tokens = normalize_gloss_tokens(gloss_tokens)
+    key = composition_cache.request_key(tokens, COMPOSE_SOURCE, COMPOSE_CODEC)
+    hit = composition_cache.lookup(key)
+    if hit:
+        logger.info(f"♻️ Reusing composed video {hit[0]} for tokens: {tokens}")
+        return hit
+
+    with composition_cache.single_flight(key):
+        # Another request may have composed the same sequence while we waited
+        hit = composition_cache.lookup(key)
+        if hit:
+            return hit
+
+        files, missing = _resolve_gloss_clips(tokens)
+        out_name = composition_cache.content_name(key, files)
+        hit = composition_cache.load(key, out_name, files)
+        if hit:
+            logger.info(f"♻️ Reusing composed video {out_name} from disk")
+            return hit[0], {**hit[1], 'missing': missing}
+
+        # Encode under a temporary name so a half-written file is never served
+        tmp_name = f"{out_name[:-len('.mp4')]}.{uuid.uuid4().hex[:8]}.tmp.mp4"
+        tmp_path = os.path.join(OUTPUT_DIR, tmp_name)
+        try:
+            meta = _concat_or_encode(files, tmp_path)
+            os.replace(tmp_path, os.path.join(OUTPUT_DIR, out_name))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        meta['missing'] = missing
+        composition_cache.store(key, out_name, files, meta)
+        return out_name, meta
+
+
+def _prefetch_gloss_clips(tokens, canonical: bool = True):
+    """Start fetching every token's clip (and, with ``canonical``, ingesting it).
+
+    Returns ``clip_for(token) -> path or None``.
+
+    ``clip_for`` waits up to CLIP_FETCH_TIMEOUT for that token's WLASL clip, falling back
+    to videos/<token>.mp4.
+    """
+    try:
+        from dynamic_video_fetcher import get_fetcher
+        fetcher = get_fetcher()
+    except Exception as e:
+        logger.warning(f"⚠️ WLASL fetcher unavailable: {e}")
+        fetcher = None
+    futures = fetcher.prefetch(tokens, source=COMPOSE_SOURCE, max_per_gloss=1, canonical=canonical) if fetcher else {}
+
+    def clip_for(name):
+        for future in futures.get(name, []):
+            try:
+                path = future.result(timeout=CLIP_FETCH_TIMEOUT)
+            except FutureTimeoutError:
+                logger.warning(f"⚠️ Clip for '{name}' not ready after {CLIP_FETCH_TIMEOUT:.0f}s, skipping it")
+                continue
+            except Exception as e:
+                logger.warning(f"⚠️ Clip for '{name}' failed: {e}")
+                continue
+            if path:
+                return path
+        cand = os.path.join(os.path.join(os.path.dirname(__file__), 'videos'), f"{name}.mp4")
+        return cand if os.path.exists(cand) else None
+
+    return clip_for
+
+
+def _clip_duration(path: str) -> float:
+    """Seconds of video in ``path``: ffprobe when available, else OpenCV."""
+    if clip_concatenator.available():
+        try:
+            info = clip_concatenator.probe(path)
+            if info.fps:
+                return info.frames / info.fps
+        except Exception as e:
+            logger.debug(f"ffprobe failed for {path}: {e}")
+    cap = cv.VideoCapture(path)
+    try:
+        fps = cap.get(cv.CAP_PROP_FPS) or 25.0
+        return (cap.get(cv.CAP_PROP_FRAME_COUNT) or 0) / fps
+    finally:
+        cap.release()
+
+
+def build_gloss_playlist(gloss_tokens):
+    """Ordered per-gloss clip URLs with durations, for clients that play clips back to back.
+
+    Nothing is composed or transcoded: the server only fetches the raw clips,
+    which are then served from /gloss-clip/<clip_id>?v=<version>. Returns
+    {'clips': [{token, url, duration}], 'missing': [...], 'duration_seconds': float}.
+    """
+    tokens = normalize_gloss_tokens(gloss_tokens)
+    return build_clip_playlist(tokens, _prefetch_gloss_clips(tokens, canonical=False), _clip_duration)
+
+
+def _find_gloss_clip(clip_id: str, version: str | None = None):
+    """(path, exact) for a /gloss-clip request; see utils.gloss_playlist.find_clip.
+
+    Candidates are the cached raw WLASL clip, its canonical copy, then videos/<clip_id>.mp4.
+    """
+    clip_id = os.path.basename(clip_id)
+    candidates = []
+    try:
+        from dynamic_video_fetcher import get_fetcher
+        fetcher = get_fetcher()
+        candidates += [fetcher.cached_clip_path(clip_id, canonical=False), fetcher.cached_clip_path(clip_id)]
+    except Exception as e:
+        logger.debug(f"WLASL clip lookup failed for {clip_id}: {e}")
+    candidates.append(os.path.join(os.path.join(os.path.dirname(__file__), 'videos'), f"{clip_id}.mp4"))
+    return find_gloss_clip(candidates, version)
+
+
+def compose_video_streaming(gloss_tokens):
+    """Start a progressive HLS composition and return (playlist_name, meta) without waiting for clips.
+
+    A sequence that is already composed returns the finished mp4 instead, and
+    without ffmpeg this is plain compose_video_from_gloss.
+    """
+    tokens = normalize_gloss_tokens(gloss_tokens)
+    if not tokens:
+        raise FileNotFoundError(f"No valid gloss tokens in {gloss_tokens}")
+    hit = composition_cache.lookup(composition_cache.request_key(tokens, COMPOSE_SOURCE, COMPOSE_CODEC))
+    if hit:
+        return hit
+    if not stream_composer.available():
+        return compose_video_from_gloss(tokens)
+
+    # All downloads / ingest transcodes start now; segments are cut in token order as they finish
+    playlist = stream_composer.start(tokens, _prefetch_gloss_clips(tokens))
+    logger.info(f"📡 Streaming composition started: {playlist}")
+    return playlist, {'streaming': True, 'format': 'hls', 'missing': []}
+
+
+def _resolve_gloss_clips(gloss_tokens):
+    """Return (files, missing): one clip path per available token, WLASL first then videos/."""
     # Try to use WLASL fetcher first
     try:
-        from dynamic_video_fetcher import WLASLVideoFetcher
-        fetcher = WLASLVideoFetcher()
+        from dynamic_video_fetcher import get_fetcher
+        fetcher = get_fetcher()
         logger.info("✅ Using WLASL fetcher to load videos")
     except Exception as e:
         logger.warning(f"⚠️ WLASL fetcher unavailable: {e}, falling back to local videos")
@@ -891,17 +1145,18 @@ def compose_video_from_gloss(gloss_tokens):
     files = []
     missing = []
     
+    # Start all WLASL downloads concurrently; the ordered loop below then just collects them
+    if fetcher:
+        fetcher.prefetch(gloss_tokens, source=COMPOSE_SOURCE, max_per_gloss=1, canonical=True)
+    
     # Fetch videos using WLASL mapper or fallback to local
-    for t in gloss_tokens:
-        name = str(t).strip().lower()
-        if not name:
-            continue
-        
+    for name in gloss_tokens:
         try:
             if fetcher:
                 # Try WLASL fetcher first
                 logger.info(f"📹 Fetching video from WLASL for token: '{name}'")
-                videos = fetcher.get_video_paths_for_gloss(name, source="aslbrick", max_videos=1)
+                videos = fetcher.get_video_paths_for_gloss(name, source=COMPOSE_SOURCE, max_videos=1,
+                                                           canonical=True)
                 if videos:
                     files.extend(videos)
                     logger.info(f"✅ Found {len(videos)} video(s) from WLASL for '{name}'")
@@ -925,7 +1180,21 @@ def compose_video_from_gloss(gloss_tokens):
     if not files:
         available_tokens = _list_available_video_tokens()
         raise FileNotFoundError(f"No matching video clips found for tokens: {gloss_tokens}. Available tokens: {available_tokens[:10]}...")
+    return files, missing
+
+
+def _concat_or_encode(files, out_path):
+    """Join clips with the ffmpeg stream-copy path, falling back to the OpenCV re-encode."""
+    if clip_concatenator.available():
+        try:
+            return clip_concatenator.concat(files, out_path)
+        except Exception as e:
+            logger.warning(f"⚠️ Stream-copy concat failed, re-encoding with OpenCV: {e}")
+    return _encode_clips(files, out_path)
 
+
+def _encode_clips(files, out_path):
+    """Decode ``files`` in order and re-encode them into one H.264 mp4 at ``out_path``; returns meta."""
     # Open first clip to get properties
     first = cv.VideoCapture(files[0])
     if not first.isOpened():
@@ -937,10 +1206,6 @@ def compose_video_from_gloss(gloss_tokens):
     
     logger.info(f"Video properties: {width}x{height}, {fps} FPS")
 
-    # Prepare writer
-    out_name = f"reverse_{datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')}.mp4"
-    out_path = os.path.join(OUTPUT_DIR, out_name)
-    
     # Use H.264 codec which is universally supported by browsers
     fourcc = cv.VideoWriter_fourcc(*'avc1')  # H.264 codec
     writer = cv.VideoWriter(out_path, fourcc, fps, (width, height))
@@ -996,7 +1261,7 @@ def compose_video_from_gloss(gloss_tokens):
         writer.release()
         logger.info(f"Video composition complete: {total_frames} total frames from {processed_files} files")
 
-    meta = { 'fps': fps, 'width': width, 'height': height, 'frames': total_frames, 'missing': missing, 'codec': 'avc1' }
+    meta = { 'fps': fps, 'width': width, 'height': height, 'frames': total_frames, 'codec': 'avc1' }
     if total_frames == 0:
         # Clean up empty file and surface a clear error
         try:
@@ -1005,23 +1270,69 @@ def compose_video_from_gloss(gloss_tokens):
         except Exception:
             pass
         raise RuntimeError("Output video had 0 frames. Check source clips and codecs.")
-    return out_name, meta
+    return meta
+
+
+def _segment_gloss_tokens(text: str, use_llm: bool = True) -> list[str]:
+    """Gloss tokens for one transcript segment: LLM when available (and use_llm=True), else heuristic."""
+    norm_text = ' '.join(text.strip().split()).lower()
+    tokens = None
+    if use_llm:
+        try:
+            from revtrans import sentence_to_gloss_tokens as _sentence_to_gloss_tokens
+            available = _list_available_video_tokens()
+            tokens = _sentence_to_gloss_tokens(norm_text, available_tokens=available)
+        except Exception:
+            tokens = None
+    if not tokens:
+        tokens = _text_to_gloss_tokens(norm_text)
 
+    if not isinstance(tokens, list) or not tokens:
+        raise FileNotFoundError("No valid gloss tokens could be derived from text")
+    return tokens
+
+
+def _segment_file_name(norm_text: str) -> str:
+    # Deterministic filename for caching
+    return f"seg_{hashlib.sha1(norm_text.encode('utf-8')).hexdigest()}.mp4"
+
+
+def _batch_segment_gloss_tokens(texts: list[str]) -> dict[str, list[str]]:
+    """LLM gloss tokens for many segments in batched requests, keyed by normalised text.
+
+    Segments whose video is already rendered are skipped; segments the LLM
+    could not translate are left out and take the per-segment path.
+    """
+    pending = []
+    for text in texts:
+        norm_text = ' '.join(text.strip().split()).lower()
+        if norm_text and not os.path.isfile(os.path.join(OUTPUT_DIR, _segment_file_name(norm_text))):
+            pending.append(norm_text)
+    pending = list(dict.fromkeys(pending))
+    if not pending:
+        return {}
+    try:
+        from revtrans import sentences_to_gloss_tokens as _sentences_to_gloss_tokens
+        token_lists = _sentences_to_gloss_tokens(pending, available_tokens=_list_available_video_tokens())
+    except Exception as e:
+        logger.warning(f"⚠️ Batched gloss translation unavailable: {e}")
+        return {}
+    return {norm_text: tokens for norm_text, tokens in zip(pending, token_lists) if tokens}
 
-def _compose_segment_from_text_cached(text: str, use_llm: bool = True):
+
+def _compose_segment_from_text_cached(text: str, use_llm: bool = True, tokens: list[str] | None = None):
     """Compose a short reverse-translation video for a single text segment, with caching.
 
     Returns tuple: (filename, meta, tokens)
     - Uses a deterministic filename based on SHA1 of normalized text to allow reuse across requests.
     - Attempts LLM tokenization when available (and use_llm=True), else falls back to heuristic tokenization.
+    - ``tokens`` (e.g. from _batch_segment_gloss_tokens) skips tokenization.
     """
     if not isinstance(text, str) or not text.strip():
         raise ValueError("Invalid text segment")
 
     norm_text = ' '.join(text.strip().split()).lower()
-    # Deterministic filename for caching
-    key = hashlib.sha1(norm_text.encode('utf-8')).hexdigest()
-    out_name = f"seg_{key}.mp4"
+    out_name = _segment_file_name(norm_text)
     out_path = os.path.join(OUTPUT_DIR, out_name)
 
     # If already composed and non-empty, reuse
@@ -1029,30 +1340,24 @@ def _compose_segment_from_text_cached(text: str, use_llm: bool = True):
         # best-effort meta reconstruction isn't possible here without parsing; return minimal
         return out_name, { 'cached': True }, []
 
-    # Convert text to gloss tokens
-    tokens = None
-    if use_llm:
-        try:
-            from revtrans import sentence_to_gloss_tokens as _sentence_to_gloss_tokens
-            available = _list_available_video_tokens()
-            tokens = _sentence_to_gloss_tokens(norm_text, available_tokens=available)
-        except Exception:
-            tokens = None
     if not tokens:
-        tokens = _text_to_gloss_tokens(norm_text)
+        tokens = _segment_gloss_tokens(norm_text, use_llm=use_llm)
 
-    if not isinstance(tokens, list) or not tokens:
-        raise FileNotFoundError("No valid gloss tokens could be derived from text")
-
-    # Compose to a temporary file and then move to deterministic cache path
-    tmp_name, meta = compose_video_from_gloss(tokens)
-    tmp_path = os.path.join(OUTPUT_DIR, tmp_name)
+    # Compose (or reuse) the content-addressed file and expose it under the deterministic segment name.
+    # A hard link keeps the composition cache's copy in place without duplicating the bytes.
+    comp_name, meta = compose_video_from_gloss(tokens)
+    comp_path = os.path.join(OUTPUT_DIR, comp_name)
     try:
-        shutil.move(tmp_path, out_path)
+        try:
+            os.link(comp_path, out_path)
+        except FileExistsError:
+            pass
+        except OSError:
+            shutil.copyfile(comp_path, out_path)
     except Exception:
-        # If move fails but file exists, keep temp name as fallback
-        out_name = tmp_name
-        out_path = tmp_path
+        # If linking fails, serve the composed file directly
+        out_name = comp_name
+        out_path = comp_path
 
     return out_name, meta, tokens
 
@@ -1094,9 +1399,17 @@ def reverse_translate_video():
                 'available_tokens_preview': available
             }), 400
 
-        # ✅ Compose video from gloss tokens
+        # "response_mode": "playlist" skips composition and returns the per-gloss clips to play in order
+        if data.get('response_mode') == 'playlist':
+            playlist = build_gloss_playlist(gloss_tokens)
+            return jsonify({'mode': 'playlist', **playlist, 'tokens': gloss_tokens}), 200
+
+        # ✅ Compose video from gloss tokens ("stream": true returns a growing HLS playlist right away)
         logger.info(f"🎥 Composing video from tokens: {gloss_tokens}")
-        fname, meta = compose_video_from_gloss(gloss_tokens)
+        if data.get('stream'):
+            fname, meta = compose_video_streaming(gloss_tokens)
+        else:
+            fname, meta = compose_video_from_gloss(gloss_tokens)
         logger.info(f"✅ Video composed: {fname}, meta: {meta}")
 
         # ✅ Use existing /outputs/<filename> route (no moving needed)
@@ -1140,12 +1453,24 @@ def serve_token_video(token: str):
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/gloss-clip/<clip_id>', methods=['GET'])
+def serve_gloss_clip(clip_id: str):
+    """Serve one cached gloss clip for playlist playback (see build_gloss_playlist)."""
+    path, exact = _find_gloss_clip(clip_id, request.args.get('v'))
+    if not path:
+        return jsonify({'error': 'Clip not found', 'clip_id': clip_id}), 404
+    # Only the exact bytes named by ?v= may be kept, since the clip id alone can change content;
+    # conditional enables Range
+    return send_file(path, mimetype='video/mp4', conditional=True, max_age=CLIP_MAX_AGE if exact else 0)
+
+
 @app.route('/reverse-translate-segment', methods=['POST'])
 def reverse_translate_segment():
     """Compose a cached reverse-translation clip for a single transcript segment.
 
-    Request JSON: { text: string, use_llm?: bool }
+    Request JSON: { text: string, use_llm?: bool, response_mode?: "file" | "playlist" }
     Response 200: { video_url, file, meta, tokens }
+    Playlist mode: { mode: "playlist", clips: [{token, url, duration}], missing, duration_seconds, tokens }
     """
     try:
         data = request.get_json(force=True)
@@ -1155,6 +1480,10 @@ def reverse_translate_segment():
         if not text:
             return jsonify({'error': 'Missing text'}), 400
 
+        if data.get('response_mode') == 'playlist':
+            tokens = _segment_gloss_tokens(text, use_llm=use_llm)
+            return jsonify({'mode': 'playlist', **build_gloss_playlist(tokens), 'tokens': tokens}), 200
+
         fname, meta, tokens = _compose_segment_from_text_cached(text, use_llm=use_llm)
         url = f"/outputs/{fname}"
         return jsonify({
@@ -1178,7 +1507,8 @@ def reverse_translate_transcript():
     Request JSON: { segments: [{ start: number, end: number, text: string }], use_llm?: bool }
     Response 200: { results: [{ start, end, text, video_url, file, tokens, meta }] }
     Notes:
-      - Processes sequentially; uses cached composition when available.
+      - Gloss translation for all uncached segments is batched into a few LLM requests up front.
+      - Composes sequentially; uses cached composition when available.
       - Intended for prefetching; for strict "real-time" sync, call per-segment just-in-time.
     """
     try:
@@ -1188,14 +1518,17 @@ def reverse_translate_transcript():
         if not isinstance(segments, list) or not segments:
             return jsonify({'error': 'Provide non-empty segments list'}), 400
 
+        texts = [(seg.get('text') or '').strip() if isinstance(seg, dict) else '' for seg in segments]
+        pretranslated = _batch_segment_gloss_tokens([t for t in texts if t]) if use_llm else {}
+
         results = []
-        for seg in segments:
-            text = (seg.get('text') or '').strip() if isinstance(seg, dict) else ''
+        for seg, text in zip(segments, texts):
             if not text:
                 results.append({ 'error': 'Empty text', **({k:v for k,v in seg.items()} if isinstance(seg, dict) else {}) })
                 continue
             try:
-                fname, meta, tokens = _compose_segment_from_text_cached(text, use_llm=use_llm)
+                fname, meta, tokens = _compose_segment_from_text_cached(
+                    text, use_llm=use_llm, tokens=pretranslated.get(' '.join(text.split()).lower()))
                 results.append({
                     'start': float(seg.get('start', 0)) if isinstance(seg, dict) else 0,
                     'end': float(seg.get('end', 0)) if isinstance(seg, dict) else 0,
@@ -1313,11 +1646,21 @@ def handle_send_speech(data):
             gloss_tokens = _text_to_gloss_tokens(text)
             logger.info(f"🤖 Fallback tokens: {gloss_tokens}")
         
-        # STEP 3: Compose video from gloss tokens
+        # STEP 3: Compose video from gloss tokens; streamed so students see the first sign early.
+        # "response_mode": "playlist" sends the per-gloss clips instead and composes nothing.
+        playlist = None
         try:
-            fname, meta = compose_video_from_gloss(gloss_tokens)
-            video_url = f"/outputs/{fname}"
-            logger.info(f"🎬 Video composed: {video_url}")
+            if data.get('response_mode') == 'playlist':
+                playlist = build_gloss_playlist(gloss_tokens)
+                video_url, meta = None, {'duration_seconds': playlist['duration_seconds']}
+                logger.info(f"🎬 Playlist of {len(playlist['clips'])} clips ready")
+            else:
+                if data.get('stream', CLASSROOM_STREAMING):
+                    fname, meta = compose_video_streaming(gloss_tokens)
+                else:
+                    fname, meta = compose_video_from_gloss(gloss_tokens)
+                video_url = f"/outputs/{fname}"
+                logger.info(f"🎬 Video composed: {video_url}")
         except Exception as e:
             logger.error(f"❌ Video composition failed: {e}")
             emit('error', {'message': f'Video composition failed: {str(e)}'})
@@ -1334,6 +1677,8 @@ def handle_send_speech(data):
         emit('video_broadcast', {
             'video_url': video_url,
             'duration': meta.get('duration_seconds', meta.get('frames', 0) / meta.get('fps', 25)),
+            'streaming': meta.get('streaming', False),
+            'playlist': playlist['clips'] if playlist else None,
             'tokens': gloss_tokens,
             'text': text
         }, room=room_id)
@@ -1345,11 +1690,33 @@ def handle_send_speech(data):
         emit('error', {'message': str(e)})
 
 
+@socketio.on('infer_landmarks')
+def handle_infer_landmarks(data):
+    """Socket.IO twin of /infer-landmarks: data is a dict like the JSON body, or raw float32 bytes."""
+    try:
+        if isinstance(data, (bytes, bytearray)):
+            data = {'landmarks': data}
+        mode = data.get('mode', 'gesture')
+        # Smoothing state follows the socket unless the client names its own session
+        result = run_landmark_inference(data.get('landmarks'), mode=mode, hand=data.get('hand', 'right'),
+                                        session_id=clean_session_id(data.get('session_id')) or request.sid)
+        result['mode'] = mode
+        if 'seq' in data:
+            result['seq'] = data['seq']
+        emit('landmark_prediction', result)
+    except (ValueError, RuntimeError) as e:
+        emit('error', {'message': str(e)})
+    except Exception as e:
+        logger.error(f"❌ infer_landmarks error: {e}")
+        emit('error', {'message': str(e)})
+
+
 @socketio.on('disconnect')
 def handle_disconnect():
     """Clean up when user disconnects"""
     try:
         logger.info(f"✗ Client disconnected: {request.sid}")
+        temporal_smoothing.close_session(request.sid)
         
         for room_id, session in active_classrooms.items():
             # If teacher left
@@ -1384,6 +1751,12 @@ if __name__ == '__main__':
     else:
         print("⚠️ PKL Model failed to load. Endpoints will return 503 for inference.")
 
+    # Load the WLASL mapper in the background; the load time is logged when it finishes
+    import threading
+    threading.Thread(target=_preload_wlasl_fetcher, name="wlasl-preload", daemon=True).start()
+    output_janitor.start()
+    prepared_clip_janitor.start()
+
     print("🌐 Starting Flask + SocketIO server...")
     print("📌 Classroom Features:")
     print("   - Teacher: http://localhost:5000/teacher")
@@ -8,12 +8,14 @@ from fastapi.responses import JSONResponse, FileResponse, StreamingResponse, HTM
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.templating import Jinja2Templates
+from starlette.background import BackgroundTask
 from datetime import datetime
 from typing import Optional, List, Dict
 import hashlib
 import shutil
 import os
 import tempfile
+from concurrent.futures import TimeoutError as FutureTimeoutError
 import logging
 import io
 import time
@@ -23,6 +25,7 @@ import secrets
 import base64
 import sys
 import subprocess
+import asyncio
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
@@ -98,6 +101,58 @@ OUTPUT_DIR = os.path.join(tempfile.gettempdir(), 'signlink_outputs')
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 logger.info(f"📁 Using temporary output directory: {OUTPUT_DIR}")
 
+# Retention for outputs: one-off reverse_* results expire quickly, reusable seg_* / comp_* renders live longer,
+# and concat_* lists left behind by an interrupted ffmpeg run are dropped. Started in startup_event.
+from utils.output_janitor import OutputJanitor, RetentionRule
+output_janitor = OutputJanitor(
+    OUTPUT_DIR,
+    rules=[
+        RetentionRule('reverse_', ttl=float(os.getenv('OUTPUT_REVERSE_TTL', '3600')),
+                      max_bytes=int(os.getenv('OUTPUT_REVERSE_MAX_BYTES', str(1024 ** 3)))),
+        RetentionRule('hls_', ttl=float(os.getenv('OUTPUT_REVERSE_TTL', '3600')),
+                      max_bytes=int(os.getenv('OUTPUT_REVERSE_MAX_BYTES', str(1024 ** 3)))),
+        RetentionRule('seg_', ttl=float(os.getenv('OUTPUT_SEGMENT_TTL', str(7 * 86400))),
+                      max_bytes=int(os.getenv('OUTPUT_SEGMENT_MAX_BYTES', str(2 * 1024 ** 3)))),
+        RetentionRule('comp_', ttl=float(os.getenv('OUTPUT_SEGMENT_TTL', str(7 * 86400))),
+                      max_bytes=int(os.getenv('OUTPUT_SEGMENT_MAX_BYTES', str(2 * 1024 ** 3)))),
+        RetentionRule('concat_', ttl=3600, max_bytes=64 * 1024 ** 2),
+    ],
+    interval=float(os.getenv('OUTPUT_SWEEP_INTERVAL', '300')),
+    min_age=float(os.getenv('OUTPUT_MIN_AGE', '120')),
+)
+
+# Composed gloss videos are content-addressed: (tokens, source, clip versions, codec, speed) -> comp_<sha1>.mp4
+from utils.composition_cache import CompositionCache, normalize_gloss_tokens
+composition_cache = CompositionCache(OUTPUT_DIR, max_entries=int(os.getenv('COMPOSITION_CACHE_ENTRIES', '1024')))
+COMPOSE_SOURCE = 'aslbrick'
+COMPOSE_CODEC = 'h264'
+
+# ffmpeg stream-copy concat; clips that do not match the common layout are re-encoded once into PREPARED_CLIP_DIR
+from utils.clip_concat import ClipConcatenator
+PREPARED_CLIP_DIR = os.getenv('PREPARED_CLIP_DIR', os.path.join(tempfile.gettempdir(), 'asl_prepared_clips'))
+clip_concatenator = ClipConcatenator(
+    PREPARED_CLIP_DIR,
+    timeout=float(os.getenv('FFMPEG_TIMEOUT', '120')),
+)
+# Prepared clips are only a cache: least recently used ones go past the TTL or the size cap
+prepared_clip_janitor = OutputJanitor(
+    PREPARED_CLIP_DIR,
+    rules=[RetentionRule('', ttl=float(os.getenv('PREPARED_CLIP_TTL', str(7 * 86400))),
+                         max_bytes=int(os.getenv('PREPARED_CLIP_MAX_BYTES', str(2 * 1024 ** 3))))],
+    interval=float(os.getenv('OUTPUT_SWEEP_INTERVAL', '300')),
+    min_age=float(os.getenv('OUTPUT_MIN_AGE', '120')),
+)
+
+# Progressive HLS composition: the playlist URL is returned at once and grows one gloss at a time
+from utils.stream_compose import StreamingComposer
+stream_composer = StreamingComposer(OUTPUT_DIR, probe=clip_concatenator.probe,
+                                    max_workers=int(os.getenv('STREAM_COMPOSE_WORKERS', '4')))
+# Longest wait for one token's clip (download + ingest); a slower token is reported missing
+CLIP_FETCH_TIMEOUT = float(os.getenv('CLIP_FETCH_TIMEOUT', '60'))
+# Playlist mode: raw per-gloss clips served from /gloss-clip/<clip_id>?v=<version>
+from utils.gloss_playlist import CLIP_MAX_AGE, build_playlist as build_clip_playlist, find_clip as find_gloss_clip
+CLASSROOM_STREAMING = os.getenv('CLASSROOM_STREAMING', '1') != '0'
+
 # In-memory cache and storage
 _REVERSE_SEGMENT_CACHE: Dict[str, str] = {}
 active_classrooms: Dict[str, Dict] = {}
@@ -185,6 +240,49 @@ def _map_tokens_to_available(tokens: list, available: list):
         missing.append(t0)
     return mapped, missing
 
+from contextlib import ExitStack, contextmanager
+from utils.hands_pool import HandsPool
+from utils.hands_sessions import HandsSessionRegistry, SessionLimitError, clean_session_id
+
+# Pooled MediaPipe graphs: one pool for the 2-hand gesture path, one for the 1-hand letter path
+HANDS_POOL_SIZE = int(os.getenv('HANDS_POOL_SIZE', '2'))
+HANDS_POOL_TIMEOUT = float(os.getenv('HANDS_POOL_TIMEOUT', '10'))
+gesture_hands_pool = HandsPool(size=HANDS_POOL_SIZE, max_num_hands=2, name='gesture')
+letter_hands_pool = HandsPool(size=HANDS_POOL_SIZE, max_num_hands=1, name='letter')
+
+# Per-client video-mode trackers for callers that send a stable session_id
+hands_sessions = HandsSessionRegistry(
+    idle_ttl=float(os.getenv('HANDS_SESSION_IDLE_TTL', '60')),
+    max_sessions=int(os.getenv('HANDS_SESSION_MAX', '64')),
+    # New trackers one client address may open per window
+    max_creations=int(os.getenv('HANDS_SESSION_CREATE_LIMIT', '8')),
+    creation_window=float(os.getenv('HANDS_SESSION_CREATE_WINDOW', '60'))
+)
+
+
+def _client_key(connection) -> Optional[str]:
+    """Client address of a Request or WebSocket, used to rate-limit tracker creation."""
+    return connection.client.host if connection.client else None
+
+
+@contextmanager
+def _acquire_hands(pool: HandsPool, session_id: Optional[str] = None, client: Optional[str] = None):
+    """Yield a Hands graph: the client's tracker if session_id is set, else a pooled one.
+
+    A client over its tracker creation budget gets a pooled graph instead.
+    """
+    with ExitStack() as stack:
+        hands = None
+        if session_id:
+            try:
+                hands = stack.enter_context(hands_sessions.acquire(session_id, max_num_hands=pool.max_num_hands,
+                                                                   client=client))
+            except SessionLimitError as e:
+                logger.warning(f"⚠️ {e}; using a pooled graph")
+        if hands is None:
+            hands = stack.enter_context(pool.acquire(timeout=HANDS_POOL_TIMEOUT))
+        yield hands
+
 # Model Loading
 MODEL_FILE = os.path.join(BACKEND_DIR, "pretrained", "gesture_model.pkl")
 try:
@@ -203,35 +301,81 @@ except Exception as e:
     logger.error(f"❌ Failed to load Letter PKL model: {e}")
     letter_model = None
 
-# Landmark normalization utilities
-def normalize_landmarks(landmarks):
-    """Normalize landmarks like during training"""
-    wrist = landmarks[0]
-    translated = [(lm.x - wrist.x, lm.y - wrist.y, lm.z - wrist.z) for lm in landmarks]
-    scale = math.sqrt(translated[9][0]**2 + translated[9][1]**2 + translated[9][2]**2)
-    if scale < 1e-6:
-        scale = 1.0
-    normalized = [(x/scale, y/scale, z/scale) for (x, y, z) in translated]
-    return [coord for triple in normalized for coord in triple]
+# Single-pass predict_proba wrappers (label from classes_, top-k alternatives)
+from utils.predictor import ClassifierAdapter
+from utils.microbatch import MicroBatcher
+PREDICTION_TOP_K = int(os.getenv('PREDICTION_TOP_K', '3'))
+# Concurrent frames are micro-batched into one predict_proba call; MICROBATCH_MAX_SIZE=1 disables it
+MICROBATCH_MAX_SIZE = int(os.getenv('MICROBATCH_MAX_SIZE', '8'))
+MICROBATCH_MAX_WAIT_MS = float(os.getenv('MICROBATCH_MAX_WAIT_MS', '2'))
+
+
+def _make_predictor(estimator, name: str):
+    if estimator is None:
+        return None
+    adapter = ClassifierAdapter(estimator, top_k=PREDICTION_TOP_K)
+    if MICROBATCH_MAX_SIZE <= 1:
+        return adapter
+    return MicroBatcher(adapter, max_batch=MICROBATCH_MAX_SIZE, max_wait_ms=MICROBATCH_MAX_WAIT_MS, name=name)
+
+
+gesture_predictor = _make_predictor(model, 'gesture')
+letter_predictor = _make_predictor(letter_model, 'letter')
+
+# Server-side temporal smoothing for clients that send a session_id: EMA + majority vote with
+# hysteresis, plus a one-shot 'confirmed' label once a sign has been stable for K frames
+from utils.smoothing import SmoothingRegistry
+temporal_smoothing = SmoothingRegistry(
+    idle_ttl=float(os.getenv('HANDS_SESSION_IDLE_TTL', '60')),
+    window=int(os.getenv('SMOOTHING_WINDOW', '8')),
+    alpha=float(os.getenv('SMOOTHING_ALPHA', '0.5')),
+    confirm_frames=int(os.getenv('SMOOTHING_CONFIRM_FRAMES', '3')),
+    enter_threshold=float(os.getenv('SMOOTHING_ENTER_THRESHOLD', '0.6')),
+    exit_threshold=float(os.getenv('SMOOTHING_EXIT_THRESHOLD', '0.4'))
+)
+
 
-def empty_hand():
-    return [0.0] * (21 * 3)
+def _smooth_result(result: dict, session_id: Optional[str], mode: str) -> dict:
+    """Attach the session's smoothed label ('smoothed': {label, confidence, stable_frames, confirmed}).
+
+    Also removes the full 'probabilities' row, which is only used for smoothing and is not returned to clients.
+    """
+    probabilities = result.pop('probabilities', None)
+    if session_id:
+        predictor = letter_predictor if mode == 'letter' else gesture_predictor
+        classes = predictor.classes if predictor is not None else None
+        result['smoothed'] = temporal_smoothing.update(session_id, mode, result['detections'], probabilities, classes)
+    return result
+
+
+# Decode + MediaPipe + sklearn run on this bounded pool so they never block the event loop.
+# When it is full, inference endpoints answer 503 with Retry-After instead of queueing forever.
+from utils.inference_executor import BoundedExecutor, ExecutorSaturated
+inference_executor = BoundedExecutor(
+    max_workers=int(os.getenv('INFERENCE_WORKERS', str(min(4, os.cpu_count() or 1)))),
+    max_queue=int(os.getenv('INFERENCE_QUEUE_SIZE', '16')),
+    retry_after=int(os.getenv('INFERENCE_RETRY_AFTER', '1')),
+    name='inference'
+)
+
+# Landmark normalization utilities (vectorized, shared with the Flask app and scripts)
+from utils.landmarks import (landmarks_to_array, normalize_landmarks, empty_hands, hand_features,
+                             parse_landmarks, parse_landmark_bytes, classify_landmarks)
 
 # Inference functions
-def run_inference_on_frame(frame_bgr: np.ndarray):
+def run_inference_on_frame(frame_bgr: np.ndarray, session_id: Optional[str] = None,
+                           client: Optional[str] = None):
     """Run model inference on a single BGR frame"""
     global model
     if model is None:
         raise RuntimeError("Model not loaded")
 
-    hands = mp_hands.Hands(max_num_hands=2, min_detection_confidence=0.7, min_tracking_confidence=0.7)
-
-    try:
+    with _acquire_hands(gesture_hands_pool, session_id, client) as hands:
         rgb_frame = cv.cvtColor(frame_bgr, cv.COLOR_BGR2RGB)
         results = hands.process(rgb_frame)
         annotated_frame = frame_bgr.copy()
 
-        left_hand, right_hand = None, None
+        raw_hands = empty_hands(2)
 
         if results.multi_hand_landmarks and results.multi_handedness:
             for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
@@ -247,58 +391,46 @@ def run_inference_on_frame(frame_bgr: np.ndarray):
                     mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2)
                 )
 
-                norm = normalize_landmarks(hand_landmarks.landmark)
-
-                if label == "Left":
-                    left_hand = norm
-                else:
-                    right_hand = norm
-
-        if left_hand is None:
-            left_hand = empty_hand()
-        if right_hand is None:
-            right_hand = empty_hand()
+                landmarks_to_array(hand_landmarks.landmark, out=raw_hands[0 if label == "Left" else 1])
 
-        features = np.array([left_hand + right_hand])
+        features, present = hand_features(raw_hands)
 
-        if any(v != 0.0 for v in features[0]):
-            pred = model.predict(features)[0]
+        if present.any():
+            prediction = gesture_predictor.predict_one(features)
+            pred, confidence = prediction.label, prediction.confidence
 
-            if hasattr(model, "predict_proba"):
-                proba = model.predict_proba(features).max()
-                confidence = float(proba)
+            if gesture_predictor.has_proba:
                 text = f"Gesture: {pred} ({confidence:.2f})"
             else:
-                confidence = 1.0
                 text = f"Gesture: {pred}"
 
             cv.putText(annotated_frame, text, (10, 40), cv.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
 
-            return {
+            result = {
                 "detected_sign": pred,
                 "confidence": confidence,
-                "detections": [{"class": pred, "confidence": confidence}],
+                "detections": prediction.candidates,
+                "probabilities": prediction.probabilities,
                 "annotated_frame": annotated_frame
             }
         else:
-            return {
+            result = {
                 "detected_sign": None,
                 "confidence": 0.0,
                 "detections": [],
                 "annotated_frame": annotated_frame
             }
-    finally:
-        hands.close()
 
-def run_letter_inference_on_frame(frame_bgr: np.ndarray):
+    return _smooth_result(result, session_id, 'gesture')
+
+def run_letter_inference_on_frame(frame_bgr: np.ndarray, session_id: Optional[str] = None,
+                                  client: Optional[str] = None):
     """Run letter model inference on a single BGR frame"""
     global letter_model
     if letter_model is None:
         raise RuntimeError("Letter model not loaded")
 
-    hands = mp_hands.Hands(max_num_hands=1, min_detection_confidence=0.7, min_tracking_confidence=0.7)
-
-    try:
+    with _acquire_hands(letter_hands_pool, session_id, client) as hands:
         rgb_frame = cv.cvtColor(frame_bgr, cv.COLOR_BGR2RGB)
         results = hands.process(rgb_frame)
         annotated_frame = frame_bgr.copy()
@@ -314,47 +446,164 @@ def run_letter_inference_on_frame(frame_bgr: np.ndarray):
                     mp_drawing.DrawingSpec(color=(0, 255, 255), thickness=2)
                 )
 
-                norm = normalize_landmarks(hand_landmarks.landmark)
-                features = np.array([norm])
-                pred = letter_model.predict(features)[0]
+                features = normalize_landmarks(hand_landmarks.landmark).reshape(1, -1)
+                prediction = letter_predictor.predict_one(features)
+                pred, confidence = prediction.label, prediction.confidence
 
-                if hasattr(letter_model, "predict_proba"):
-                    proba = letter_model.predict_proba(features).max()
-                    confidence = float(proba)
+                if letter_predictor.has_proba:
                     text = f"Letter: {pred} ({confidence:.2f})"
                 else:
-                    confidence = 1.0
                     text = f"Letter: {pred}"
 
                 cv.putText(annotated_frame, text, (10, 40), cv.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 0), 2)
 
-                return {
+                result = {
                     "detected_letter": pred,
                     "confidence": confidence,
-                    "detections": [{"class": pred, "confidence": confidence}],
+                    "detections": prediction.candidates,
+                    "probabilities": prediction.probabilities,
                     "annotated_frame": annotated_frame
                 }
+                return _smooth_result(result, session_id, 'letter')
 
-        return {
+        result = {
             "detected_letter": None,
             "confidence": 0.0,
             "detections": [],
             "annotated_frame": annotated_frame
         }
-    finally:
-        hands.close()
+
+    return _smooth_result(result, session_id, 'letter')
+
+
+def _infer_encoded_frame(frame_bytes: bytes, mode: str = 'gesture', return_annotated: bool = False,
+                         session_id: Optional[str] = None, client: Optional[str] = None):
+    """Decode one JPEG/PNG frame and run the gesture or letter path.
+
+    Returns (status_code, payload) where payload follows the /infer-frame (mode='gesture')
+    or /infer-letter (mode='letter') schema. Runs on the inference executor, never on the event loop.
+    """
+    t0 = time.time()
+    if mode == 'letter':
+        if letter_model is None:
+            return 503, {'error': 'Letter model not loaded', 'model_loaded': False}
+    elif model is None:
+        return 503, {'error': 'Model not loaded', 'model_loaded': False}
+
+    img = cv.imdecode(np.frombuffer(frame_bytes, np.uint8), cv.IMREAD_COLOR)
+    if img is None:
+        return 415, {'error': 'Could not decode image'}
+
+    t1 = time.time()
+    if mode == 'letter':
+        result = run_letter_inference_on_frame(img, session_id=session_id, client=client)
+        key = 'detected_letter'
+    else:
+        result = run_inference_on_frame(img, session_id=session_id, client=client)
+        key = 'detected_sign'
+    t2 = time.time()
+
+    response_data = {
+        key: result[key],
+        'confidence': result['confidence'],
+        'detections': result['detections'],
+        'timing': {'decode': t1 - t0, 'inference': t2 - t1, 'total': t2 - t0}
+    }
+    if 'smoothed' in result:
+        response_data['smoothed'] = result['smoothed']
+    if return_annotated and 'annotated_frame' in result:
+        _, buffer = cv.imencode('.jpg', result['annotated_frame'])
+        frame_base64 = base64.b64encode(buffer).decode('utf-8')
+        response_data['annotated_frame'] = f"data:image/jpeg;base64,{frame_base64}"
+    return 200, response_data
+
+
+def _infer_landmarks(landmarks, mode: str = 'gesture', hand: str = 'right', session_id: Optional[str] = None):
+    """Classify client-side MediaPipe landmarks (JSON values or packed float32 bytes).
+
+    Only normalization + the classifier run here; no image decoding or hand detection.
+    Returns (status_code, payload) with the /infer-frame or /infer-letter fields minus annotated_frame.
+    """
+    t0 = time.time()
+    if mode not in ('gesture', 'letter'):
+        return 400, {'error': "mode must be 'gesture' or 'letter'"}
+    predictor = letter_predictor if mode == 'letter' else gesture_predictor
+    if predictor is None:
+        return 503, {'error': f'{mode.capitalize()} model not loaded', 'model_loaded': False}
+
+    num_hands = 1 if mode == 'letter' else 2
+    try:
+        if isinstance(landmarks, (bytes, bytearray)):
+            points = parse_landmark_bytes(bytes(landmarks), num_hands=num_hands, hand=hand)
+        else:
+            points = parse_landmarks(landmarks, num_hands=num_hands, hand=hand)
+    except ValueError as e:
+        return 400, {'error': str(e)}
+
+    response_data = _smooth_result(classify_landmarks(points, mode, predictor), session_id, mode)
+    elapsed = time.time() - t0
+    response_data['timing'] = {'inference': elapsed, 'total': elapsed}
+    return 200, response_data
+
+
+def _executor_busy_response(e: ExecutorSaturated) -> JSONResponse:
+    return JSONResponse(
+        {'error': 'Inference queue is full, retry shortly', 'retry_after': e.retry_after},
+        status_code=503,
+        headers={'Retry-After': str(e.retry_after)}
+    )
 
 # Video composition helpers
+def _preload_wlasl_fetcher():
+    """Parse the WLASL mapper at startup so the first request does not pay for it."""
+    try:
+        from services.dynamic_video_fetcher import get_fetcher
+        fetcher = get_fetcher()
+        logger.info(f"✅ WLASL mapper preloaded: {len(fetcher.gloss_index)} glosses in {fetcher.load_seconds * 1000:.0f} ms")
+    except Exception as e:
+        logger.warning(f"⚠️ WLASL mapper preload failed: {e}")
+
+def _llm_cache_stats() -> Optional[Dict]:
+    """Translation cache metrics, or None when the LLM module is not available."""
+    try:
+        from services.revtrans import translation_cache
+        return translation_cache.stats()
+    except Exception:
+        return None
+
+
+def _llm_client_stats() -> Optional[Dict]:
+    """Async LLM client metrics (concurrency, retries, circuit state), or None when unavailable."""
+    try:
+        from services.revtrans import llm_client
+        return llm_client.stats()
+    except Exception:
+        return None
+
+
+async def _gloss_tokens_for_text(text: str, available_tokens: Optional[List[str]] = None) -> List[str]:
+    """LLM gloss tokens without blocking the event loop; heuristic tokens if the LLM fails or its circuit is open"""
+    try:
+        from services.revtrans import asentence_to_gloss_tokens
+        if available_tokens is None:
+            available_tokens = _list_available_video_tokens()
+        return await asentence_to_gloss_tokens(text, available_tokens=available_tokens)
+    except Exception as e:
+        logger.warning(f"LLM tokenization failed, using simple split: {e}")
+        return _text_to_gloss_tokens(text)
+
+
 def _list_available_video_tokens() -> List[str]:
     """Return available token basenames from WLASL mapper and local videos directory"""
     tokens = set()
     
     try:
-        from services.dynamic_video_fetcher import WLASLVideoFetcher
-        fetcher = WLASLVideoFetcher()
-        wlasl_glosses = list(fetcher.gloss_index.keys())
+        from services.dynamic_video_fetcher import get_fetcher
+        fetcher = get_fetcher()
+        # Only glosses that actually have an aslbrick clip (the source compose_video_from_gloss uses)
+        wlasl_glosses = fetcher.glosses_for_source("aslbrick")
         tokens.update(wlasl_glosses)
-        logger.info(f"✅ Loaded {len(wlasl_glosses)} glosses from WLASL mapper")
+        logger.debug(f"Loaded {len(wlasl_glosses)} aslbrick glosses from WLASL mapper")
     except Exception as e:
         logger.warning(f"⚠️ Could not load WLASL glosses: {e}")
     
@@ -396,10 +645,150 @@ def _text_to_gloss_tokens(text: str) -> List[str]:
     return filtered or candidates
 
 def compose_video_from_gloss(gloss_tokens):
-    """Concatenate per-token mp4 clips into a single mp4 in outputs"""
+    """Concatenate per-token mp4 clips into a single mp4 in outputs.
+
+    Outputs are content-addressed (see utils/composition_cache.py): a token sequence
+    that was already composed from the same clips returns the existing file.
+    """
+    tokens = normalize_gloss_tokens(gloss_tokens)
+    key = composition_cache.request_key(tokens, COMPOSE_SOURCE, COMPOSE_CODEC)
+    hit = composition_cache.lookup(key)
+    if hit:
+        logger.info(f"♻️ Reusing composed video {hit[0]}")
+        return hit
+
+    with composition_cache.single_flight(key):
+        # Another request may have composed the same sequence while we waited
+        hit = composition_cache.lookup(key)
+        if hit:
+            return hit
+
+        files, missing = _resolve_gloss_clips(tokens)
+        out_name = composition_cache.content_name(key, files)
+        hit = composition_cache.load(key, out_name, files)
+        if hit:
+            return hit[0], {**hit[1], 'missing': missing}
+
+        # Concatenate under a temporary name so a half-written file is never served
+        tmp_path = os.path.join(OUTPUT_DIR, f"{out_name[:-len('.mp4')]}.{secrets.token_hex(4)}.tmp.mp4")
+        try:
+            meta = _concat_clips(files, tmp_path)
+            os.replace(tmp_path, os.path.join(OUTPUT_DIR, out_name))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        meta['missing'] = missing
+        composition_cache.store(key, out_name, files, meta)
+        logger.info(f"✅ Video composed successfully: {out_name}")
+        return out_name, meta
+
+
+def _prefetch_gloss_clips(tokens, canonical: bool = True):
+    """Start fetching every token's clip (and, with ``canonical``, ingesting it).
+
+    Returns ``clip_for(token) -> path or None``.
+
+    ``clip_for`` waits up to CLIP_FETCH_TIMEOUT for that token's WLASL clip, falling back
+    to videos/<token>.mp4.
+    """
     try:
-        from services.dynamic_video_fetcher import WLASLVideoFetcher
-        fetcher = WLASLVideoFetcher()
+        from services.dynamic_video_fetcher import get_fetcher
+        fetcher = get_fetcher()
+    except Exception as e:
+        logger.warning(f"⚠️ WLASL fetcher unavailable: {e}")
+        fetcher = None
+    futures = fetcher.prefetch(tokens, source=COMPOSE_SOURCE, max_per_gloss=1, canonical=canonical) if fetcher else {}
+
+    def clip_for(name):
+        for future in futures.get(name, []):
+            try:
+                path = future.result(timeout=CLIP_FETCH_TIMEOUT)
+            except FutureTimeoutError:
+                logger.warning(f"⚠️ Clip for '{name}' not ready after {CLIP_FETCH_TIMEOUT:.0f}s, skipping it")
+                continue
+            except Exception as e:
+                logger.warning(f"⚠️ Clip for '{name}' failed: {e}")
+                continue
+            if path:
+                return path
+        cand = os.path.join(os.path.join(BACKEND_DIR, 'videos'), f"{name}.mp4")
+        return cand if os.path.exists(cand) else None
+
+    return clip_for
+
+
+def _clip_duration(path: str) -> float:
+    """Seconds of video in ``path``: ffprobe when available, else OpenCV."""
+    if clip_concatenator.available():
+        try:
+            info = clip_concatenator.probe(path)
+            if info.fps:
+                return info.frames / info.fps
+        except Exception as e:
+            logger.debug(f"ffprobe failed for {path}: {e}")
+    cap = cv.VideoCapture(path)
+    try:
+        fps = cap.get(cv.CAP_PROP_FPS) or 25.0
+        return (cap.get(cv.CAP_PROP_FRAME_COUNT) or 0) / fps
+    finally:
+        cap.release()
+
+
+def build_gloss_playlist(gloss_tokens):
+    """Ordered per-gloss clip URLs with durations, for clients that play clips back to back.
+
+    Nothing is composed or transcoded: the server only fetches the raw clips,
+    which are then served from /gloss-clip/<clip_id>?v=<version>. Returns
+    {'clips': [{token, url, duration}], 'missing': [...], 'duration_seconds': float}.
+    """
+    tokens = normalize_gloss_tokens(gloss_tokens)
+    return build_clip_playlist(tokens, _prefetch_gloss_clips(tokens, canonical=False), _clip_duration)
+
+
+def _find_gloss_clip(clip_id: str, version: Optional[str] = None):
+    """(path, exact) for a /gloss-clip request; see utils.gloss_playlist.find_clip.
+
+    Candidates are the cached raw WLASL clip, its canonical copy, then videos/<clip_id>.mp4.
+    """
+    clip_id = os.path.basename(clip_id)
+    candidates = []
+    try:
+        from services.dynamic_video_fetcher import get_fetcher
+        fetcher = get_fetcher()
+        candidates += [fetcher.cached_clip_path(clip_id, canonical=False), fetcher.cached_clip_path(clip_id)]
+    except Exception as e:
+        logger.debug(f"WLASL clip lookup failed for {clip_id}: {e}")
+    candidates.append(os.path.join(os.path.join(BACKEND_DIR, 'videos'), f"{clip_id}.mp4"))
+    return find_gloss_clip(candidates, version)
+
+
+def compose_video_streaming(gloss_tokens):
+    """Start a progressive HLS composition and return (playlist_name, meta) without waiting for clips.
+
+    A sequence that is already composed returns the finished mp4 instead, and
+    without ffmpeg this is plain compose_video_from_gloss.
+    """
+    tokens = normalize_gloss_tokens(gloss_tokens)
+    if not tokens:
+        raise FileNotFoundError(f"No valid gloss tokens in {gloss_tokens}")
+    hit = composition_cache.lookup(composition_cache.request_key(tokens, COMPOSE_SOURCE, COMPOSE_CODEC))
+    if hit:
+        return hit
+    if not stream_composer.available():
+        return compose_video_from_gloss(tokens)
+
+    # All downloads / ingest transcodes start now; segments are cut in token order as they finish
+    playlist = stream_composer.start(tokens, _prefetch_gloss_clips(tokens))
+    logger.info(f"📡 Streaming composition started: {playlist}")
+    return playlist, {'streaming': True, 'format': 'hls', 'missing': []}
+
+
+def _resolve_gloss_clips(gloss_tokens):
+    """Return (files, missing): one clip path per available token, WLASL first then videos/."""
+    try:
+        from services.dynamic_video_fetcher import get_fetcher
+        fetcher = get_fetcher()
         logger.info("✅ Using WLASL fetcher to load videos")
     except Exception as e:
         logger.warning(f"⚠️ WLASL fetcher unavailable: {e}")
@@ -408,14 +797,15 @@ def compose_video_from_gloss(gloss_tokens):
     files = []
     missing = []
     
-    for t in gloss_tokens:
-        name = str(t).strip().lower()
-        if not name:
-            continue
-        
+    # Start all WLASL downloads concurrently; the ordered loop below then just collects them
+    if fetcher:
+        fetcher.prefetch(gloss_tokens, source=COMPOSE_SOURCE, max_per_gloss=1, canonical=True)
+    
+    for name in gloss_tokens:
         try:
             if fetcher:
-                videos = fetcher.get_video_paths_for_gloss(name, source="aslbrick", max_videos=1)
+                videos = fetcher.get_video_paths_for_gloss(name, source=COMPOSE_SOURCE, max_videos=1,
+                                                           canonical=True)
                 if videos:
                     files.extend(videos)
                 else:
@@ -433,11 +823,22 @@ def compose_video_from_gloss(gloss_tokens):
     if not files:
         available_tokens = _list_available_video_tokens()
         raise FileNotFoundError(f"No matching video clips found for tokens: {gloss_tokens}")
+    return files, missing
+
+
+def _concat_clips(files, out_path):
+    """Join clips with the probing stream-copy path, falling back to a plain concat of the originals."""
+    if clip_concatenator.available():
+        try:
+            return clip_concatenator.concat(files, out_path)
+        except Exception as e:
+            logger.warning(f"⚠️ Stream-copy concat failed, retrying plain ffmpeg concat: {e}")
+    return _concat_clips_unprepared(files, out_path)
+
 
+def _concat_clips_unprepared(files, out_path):
+    """Stream-copy ``files`` into one mp4 at ``out_path`` with the ffmpeg concat demuxer; returns meta."""
     # Use FFmpeg for concatenation instead of OpenCV VideoWriter
-    out_name = f"reverse_{datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')}.mp4"
-    out_path = os.path.join(OUTPUT_DIR, out_name)
-    
     # Create concat file for FFmpeg
     concat_file = os.path.join(OUTPUT_DIR, f"concat_{datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')}.txt")
     with open(concat_file, 'w') as f:
@@ -461,8 +862,6 @@ def compose_video_from_gloss(gloss_tokens):
             logger.error(f"❌ FFmpeg concatenation error: {result.stderr}")
             raise RuntimeError(f"FFmpeg failed to concatenate videos: {result.stderr}")
         
-        logger.info(f"✅ Video composed successfully: {out_name}")
-        
         # Get video metadata
         first = cv.VideoCapture(out_path)
         fps = first.get(cv.CAP_PROP_FPS) or 25.0
@@ -477,8 +876,7 @@ def compose_video_from_gloss(gloss_tokens):
             os.remove(concat_file)
             logger.debug(f"🧹 Cleaned up concat file: {concat_file}")
 
-    meta = {'fps': fps, 'width': width, 'height': height, 'frames': total_frames, 'missing': missing, 'method': 'ffmpeg_concat'}
-    return out_name, meta
+    return {'fps': fps, 'width': width, 'height': height, 'frames': total_frames, 'method': 'ffmpeg_concat'}
 
 # Helper for transcription
 def transcribe_audio(audio_base64: str) -> str:
@@ -527,12 +925,17 @@ async def root():
         "endpoints": {
             "inference": {
                 "gesture": "POST /infer-frame",
-                "letter": "POST /infer-letter"
+                "letter": "POST /infer-letter",
+                "landmarks": "POST /infer-landmarks"
             },
             "translation": {
                 "reverse_video": "POST /reverse-translate-video",
                 "process_words": "POST /process-confirmed-words"
             },
+            "streaming": {
+                "inference_ws": "WS /ws/infer?mode=gesture|letter",
+                "landmarks_ws": "WS /ws/infer-landmarks?mode=gesture|letter"
+            },
             "classroom": {
                 "teacher_ws": "WS /ws/classroom/{room_id}/teacher",
                 "student_ws": "WS /ws/classroom/{room_id}/student"
@@ -605,7 +1008,8 @@ async def student_dashboard(request: Request, room_id: Optional[str] = None):
     return templates.TemplateResponse("student.html", {"request": request, "room_id": room_id})
 
 @app.post("/infer-frame")
-async def infer_frame(frame: UploadFile = File(...), return_annotated: bool = Form(False)):
+async def infer_frame(request: Request, frame: UploadFile = File(...), return_annotated: bool = Form(False),
+                      session_id: Optional[str] = Form(None)):
     """Accept a single image frame and return detection JSON"""
     t0 = time.time()
     try:
@@ -613,34 +1017,22 @@ async def infer_frame(frame: UploadFile = File(...), return_annotated: bool = Fo
             return JSONResponse({'error': 'Model not loaded', 'model_loaded': False}, status_code=503)
 
         file_bytes = await frame.read()
-        nparr = np.frombuffer(file_bytes, np.uint8)
-        img = cv.imdecode(nparr, cv.IMREAD_COLOR)
-        if img is None:
-            return JSONResponse({'error': 'Could not decode image'}, status_code=415)
-
-        t1 = time.time()
-        result = run_inference_on_frame(img)
-        t2 = time.time()
-
-        response_data = {
-            'detected_sign': result['detected_sign'],
-            'confidence': result['confidence'],
-            'detections': result['detections'],
-            'timing': {'decode': t1 - t0, 'inference': t2 - t1, 'total': t2 - t0}
-        }
-
-        if return_annotated and 'annotated_frame' in result:
-            _, buffer = cv.imencode('.jpg', result['annotated_frame'])
-            frame_base64 = base64.b64encode(buffer).decode('utf-8')
-            response_data['annotated_frame'] = f"data:image/jpeg;base64,{frame_base64}"
-
-        return JSONResponse(response_data)
+        status, response_data = await inference_executor.run(
+            _infer_encoded_frame, file_bytes, 'gesture', return_annotated, clean_session_id(session_id),
+            _client_key(request)
+        )
+        if status == 200:
+            response_data['timing']['total'] = time.time() - t0
+        return JSONResponse(response_data, status_code=status)
+    except ExecutorSaturated as e:
+        return _executor_busy_response(e)
     except Exception as e:
         logger.error("/infer-frame error: %s\n%s", str(e), traceback.format_exc())
         return JSONResponse({'error': str(e)}, status_code=500)
 
 @app.post("/infer-letter")
-async def infer_letter(frame: UploadFile = File(...), return_annotated: bool = Form(False)):
+async def infer_letter(request: Request, frame: UploadFile = File(...), return_annotated: bool = Form(False),
+                       session_id: Optional[str] = Form(None)):
     """Accept a single image frame and return letter detection JSON"""
     t0 = time.time()
     try:
@@ -648,30 +1040,53 @@ async def infer_letter(frame: UploadFile = File(...), return_annotated: bool = F
             return JSONResponse({'error': 'Letter model not loaded', 'model_loaded': False}, status_code=503)
 
         file_bytes = await frame.read()
-        nparr = np.frombuffer(file_bytes, np.uint8)
-        img = cv.imdecode(nparr, cv.IMREAD_COLOR)
-        if img is None:
-            return JSONResponse({'error': 'Could not decode image'}, status_code=415)
-
-        t1 = time.time()
-        result = run_letter_inference_on_frame(img)
-        t2 = time.time()
-
-        response_data = {
-            'detected_letter': result['detected_letter'],
-            'confidence': result['confidence'],
-            'detections': result['detections'],
-            'timing': {'decode': t1 - t0, 'inference': t2 - t1, 'total': t2 - t0}
-        }
+        status, response_data = await inference_executor.run(
+            _infer_encoded_frame, file_bytes, 'letter', return_annotated, clean_session_id(session_id),
+            _client_key(request)
+        )
+        if status == 200:
+            response_data['timing']['total'] = time.time() - t0
+        return JSONResponse(response_data, status_code=status)
+    except ExecutorSaturated as e:
+        return _executor_busy_response(e)
+    except Exception as e:
+        logger.error("/infer-letter error: %s\n%s", str(e), traceback.format_exc())
+        return JSONResponse({'error': str(e)}, status_code=500)
 
-        if return_annotated and 'annotated_frame' in result:
-            _, buffer = cv.imencode('.jpg', result['annotated_frame'])
-            frame_base64 = base64.b64encode(buffer).decode('utf-8')
-            response_data['annotated_frame'] = f"data:image/jpeg;base64,{frame_base64}"
+@app.post("/infer-landmarks")
+async def infer_landmarks(request: Request, mode: str = "gesture", hand: str = "right",
+                          session_id: Optional[str] = None):
+    """Classify raw hand landmarks instead of an image frame.
 
-        return JSONResponse(response_data)
+    JSON body: {"mode": "gesture"|"letter", "landmarks": 21x3 or 2x21x3, "hand": "left"|"right"}.
+    application/octet-stream body: 63 or 126 little-endian float32 values; mode/hand as query params.
+    """
+    t0 = time.time()
+    try:
+        if request.headers.get('content-type', '').startswith('application/octet-stream'):
+            landmarks = await request.body()
+        else:
+            try:
+                body = await request.json()
+            except ValueError:
+                return JSONResponse({'error': 'Body must be JSON or application/octet-stream'}, status_code=400)
+            if not isinstance(body, dict) or 'landmarks' not in body:
+                return JSONResponse({'error': 'No landmarks provided (expect JSON field "landmarks")'}, status_code=400)
+            landmarks = body['landmarks']
+            mode = body.get('mode', mode)
+            hand = body.get('hand', hand)
+            session_id = body.get('session_id', session_id)
+
+        status, response_data = await inference_executor.run(
+            _infer_landmarks, landmarks, mode, hand, clean_session_id(session_id)
+        )
+        if status == 200:
+            response_data['timing']['total'] = time.time() - t0
+        return JSONResponse(response_data, status_code=status)
+    except ExecutorSaturated as e:
+        return _executor_busy_response(e)
     except Exception as e:
-        logger.error("/infer-letter error: %s\n%s", str(e), traceback.format_exc())
+        logger.error("/infer-landmarks error: %s\n%s", str(e), traceback.format_exc())
         return JSONResponse({'error': str(e)}, status_code=500)
 
 @app.get("/model-status")
@@ -693,7 +1108,25 @@ async def model_status():
         'letter_classes': letter_classes,
         'gesture_actions_count': len(gesture_classes),
         'letter_actions_count': len(letter_classes),
-        'demo_mode': model is None and letter_model is None
+        'demo_mode': model is None and letter_model is None,
+        'hands_pools': {
+            'gesture': gesture_hands_pool.stats(),
+            'letter': letter_hands_pool.stats()
+        },
+        'hands_sessions': hands_sessions.stats(),
+        'temporal_smoothing': temporal_smoothing.stats(),
+        'output_retention': output_janitor.stats(),
+        'prepared_clip_retention': prepared_clip_janitor.stats(),
+        'composition_cache': composition_cache.stats(),
+        'clip_concat': clip_concatenator.stats(),
+        'streaming_composition': stream_composer.stats(),
+        'llm_cache': _llm_cache_stats(),
+        'llm_client': _llm_client_stats(),
+        'inference_executor': inference_executor.stats(),
+        'microbatch': {
+            name: p.stats() for name, p in (('gesture', gesture_predictor), ('letter', letter_predictor))
+            if isinstance(p, MicroBatcher)
+        }
     })
 
 @app.get("/health")
@@ -715,8 +1148,8 @@ async def process_confirmed_words(request: Request):
             return JSONResponse({'sentence': fallback})
 
         try:
-            from services.revtrans import gloss_to_english_llm
-            sentence = gloss_to_english_llm(confirmed_words)
+            from services.revtrans import agloss_to_english_llm
+            sentence = await agloss_to_english_llm(confirmed_words)
             return JSONResponse({'sentence': sentence})
         except Exception as e:
             logger.error(f"LLM call error: {e}")
@@ -735,18 +1168,23 @@ async def reverse_translate_video(request: Request):
         text = data.get('text')
 
         if isinstance(text, str) and text.strip():
-            try:
-                from services.revtrans import sentence_to_gloss_tokens as _sentence_to_gloss_tokens
-                available = _list_available_video_tokens()
-                gloss_tokens = _sentence_to_gloss_tokens(text.strip(), available_tokens=available)
-            except Exception:
-                gloss_tokens = _text_to_gloss_tokens(text)
+            gloss_tokens = await _gloss_tokens_for_text(text.strip())
 
         if not isinstance(gloss_tokens, list) or not gloss_tokens:
             available = _list_available_video_tokens()[:30]
             return JSONResponse({'error': 'Invalid payload', 'available_tokens_preview': available}, status_code=400)
 
-        fname, meta = compose_video_from_gloss(gloss_tokens)
+        # "response_mode": "playlist" skips composition and returns the per-gloss clips to play in order
+        if data.get('response_mode') == 'playlist':
+            # Waiting on clip downloads blocks, so keep it off the event loop
+            playlist = await asyncio.to_thread(build_gloss_playlist, gloss_tokens)
+            return JSONResponse({'mode': 'playlist', **playlist, 'tokens': gloss_tokens})
+
+        # "stream": true returns a growing HLS playlist right away
+        if data.get('stream'):
+            fname, meta = compose_video_streaming(gloss_tokens)
+        else:
+            fname, meta = compose_video_from_gloss(gloss_tokens)
         url = f"/outputs/{fname}"
 
         return JSONResponse({
@@ -762,16 +1200,35 @@ async def reverse_translate_video(request: Request):
         logger.error(f'/reverse-translate-video error: {e}\n{traceback.format_exc()}')
         return JSONResponse({'error': str(e)}, status_code=500)
 
-@app.get("/outputs/{filename}")
+@app.get("/gloss-clip/{clip_id}")
+async def serve_gloss_clip(clip_id: str, v: Optional[str] = None):
+    """Serve one cached gloss clip for playlist playback (see build_gloss_playlist)."""
+    # The first call may build the fetcher and load its mapper
+    path, exact = await asyncio.to_thread(_find_gloss_clip, clip_id, v)
+    if not path:
+        return JSONResponse({'error': 'Clip not found', 'clip_id': clip_id}, status_code=404)
+    # Only the exact bytes named by ?v= may be kept; the clip id alone can change content
+    cache_control = f'public, max-age={CLIP_MAX_AGE}' if exact else 'no-cache'
+    return FileResponse(path, media_type='video/mp4', headers={'Cache-Control': cache_control})
+
+@app.get("/outputs/{filename:path}")
 async def serve_output_file(filename: str, request: Request):
-    """Serve generated files from outputs/ with HTTP Range support for videos"""
-    full_path = os.path.join(OUTPUT_DIR, filename)
-    if not os.path.isfile(full_path):
+    """Serve generated files from outputs/ (including hls_*/ playlists) with HTTP Range support for videos"""
+    full_path = os.path.normpath(os.path.join(OUTPUT_DIR, filename))
+    if not full_path.startswith(os.path.join(OUTPUT_DIR, '')) or not os.path.isfile(full_path):
         return JSONResponse({'error': 'File not found'}, status_code=404)
 
+    # Responses stream after the handler returns; the lease is released once the body is sent
+    output_janitor.acquire(filename)
+    release = BackgroundTask(output_janitor.release, filename)
+
     range_header = request.headers.get('range')
     if not range_header:
-        return FileResponse(full_path)
+        if filename.endswith('.m3u8'):
+            # Streaming playlists grow until #EXT-X-ENDLIST; players must re-fetch them
+            return FileResponse(full_path, media_type='application/vnd.apple.mpegurl',
+                                headers={'Cache-Control': 'no-cache'}, background=release)
+        return FileResponse(full_path, background=release)
 
     try:
         units, rng = range_header.split('=', 1)
@@ -795,10 +1252,11 @@ async def serve_output_file(filename: str, request: Request):
             'Accept-Ranges': 'bytes',
             'Content-Length': str(length),
         }
-        return StreamingResponse(iterfile(), status_code=206, media_type='video/mp4', headers=headers)
+        return StreamingResponse(iterfile(), status_code=206, media_type='video/mp4', headers=headers,
+                                 background=release)
     except Exception as e:
         logger.warning(f'Range request failed: {e}')
-        return FileResponse(full_path)
+        return FileResponse(full_path, background=release)
 
 # ==================== CHROME EXTENSION ENDPOINTS ====================
 
@@ -821,12 +1279,7 @@ async def tokenize_text(request: Request):
         available_tokens = _list_available_video_tokens()
         
         # Convert text to gloss tokens using LLM if available
-        try:
-            from services.revtrans import sentence_to_gloss_tokens as _sentence_to_gloss_tokens
-            gloss_tokens = _sentence_to_gloss_tokens(text, available_tokens=available_tokens)
-        except Exception as e:
-            logger.warning(f"LLM tokenization failed, using simple split: {e}")
-            gloss_tokens = _text_to_gloss_tokens(text)
+        gloss_tokens = await _gloss_tokens_for_text(text, available_tokens)
         
         # Filter to only tokens with available videos
         available_gloss = [t for t in gloss_tokens if t.lower() in [a.lower() for a in available_tokens]]
@@ -860,8 +1313,9 @@ async def batch_token_videos(request: Request):
         
         logger.info(f"📦 Batch video request for {len(tokens)} tokens")
         
-        from services.dynamic_video_fetcher import WLASLVideoFetcher
-        fetcher = WLASLVideoFetcher()
+        from services.dynamic_video_fetcher import get_fetcher
+        fetcher = get_fetcher()
+        fetcher.prefetch([str(t).lower() for t in tokens], source="aslbrick", max_per_gloss=1)
         
         result = {}
         for token in tokens:
@@ -902,8 +1356,8 @@ async def get_token_video(token: str):
         
         # Try to fetch from WLASL (uses cached version if already downloaded)
         try:
-            from services.dynamic_video_fetcher import WLASLVideoFetcher
-            fetcher = WLASLVideoFetcher()
+            from services.dynamic_video_fetcher import get_fetcher
+            fetcher = get_fetcher()
             
             # This downloads the video and returns the local file path
             video_paths = fetcher.get_video_paths_for_gloss(token_lower, source="aslbrick", max_videos=1)
@@ -932,6 +1386,153 @@ async def get_token_video(token: str):
 
 # ==================== WEBSOCKET ROUTES ====================
 
+@app.websocket("/ws/infer")
+async def websocket_infer(websocket: WebSocket, mode: str = "gesture", return_annotated: bool = False):
+    """Stream binary JPEG/PNG frames in, get one JSON prediction per processed frame back.
+
+    - Binary messages are frames. Only the newest unprocessed frame is kept, so when the
+      client sends faster than inference runs, older frames are dropped server-side.
+    - Text messages are JSON control updates: {"mode": "gesture"|"letter", "return_annotated": bool}.
+    - Each reply carries the /infer-frame or /infer-letter fields plus 'mode', 'seq' (index of
+      the frame it answers) and 'dropped' (frames skipped so far on this socket).
+    """
+    await websocket.accept()
+    # One tracker session per socket, so MediaPipe can track across this client's frames
+    session_id = f"ws-{secrets.token_hex(8)}"
+    state = {
+        'mode': mode if mode in ('gesture', 'letter') else 'gesture',
+        'return_annotated': bool(return_annotated),
+    }
+    pending = {'frame': None, 'seq': 0}
+    counters = {'received': 0, 'dropped': 0}
+    frame_ready = asyncio.Event()
+
+    async def receive_frames():
+        while True:
+            message = await websocket.receive()
+            if message['type'] == 'websocket.disconnect':
+                return
+            if message.get('bytes') is not None:
+                counters['received'] += 1
+                if pending['frame'] is not None:
+                    counters['dropped'] += 1
+                pending['frame'] = message['bytes']
+                pending['seq'] = counters['received']
+                frame_ready.set()
+            elif message.get('text'):
+                try:
+                    control = json.loads(message['text'])
+                except ValueError:
+                    await websocket.send_json({'error': 'Control messages must be JSON'})
+                    continue
+                if control.get('mode') in ('gesture', 'letter'):
+                    state['mode'] = control['mode']
+                if 'return_annotated' in control:
+                    state['return_annotated'] = bool(control['return_annotated'])
+
+    async def process_frames():
+        while True:
+            await frame_ready.wait()
+            frame_ready.clear()
+            frame_bytes, seq = pending['frame'], pending['seq']
+            pending['frame'] = None
+            if frame_bytes is None:
+                continue
+            try:
+                _, payload = await inference_executor.run(
+                    _infer_encoded_frame, frame_bytes, state['mode'], state['return_annotated'], session_id,
+                    _client_key(websocket)
+                )
+            except ExecutorSaturated as e:
+                payload = {'error': 'Inference queue is full, frame skipped', 'retry_after': e.retry_after}
+            except Exception as e:
+                logger.error("/ws/infer error: %s\n%s", str(e), traceback.format_exc())
+                payload = {'error': str(e)}
+            payload.update({'mode': state['mode'], 'seq': seq, 'dropped': counters['dropped']})
+            await websocket.send_json(payload)
+
+    receiver = asyncio.create_task(receive_frames())
+    processor = asyncio.create_task(process_frames())
+    try:
+        done, _ = await asyncio.wait({receiver, processor}, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            exc = task.exception()
+            if exc and not isinstance(exc, WebSocketDisconnect):
+                logger.warning(f"/ws/infer closed with error: {exc}")
+    finally:
+        receiver.cancel()
+        processor.cancel()
+        # A cancelled processor does not stop a frame already running in the executor; closing
+        # waits on that session's lock, so do it off the event loop
+        await asyncio.to_thread(hands_sessions.close_session, session_id)
+        temporal_smoothing.close_session(session_id)
+        logger.info(f"Inference stream {session_id} closed ({counters['received']} frames, {counters['dropped']} dropped)")
+
+
+@app.websocket("/ws/infer-landmarks")
+async def websocket_infer_landmarks(websocket: WebSocket, mode: str = "gesture", hand: str = "right"):
+    """Stream landmarks in, get one JSON prediction per message back.
+
+    - Binary messages are 63 or 126 packed little-endian float32 values.
+    - Text messages are JSON: either a control update {"mode", "hand"} or a landmark
+      message {"landmarks": [...], optional "mode"/"hand"/"seq"}.
+    - Each reply carries the /infer-landmarks fields plus 'mode' and 'seq'.
+    """
+    await websocket.accept()
+    # Smoothing state is kept per socket
+    session_id = f"ws-lm-{secrets.token_hex(8)}"
+    state = {'mode': mode if mode in ('gesture', 'letter') else 'gesture', 'hand': hand}
+    received = 0
+    try:
+        while True:
+            message = await websocket.receive()
+            if message['type'] == 'websocket.disconnect':
+                break
+            received += 1
+            seq = received
+            msg_mode, msg_hand = state['mode'], state['hand']
+            if message.get('bytes') is not None:
+                landmarks = message['bytes']
+            elif message.get('text'):
+                try:
+                    data = json.loads(message['text'])
+                except ValueError:
+                    await websocket.send_json({'error': 'Text messages must be JSON'})
+                    continue
+                if not isinstance(data, dict):
+                    await websocket.send_json({'error': 'Text messages must be JSON objects'})
+                    continue
+                if 'landmarks' not in data:
+                    if data.get('mode') in ('gesture', 'letter'):
+                        state['mode'] = data['mode']
+                    if 'hand' in data:
+                        state['hand'] = data['hand']
+                    continue
+                landmarks = data['landmarks']
+                msg_mode = data.get('mode', msg_mode)
+                msg_hand = data.get('hand', msg_hand)
+                seq = data.get('seq', seq)
+            else:
+                continue
+
+            try:
+                _, payload = await inference_executor.run(
+                    _infer_landmarks, landmarks, msg_mode, msg_hand, session_id
+                )
+            except ExecutorSaturated as e:
+                payload = {'error': 'Inference queue is full, landmarks skipped', 'retry_after': e.retry_after}
+            except Exception as e:
+                logger.error("/ws/infer-landmarks error: %s\n%s", str(e), traceback.format_exc())
+                payload = {'error': str(e)}
+            payload.update({'mode': msg_mode, 'seq': seq})
+            await websocket.send_json(payload)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        temporal_smoothing.close_session(session_id)
+        logger.info(f"Landmark stream {session_id} closed ({received} messages)")
+
+
 @app.websocket("/ws/classroom/{room_id}/teacher")
 async def websocket_teacher(websocket: WebSocket, room_id: str):
     await manager.connect(websocket, room_id, is_teacher=True)
@@ -949,15 +1550,20 @@ async def websocket_teacher(websocket: WebSocket, room_id: str):
                     audio_base64 = data.get('audio')
                     text = transcribe_audio(audio_base64)
                     
-                    try:
-                        from services.revtrans import sentence_to_gloss_tokens as _sentence_to_gloss_tokens
-                        available_tokens = _list_available_video_tokens()
-                        gloss_tokens = _sentence_to_gloss_tokens(text, available_tokens=available_tokens)
-                    except Exception:
-                        gloss_tokens = _text_to_gloss_tokens(text)
+                    gloss_tokens = await _gloss_tokens_for_text(text)
                     
-                    fname, meta = compose_video_from_gloss(gloss_tokens)
-                    video_url = f"/outputs/{fname}"
+                    # Streamed so students see the first sign while later ones are prepared;
+                    # "response_mode": "playlist" sends the per-gloss clips and composes nothing
+                    playlist = None
+                    if data.get('response_mode') == 'playlist':
+                        playlist = await asyncio.to_thread(build_gloss_playlist, gloss_tokens)
+                        video_url, meta = None, {'duration_seconds': playlist['duration_seconds']}
+                    else:
+                        if data.get('stream', CLASSROOM_STREAMING):
+                            fname, meta = compose_video_streaming(gloss_tokens)
+                        else:
+                            fname, meta = compose_video_from_gloss(gloss_tokens)
+                        video_url = f"/outputs/{fname}"
                     
                     # Send caption to teacher
                     await websocket.send_json({
@@ -971,7 +1577,9 @@ async def websocket_teacher(websocket: WebSocket, room_id: str):
                     await manager.broadcast_to_room(room_id, {
                         'type': 'video_broadcast',
                         'video_url': video_url,
-                        'duration': meta.get('frames', 0) / meta.get('fps', 25),
+                        'duration': meta.get('duration_seconds', meta.get('frames', 0) / meta.get('fps', 25)),
+                        'streaming': meta.get('streaming', False),
+                        'playlist': playlist['clips'] if playlist else None,
                         'tokens': gloss_tokens,
                         'text': text
                     })
@@ -1020,6 +1628,23 @@ async def startup_event():
         logger.info("✅ Gesture model loaded")
     if letter_model:
         logger.info("✅ Letter model loaded")
+    # Parse the WLASL mapper off the event loop; the load time is logged when it finishes
+    asyncio.get_running_loop().run_in_executor(None, _preload_wlasl_fetcher)
+    output_janitor.start()
+    prepared_clip_janitor.start()
+    try:
+        from services.revtrans import open_llm_session
+        await open_llm_session()
+    except Exception as e:
+        logger.warning(f"⚠️ LLM HTTP session not opened: {e}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    try:
+        from services.revtrans import close_llm_session
+        await close_llm_session()
+    except Exception as e:
+        logger.warning(f"⚠️ LLM HTTP session not closed cleanly: {e}")
 
 if __name__ == "__main__":
     import uvicorn
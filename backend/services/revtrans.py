@@ -1,7 +1,11 @@
 # Convert text to gloss for video extraction and concatenation
 import os
 import logging
+import tempfile
 import openai
+from utils.gloss_batch import BatchGlossTranslator
+from utils.llm_client import AsyncLLMClient
+from utils.translation_cache import TranslationCache, normalize_text
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -22,54 +26,177 @@ openai.api_key = api_key
 logger.info("✅ OpenAI API key configured successfully")
 
 
+LLM_MODEL = "gpt-4o-mini"
+# Bump when a prompt changes so cached translations from the old prompt are not reused
+GLOSS_PROMPT_VERSION = 1
+ENGLISH_PROMPT_VERSION = 1
+# Batch answers come from a different prompt, so they get their own cache entries
+BATCH_GLOSS_PROMPT_VERSION = 1
+
+# Identical captions arrive repeatedly; remember translations in memory and on disk
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1").strip().lower() not in ("0", "false", "no", "off")
+translation_cache = TranslationCache(
+    os.getenv("LLM_CACHE_PATH", os.path.join(tempfile.gettempdir(), "llm_translation_cache.sqlite3")),
+    max_entries=int(os.getenv("LLM_CACHE_ENTRIES", "2048")),
+    ttl=float(os.getenv("LLM_CACHE_TTL", str(30 * 86400))),
+)
+
+
+def _cached(kind: str, text, prompt_version: int, temperature: float, compute, use_cache: bool):
+    if not LLM_CACHE_ENABLED:
+        return compute()
+    key = translation_cache.make_key(kind, text, LLM_MODEL, prompt_version, temperature)
+    return translation_cache.memoize(key, compute, bypass=not use_cache)
+
+
+def _chat(prompt: str, max_tokens: int, temperature: float) -> str:
+    """One chat completion; returns the reply text."""
+    response = openai.ChatCompletion.create(
+        model=LLM_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=max_tokens,
+        temperature=temperature
+    )
+    return response.choices[0].message.content
+
+
 # API Call
-def text_to_gloss(sentence: str):
-    logger.info("🤖 LLM Call: text_to_gloss - Input: %s", sentence)
-    prompt = f"""
+def text_to_gloss(sentence: str, use_cache: bool = True):
+    """English sentence to ASL gloss; ``use_cache=False`` skips the cached answer and refreshes it."""
+    return _cached("text_to_gloss", sentence, GLOSS_PROMPT_VERSION, 0.2,
+                   lambda: _text_to_gloss_llm(sentence), use_cache)
+
+
+def _gloss_prompt(sentence: str) -> str:
+    return f"""
     You are a sign language gloss generator.
     Convert the following English sentence into simplified ASL gloss (UPPERCASE keywords only, drop articles like 'the', 'is'):
     
     Sentence: "{sentence}"
     Output gloss:
     """
-    
-    response = openai.ChatCompletion.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=50,
-        temperature=0.2
-    )
-    
-    gloss = response.choices[0].message.content.strip()
+
+
+def _text_to_gloss_llm(sentence: str):
+    logger.info("🤖 LLM Call: text_to_gloss - Input: %s", sentence)
+    gloss = _chat(_gloss_prompt(sentence), max_tokens=50, temperature=0.2).strip()
     logger.info("✅ LLM Response: text_to_gloss - Output: %s", gloss)
     return gloss
 
 
-def gloss_to_english_llm(gloss_tokens):
+def gloss_to_english_llm(gloss_tokens, use_cache: bool = True):
     """Convert gloss tokens back to natural English sentence using LLM"""
-    logger.info("🤖 LLM Call: gloss_to_english_llm - Input: %s", gloss_tokens)
+    return _cached("gloss_to_english", gloss_tokens, ENGLISH_PROMPT_VERSION, 0.3,
+                   lambda: _gloss_to_english_llm(gloss_tokens), use_cache)
+
+
+def _english_prompt(gloss_tokens) -> str:
     gloss_string = ' '.join(gloss_tokens)
-    
-    prompt = f"""
+    return f"""
     You are a sign language interpreter. Convert the following ASL gloss tokens into a natural English sentence.
     
     Gloss tokens: {gloss_string}
     
     Provide a grammatically correct English sentence:
     """
-    
-    response = openai.ChatCompletion.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=100,
-        temperature=0.3
-    )
-    
-    sentence = response.choices[0].message.content.strip()
+
+
+def _gloss_to_english_llm(gloss_tokens):
+    logger.info("🤖 LLM Call: gloss_to_english_llm - Input: %s", gloss_tokens)
+    sentence = _chat(_english_prompt(gloss_tokens), max_tokens=100, temperature=0.3).strip()
     logger.info("✅ LLM Response: gloss_to_english_llm - Output: %s", sentence)
     return sentence
 
 
+# ----------------------------------------------------------------------------
+# Async variants for event-loop callers (FastAPI handlers, websockets). They go
+# through llm_client: bounded concurrency, timeouts, jittered retries, a
+# circuit breaker and coalescing of identical in-flight prompts. Callers fall
+# back to heuristic tokens on any exception, including CircuitOpenError.
+# ----------------------------------------------------------------------------
+
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+
+# openai 0.28 opens a new aiohttp ClientSession (new TCP + TLS) for every acreate()
+# unless openai.aiosession holds one. One shared session keeps connections alive.
+_llm_session = None
+
+
+async def open_llm_session():
+    """Create the shared aiohttp session; call once on the serving event loop (app startup)."""
+    global _llm_session
+    import aiohttp
+    if _llm_session is None or _llm_session.closed:
+        _llm_session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=LLM_MAX_CONCURRENCY))
+        logger.info("✅ LLM HTTP session opened (pool of %d connections)", LLM_MAX_CONCURRENCY)
+
+
+async def close_llm_session():
+    global _llm_session
+    if _llm_session is not None:
+        await _llm_session.close()
+        _llm_session = None
+
+
+async def _achat(prompt: str, max_tokens: int, temperature: float) -> str:
+    # aiosession is a ContextVar: set it for this task only, so the startup context need not propagate
+    token = openai.aiosession.set(_llm_session) if _llm_session is not None and not _llm_session.closed else None
+    try:
+        response = await openai.ChatCompletion.acreate(
+            model=LLM_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
+    finally:
+        if token is not None:
+            openai.aiosession.reset(token)
+    return response.choices[0].message.content
+
+
+llm_client = AsyncLLMClient(
+    _achat,
+    max_concurrency=LLM_MAX_CONCURRENCY,
+    timeout=float(os.getenv("LLM_TIMEOUT", "20")),
+    retries=int(os.getenv("LLM_RETRIES", "2")),
+    failure_threshold=int(os.getenv("LLM_BREAKER_THRESHOLD", "5")),
+    reset_after=float(os.getenv("LLM_BREAKER_RESET", "30")),
+)
+
+
+async def _acached(kind: str, text, prompt_version: int, temperature: float, compute, use_cache: bool):
+    if not LLM_CACHE_ENABLED:
+        return await compute()
+    key = translation_cache.make_key(kind, text, LLM_MODEL, prompt_version, temperature)
+    return await translation_cache.amemoize(key, compute, bypass=not use_cache)
+
+
+async def atext_to_gloss(sentence: str, use_cache: bool = True):
+    """Async text_to_gloss"""
+    async def compute():
+        logger.info("🤖 LLM Call: atext_to_gloss - Input: %s", sentence)
+        gloss = (await llm_client.complete(_gloss_prompt(sentence), 50, 0.2)).strip()
+        logger.info("✅ LLM Response: atext_to_gloss - Output: %s", gloss)
+        return gloss
+    return await _acached("text_to_gloss", sentence, GLOSS_PROMPT_VERSION, 0.2, compute, use_cache)
+
+
+async def agloss_to_english_llm(gloss_tokens, use_cache: bool = True):
+    """Async gloss_to_english_llm"""
+    async def compute():
+        logger.info("🤖 LLM Call: agloss_to_english_llm - Input: %s", gloss_tokens)
+        sentence = (await llm_client.complete(_english_prompt(gloss_tokens), 100, 0.3)).strip()
+        logger.info("✅ LLM Response: agloss_to_english_llm - Output: %s", sentence)
+        return sentence
+    return await _acached("gloss_to_english", gloss_tokens, ENGLISH_PROMPT_VERSION, 0.3, compute, use_cache)
+
+
+async def asentence_to_gloss_tokens(sentence, available_tokens=None, use_cache=True):
+    """Async sentence_to_gloss_tokens"""
+    return _gloss_tokens(await atext_to_gloss(sentence, use_cache=use_cache), available_tokens)
+
+
 import os
 import subprocess
 
@@ -79,11 +206,11 @@ import subprocess
 # Instead of storing videos locally, this loads them on-demand from the
 # WLASL JSON mapper, allowing access to 70k+ videos
 
-from dynamic_video_fetcher import WLASLVideoFetcher
+from services.dynamic_video_fetcher import get_fetcher
 
-# Initialize the WLASL fetcher (loads JSON mapper)
+# Shared WLASL fetcher (the mapper is parsed once per process and reloaded when it changes)
 try:
-    wlasl_fetcher = WLASLVideoFetcher()
+    wlasl_fetcher = get_fetcher()
     logger.info("✅ WLASL Video Fetcher initialized - access to 2000+ glosses")
 except Exception as e:
     logger.error(f"❌ Failed to initialize WLASL Fetcher: {e}")
@@ -105,8 +232,10 @@ def gloss_to_video_list(gloss_text, source="aslbrick", max_per_word=1):
     Returns:
         List of video file paths (from cache after download)
     """
-    if not wlasl_fetcher:
-        logger.error("❌ WLASL Fetcher not available - cannot fetch videos")
+    try:
+        fetcher = get_fetcher()
+    except Exception as e:
+        logger.error(f"❌ WLASL Fetcher not available - cannot fetch videos: {e}")
         return []
     
     words = gloss_text.lower().split()
@@ -119,7 +248,7 @@ def gloss_to_video_list(gloss_text, source="aslbrick", max_per_word=1):
             logger.info(f"  📹 Fetching videos for word: '{word}'")
             
             # Get videos for this word from WLASL
-            videos = wlasl_fetcher.get_video_paths_for_gloss(
+            videos = fetcher.get_video_paths_for_gloss(
                 word, 
                 source=source, 
                 max_videos=max_per_word
@@ -247,22 +376,74 @@ def concat_videos_speed(video_files, output_file, speed=1.0):
 
 
 # Function to convert sentence to gloss tokens
-def sentence_to_gloss_tokens(sentence, available_tokens=None):
+def sentence_to_gloss_tokens(sentence, available_tokens=None, use_cache=True):
     """Convert sentence to gloss and return tokens list"""
     logger.info("🤖 LLM Call: sentence_to_gloss_tokens - Input: %s", sentence)
-    gloss = text_to_gloss(sentence)
-    tokens = gloss.lower().split()
-    
-    # Filter by available tokens if provided
+    tokens = _gloss_tokens(text_to_gloss(sentence, use_cache=use_cache), available_tokens)
+    logger.info("✅ LLM Response: sentence_to_gloss_tokens - Output: %s", tokens)
+    return tokens
+
+
+def _gloss_tokens(gloss, available_tokens=None):
+    """Lower-cased gloss tokens, filtered by available tokens if provided"""
+    tokens = (gloss or '').lower().split()
     if available_tokens:
         original_count = len(tokens)
-        tokens = [token for token in tokens if token in available_tokens]
+        available = available_tokens if isinstance(available_tokens, (set, frozenset)) else set(available_tokens)
+        tokens = [token for token in tokens if token in available]
         logger.info("🔍 Filtered tokens from %d to %d based on available videos", original_count, len(tokens))
-    
-    logger.info("✅ LLM Response: sentence_to_gloss_tokens - Output: %s", tokens)
     return tokens
 
 
+# Transcripts: many sentences per LLM request, with a per-sentence fallback
+batch_translator = BatchGlossTranslator(
+    lambda prompt, max_tokens: _chat(prompt, max_tokens=max_tokens, temperature=0.2),
+    _text_to_gloss_llm,
+    batch_size=int(os.getenv("LLM_BATCH_SIZE", "20")),
+)
+
+
+def _gloss_key(sentence):
+    return translation_cache.make_key("text_to_gloss", sentence, LLM_MODEL, GLOSS_PROMPT_VERSION, 0.2)
+
+
+def _batch_gloss_key(sentence):
+    return translation_cache.make_key("texts_to_gloss", sentence, LLM_MODEL, BATCH_GLOSS_PROMPT_VERSION, 0.2)
+
+
+def texts_to_gloss(sentences, use_cache=True):
+    """Gloss for each sentence, in order, using as few LLM calls as possible ('' where translation failed)."""
+    results = [None] * len(sentences)
+    pending = {}  # normalised sentence -> indexes still to translate
+    for i, sentence in enumerate(sentences):
+        if LLM_CACHE_ENABLED and use_cache:
+            # Single-sentence answers may serve a batch; batch answers never serve text_to_gloss
+            hit = translation_cache.get(_gloss_key(sentence))
+            if hit is None:
+                hit = translation_cache.get(_batch_gloss_key(sentence))
+            if hit is not None:
+                results[i] = hit
+                continue
+        pending.setdefault(normalize_text(sentence), []).append(i)
+
+    if pending:
+        logger.info("🤖 LLM Call: texts_to_gloss - %d sentence(s), %d to translate", len(sentences), len(pending))
+        glosses = batch_translator.translate([sentences[idxs[0]] for idxs in pending.values()])
+        for idxs, gloss in zip(pending.values(), glosses):
+            if gloss and LLM_CACHE_ENABLED:
+                translation_cache.put(_batch_gloss_key(sentences[idxs[0]]), gloss)
+            for i in idxs:
+                results[i] = gloss
+    return results
+
+
+def sentences_to_gloss_tokens(sentences, available_tokens=None, use_cache=True):
+    """Batched sentence_to_gloss_tokens: one token list per sentence, in order"""
+    if available_tokens and not isinstance(available_tokens, (set, frozenset)):
+        available_tokens = set(available_tokens)
+    return [_gloss_tokens(gloss, available_tokens) for gloss in texts_to_gloss(sentences, use_cache=use_cache)]
+
+
 # Standalone execution (only when run directly)
 if __name__ == "__main__":
     print("\n" + "="*70)
@@ -0,0 +1,283 @@
+"""Stream-copy concatenation of gloss clips with ffmpeg.
+
+Re-encoding every frame through OpenCV makes each composition cost as much as
+decoding and encoding all of its clips. Most clips from one source already
+share a codec, resolution and frame rate, and those can be joined with the
+ffmpeg concat demuxer and ``-c copy``, which is a remux with no decoding.
+
+``ClipConcatenator`` probes each clip once with ffprobe (cached by path, size
+and mtime, up to ``max_probes`` entries). It picks the most common
+browser-playable stream layout as the target and re-encodes only the clips
+that differ. The layout includes the H.264 level, reference frame count and a
+hash of the codec extradata (SPS/PPS): clips joined with ``-c copy`` share
+one set of decoder parameters, so those must be identical as well. Those prepared clips are
+written to ``prepared_dir`` under a name derived from the source clip and the
+target, so after the first composition that uses a clip, later compositions
+are pure remuxes. If a prepared clip still does not match (e.g. a different
+H.264 profile or extradata), every clip is prepared with the same settings
+instead. ``prepared_dir`` is not pruned here; the apps run an OutputJanitor
+on it, and reusing a prepared clip refreshes its mtime for that sweep.
+
+Audio is dropped, as in the OpenCV path.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FFMPEG = os.getenv('FFMPEG_BIN', 'ffmpeg')
+FFPROBE = os.getenv('FFPROBE_BIN', 'ffprobe')
+
+# What <video> elements reliably play
+PLAYABLE_CODECS = {'h264'}
+PLAYABLE_PIX_FMTS = {'yuv420p', 'yuvj420p'}
+X264_PROFILES = {'high': 'high', 'main': 'main', 'constrained baseline': 'baseline', 'baseline': 'baseline'}
+
+
+class ClipInfo(NamedTuple):
+    codec: str
+    profile: str
+    width: int
+    height: int
+    fps: float
+    pix_fmt: str
+    time_base: str
+    frames: int
+    level: int = 0
+    refs: int = 0
+    extradata: str = ''
+
+    @property
+    def signature(self) -> tuple:
+        """Everything that has to match for two clips to be joined with ``-c copy``."""
+        return (self.codec, self.profile, self.width, self.height, self.fps, self.pix_fmt, self.time_base,
+                self.level, self.refs, self.extradata)
+
+    @property
+    def playable(self) -> bool:
+        return self.codec in PLAYABLE_CODECS and self.pix_fmt in PLAYABLE_PIX_FMTS
+
+
+def _parse_rate(rate: str) -> float:
+    try:
+        num, _, den = str(rate).partition('/')
+        value = float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+    return round(value, 3)
+
+
+def _parse_int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def parse_probe(output: str) -> ClipInfo:
+    """Parse ``ffprobe -of default=nw=1`` key=value output for the first video stream."""
+    fields: Dict[str, str] = {}
+    for line in output.splitlines():
+        key, sep, value = line.partition('=')
+        if sep and key not in fields:
+            fields[key.strip()] = value.strip()
+    if 'codec_name' not in fields:
+        raise ValueError("No video stream")
+    fps = _parse_rate(fields.get('avg_frame_rate')) or _parse_rate(fields.get('r_frame_rate')) or 25.0
+    try:
+        frames = int(fields.get('nb_frames', ''))
+    except ValueError:
+        try:
+            frames = int(round(float(fields.get('duration', '')) * fps))
+        except ValueError:
+            frames = 0
+    return ClipInfo(
+        codec=fields['codec_name'].lower(),
+        profile=fields.get('profile', '').lower(),
+        width=int(fields.get('width') or 0),
+        height=int(fields.get('height') or 0),
+        fps=fps,
+        pix_fmt=fields.get('pix_fmt', '').lower(),
+        time_base=fields.get('time_base', ''),
+        frames=frames,
+        level=_parse_int(fields.get('level')),
+        refs=_parse_int(fields.get('refs')),
+        extradata=fields.get('extradata_hash', ''),
+    )
+
+
+def plan_concat(infos: List[ClipInfo]) -> Tuple[tuple, List[bool]]:
+    """Choose the target signature and which clips must be re-encoded to match it.
+
+    The target is the most common playable signature (ties go to the earliest
+    clip). If no clip is playable, the first clip's size and frame rate are
+    kept and every clip is re-encoded to H.264. Only the first seven fields of
+    such a target (up to the time base) are used by ``prepare``.
+    """
+    playable = [i.signature for i in infos if i.playable]
+    if playable:
+        counts = Counter(playable)
+        best = max(counts.values())
+        target = next(sig for sig in playable if counts[sig] == best)
+    else:
+        first = infos[0]
+        # x264 needs even dimensions
+        target = ('h264', 'high', first.width - first.width % 2, first.height - first.height % 2,
+                  first.fps, 'yuv420p', '', 0, 0, '')
+    return target, [i.signature != target for i in infos]
+
+
+class ClipConcatenator:
+    def __init__(self, prepared_dir: str, timeout: float = 120.0, crf: int = 23, preset: str = 'veryfast',
+                 max_probes: int = 4096):
+        self.prepared_dir = prepared_dir
+        self.timeout = timeout
+        self.crf = crf
+        self.preset = preset
+        self.max_probes = max_probes
+        self._probes: "OrderedDict[tuple, ClipInfo]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._available: Optional[bool] = None
+        self._stats = Counter()
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def available(self) -> bool:
+        if self._available is None:
+            self._available = bool(shutil.which(FFMPEG) and shutil.which(FFPROBE))
+            if not self._available:
+                logger.warning("⚠️ ffmpeg/ffprobe not found; clips will be re-encoded with OpenCV")
+        return self._available
+
+    def _run(self, cmd: List[str]) -> str:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=self.timeout)
+        if result.returncode != 0:
+            raise RuntimeError(f"{os.path.basename(cmd[0])} failed: {result.stderr.strip()[-500:]}")
+        return result.stdout
+
+    def probe(self, path: str) -> ClipInfo:
+        st = os.stat(path)
+        key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            info = self._probes.get(key)
+            if info is not None:
+                self._probes.move_to_end(key)
+        if info is not None:
+            self._count('probe_cache_hits')
+            return info
+        out = self._run([FFPROBE, '-v', 'error', '-select_streams', 'v:0', '-show_data_hash', 'sha256',
+                         '-show_entries', 'stream=codec_name,profile,level,refs,width,height,avg_frame_rate,'
+                                          'r_frame_rate,pix_fmt,time_base,nb_frames,duration,extradata_hash',
+                         '-of', 'default=nw=1', path])
+        info = parse_probe(out)
+        with self._lock:
+            self._probes[key] = info
+            while len(self._probes) > self.max_probes:
+                self._probes.popitem(last=False)
+        self._count('probes')
+        return info
+
+    def prepare(self, path: str, target: tuple) -> str:
+        """Re-encode ``path`` to the ``target`` signature once; later calls return the cached file."""
+        codec, profile, width, height, fps, pix_fmt, time_base = target[:7]
+        st = os.stat(path)
+        digest = hashlib.sha1(repr((os.path.abspath(path), st.st_size, st.st_mtime_ns, target)).encode()).hexdigest()
+        prepared = os.path.join(self.prepared_dir, f"{digest}.mp4")
+        try:
+            pst = os.stat(prepared)
+        except OSError:
+            pst = None
+        if pst is not None and pst.st_size > 0:
+            # Mark it used so the janitor's age-based sweep keeps it. Refresh at most once a
+            # minute, since a new mtime also misses the probe cache.
+            if time.time() - pst.st_mtime > 60:
+                try:
+                    os.utime(prepared)
+                except OSError:
+                    pass
+            self._count('prepared_reused')
+            return prepared
+
+        os.makedirs(self.prepared_dir, exist_ok=True)
+        tmp = os.path.join(self.prepared_dir, f".{digest}.{uuid.uuid4().hex[:8]}.mp4")
+        vf = (f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+              f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,fps={fps},format=yuv420p")
+        cmd = [FFMPEG, '-y', '-v', 'error', '-i', path, '-map', '0:v:0', '-an', '-vf', vf,
+               '-c:v', 'libx264', '-preset', self.preset, '-crf', str(self.crf),
+               '-profile:v', X264_PROFILES.get(profile, 'high')]
+        denominator = time_base.partition('/')[2]
+        if denominator.isdigit():
+            cmd += ['-video_track_timescale', denominator]
+        try:
+            self._run(cmd + [tmp])
+            os.replace(tmp, prepared)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self._count('prepared')
+        return prepared
+
+    def _copy_concat(self, files: List[str], out_path: str):
+        list_file = f"{out_path}.concat.txt"
+        with open(list_file, 'w', encoding='utf-8') as f:
+            for p in files:
+                escaped = os.path.abspath(p).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        try:
+            self._run([FFMPEG, '-y', '-v', 'error', '-f', 'concat', '-safe', '0', '-i', list_file,
+                       '-map', '0:v:0', '-an', '-c', 'copy', '-movflags', '+faststart', out_path])
+        finally:
+            os.remove(list_file)
+
+    def concat(self, files: List[str], out_path: str) -> dict:
+        """Join ``files`` into ``out_path``; returns meta like the OpenCV path. Raises RuntimeError on failure."""
+        infos = []
+        for p in files:
+            try:
+                infos.append((p, self.probe(p)))
+            except (RuntimeError, ValueError, OSError) as e:
+                logger.warning(f"Skip unreadable clip {p}: {e}")
+        if not infos:
+            raise RuntimeError("No readable clips to concatenate")
+
+        target, mismatched = plan_concat([i for _, i in infos])
+        inputs = []
+        for (path, info), needs_prep in zip(infos, mismatched):
+            if needs_prep:
+                path = self.prepare(path, target)
+                info = self.probe(path)
+            inputs.append((path, info))
+
+        if any(info.signature != target for _, info in inputs):
+            # The encoder could not reproduce the source layout; prepare everything identically
+            logger.info("🔁 Prepared clips differ from the source layout; normalising all clips")
+            target = ('h264', 'high', *target[2:5], 'yuv420p', target[6], 0, 0, '')
+            inputs = [(self.prepare(p, target), None) for p, _ in infos]
+            inputs = [(p, self.probe(p)) for p, _ in inputs]
+            mismatched = [True] * len(inputs)
+            if len({info.signature for _, info in inputs}) > 1:
+                raise RuntimeError("Prepared clips still differ in their stream parameters")
+
+        self._copy_concat([p for p, _ in inputs], out_path)
+        self._count('concats')
+        normalized = sum(mismatched)
+        logger.info(f"✅ Stream-copied {len(inputs)} clip(s), {normalized} re-encoded")
+        return {
+            'fps': target[4], 'width': target[2], 'height': target[3],
+            'frames': sum(info.frames for _, info in inputs),
+            'codec': 'h264', 'method': 'stream_copy', 'normalized': normalized,
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'available': self.available(), 'probe_cache': len(self._probes), **self._stats}
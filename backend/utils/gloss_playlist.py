@@ -0,0 +1,65 @@
+"""Per-gloss clip playlists: ordered clip URLs instead of one composed video.
+
+A client that can play clips back to back does not need a composition. The
+server only fetches each token's raw clip and returns its URL and duration.
+Playlist playback needs no common stream layout, so no ingest transcode runs.
+
+Clip URLs are ``/gloss-clip/<clip_id>?v=<version>``. The version is taken from
+the file's size and mtime. The same id can later be served from different
+bytes, for example when its raw clip has been replaced by the canonical copy
+or evicted and downloaded again. Only a request whose version still matches a
+file may be cached by the browser. Any other request gets the current file
+with ``no-cache``.
+"""
+import hashlib
+import os
+from typing import Callable, Iterable, List, Optional, Tuple
+
+# Cache lifetime of a /gloss-clip response whose version matched
+CLIP_MAX_AGE = 86400
+
+
+def clip_version(path: str) -> str:
+    st = os.stat(path)
+    return hashlib.sha1(f"{st.st_size}:{st.st_mtime_ns}".encode()).hexdigest()[:12]
+
+
+def clip_url(clip_id: str, path: str) -> str:
+    return f"/gloss-clip/{clip_id}?v={clip_version(path)}"
+
+
+def build_playlist(tokens: List[str], clip_for: Callable[[str], Optional[str]],
+                   duration_of: Callable[[str], float]) -> dict:
+    """{'clips': [{token, url, duration}], 'missing': [...], 'duration_seconds': float} for ``tokens`` in order.
+
+    ``clip_for(token)`` returns a local clip path or None. Raises FileNotFoundError if no token has a clip.
+    """
+    clips, missing = [], []
+    for name in tokens:
+        path = clip_for(name)
+        if not path:
+            missing.append(name)
+            continue
+        clip_id = os.path.splitext(os.path.basename(path))[0]
+        clips.append({'token': name, 'url': clip_url(clip_id, path), 'duration': round(duration_of(path), 3)})
+    if not clips:
+        raise FileNotFoundError(f"No matching video clips found for tokens: {tokens}")
+    return {'clips': clips, 'missing': missing,
+            'duration_seconds': round(sum(c['duration'] for c in clips), 3)}
+
+
+def find_clip(candidates: Iterable[Optional[str]], version: Optional[str] = None) -> Tuple[Optional[str], bool]:
+    """Pick the file to serve for a clip request.
+
+    ``candidates`` are the clip's local files, most preferred first; missing
+    ones may be None. Returns (path, exact). ``exact`` is True when ``path`` is
+    the file named by ``version``, so it may be cached. Otherwise ``path`` is
+    the first existing candidate and exact is False. Returns (None, False)
+    when there is no file.
+    """
+    existing = [p for p in candidates if p and os.path.isfile(p)]
+    if version:
+        for path in existing:
+            if clip_version(path) == version:
+                return path, True
+    return (existing[0], False) if existing else (None, False)
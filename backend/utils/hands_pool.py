@@ -0,0 +1,180 @@
+"""Pool of pre-warmed MediaPipe Hands graphs shared by the inference routes.
+
+Building a ``mp.solutions.hands.Hands`` graph is far more expensive than running
+it on a single frame, so the servers keep a fixed number of instances alive and
+check them out per request instead of constructing one per frame.
+"""
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _default_hands_factory(max_num_hands: int, static_image_mode: bool,
+                           min_detection_confidence: float, min_tracking_confidence: float):
+    import mediapipe as mp
+    return mp.solutions.hands.Hands(static_image_mode=static_image_mode,
+                                    max_num_hands=max_num_hands,
+                                    min_detection_confidence=min_detection_confidence,
+                                    min_tracking_confidence=min_tracking_confidence)
+
+
+class _Checkout:
+    """A checked-out graph; records whether ``process()`` raised."""
+
+    def __init__(self, hands):
+        self._hands = hands
+        self.failed = False
+
+    def process(self, image):
+        try:
+            return self._hands.process(image)
+        except Exception:
+            self.failed = True
+            raise
+
+    def __getattr__(self, name):
+        return getattr(self._hands, name)
+
+
+class HandsPool:
+    """Fixed-size pool of MediaPipe ``Hands`` instances.
+
+    Instances are created and warmed up once, then handed out with ``acquire()``
+    and returned when the ``with`` block exits. ``static_image_mode`` defaults to
+    True so a pooled graph never carries tracking state (or timestamps) from one
+    client's frame into another's.
+    """
+
+    def __init__(self, size: int = 2, max_num_hands: int = 2, static_image_mode: bool = True,
+                 min_detection_confidence: float = 0.7, min_tracking_confidence: float = 0.7,
+                 name: str = "hands", factory: Optional[Callable] = None, warmup: bool = True):
+        if size < 1:
+            raise ValueError("HandsPool size must be >= 1")
+        self.name = name
+        self.size = size
+        self.max_num_hands = max_num_hands
+        self.static_image_mode = static_image_mode
+        self.min_detection_confidence = min_detection_confidence
+        self.min_tracking_confidence = min_tracking_confidence
+        self._factory = factory or _default_hands_factory
+        self._warmup = warmup
+        self._queue: "queue.Queue" = queue.Queue(maxsize=size)
+        self._lock = threading.Lock()
+        self._closed = False
+
+        # Metrics
+        self._checkouts = 0
+        self._timeouts = 0
+        self._replaced = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+        t0 = time.perf_counter()
+        for _ in range(size):
+            self._queue.put(self._create())
+        logger.info("✅ HandsPool '%s' ready: %d instance(s), max_num_hands=%d (%.0f ms)",
+                    name, size, max_num_hands, (time.perf_counter() - t0) * 1000)
+
+    def _create(self):
+        hands = self._factory(self.max_num_hands, self.static_image_mode,
+                              self.min_detection_confidence, self.min_tracking_confidence)
+        if self._warmup:
+            # Run one blank frame through the graph so the first real request
+            # does not pay for lazy initialisation inside MediaPipe.
+            hands.process(np.zeros((64, 64, 3), dtype=np.uint8))
+        return hands
+
+    @contextmanager
+    def acquire(self, timeout: Optional[float] = None):
+        """Check out a ``Hands`` instance for the duration of the ``with`` block.
+
+        Raises TimeoutError if no instance frees up within ``timeout`` seconds.
+        """
+        if self._closed:
+            raise RuntimeError(f"HandsPool '{self.name}' is closed")
+        t0 = time.perf_counter()
+        try:
+            hands = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            with self._lock:
+                self._timeouts += 1
+            raise TimeoutError(f"No free MediaPipe instance in pool '{self.name}' after {timeout}s")
+        waited = time.perf_counter() - t0
+        with self._lock:
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+        if hands is None:
+            # A slot whose replacement failed earlier; build it now, keeping the slot on failure
+            try:
+                hands = self._create()
+            except Exception:
+                self._queue.put(None)
+                raise
+            with self._lock:
+                self._replaced += 1
+
+        checkout = _Checkout(hands)
+        try:
+            yield checkout
+        finally:
+            if checkout.failed:
+                # Only a graph that raised inside process() may be left in a bad state;
+                # errors in the caller's own code (classifier, numpy) do not touch it.
+                try:
+                    hands.close()
+                except Exception:
+                    pass
+                try:
+                    hands = self._create()
+                    with self._lock:
+                        self._replaced += 1
+                except Exception as e:
+                    # Keep the slot: the next checkout of the placeholder retries the build
+                    logger.error("❌ HandsPool '%s' could not replace instance: %s", self.name, e)
+                    hands = None
+            if self._closed:
+                if hands is not None:
+                    hands.close()
+            else:
+                self._queue.put(hands)
+
+    def stats(self) -> dict:
+        """Return pool size and wait-time metrics for status endpoints."""
+        with self._lock:
+            checkouts = self._checkouts
+            return {
+                'size': self.size,
+                'available': self._queue.qsize(),
+                'in_use': self.size - self._queue.qsize(),
+                'max_num_hands': self.max_num_hands,
+                'static_image_mode': self.static_image_mode,
+                'checkouts': checkouts,
+                'timeouts': self._timeouts,
+                'replaced': self._replaced,
+                'avg_wait_ms': (self._wait_total / checkouts * 1000) if checkouts else 0.0,
+                'max_wait_ms': self._wait_max * 1000,
+            }
+
+    def close(self):
+        """Close every idle instance; checked-out ones are closed on return."""
+        self._closed = True
+        while True:
+            try:
+                hands = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if hands is None:
+                continue
+            try:
+                hands.close()
+            except Exception:
+                pass
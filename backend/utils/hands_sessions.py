@@ -0,0 +1,206 @@
+"""Per-client MediaPipe Hands trackers kept alive across frames.
+
+A pooled static-image graph re-runs palm detection on every frame. When a client
+sends a stable ``session_id`` with each frame we instead keep one video-mode
+(``static_image_mode=False``) graph per client, so MediaPipe can follow the hands
+with its cheap tracking path. Idle sessions are evicted after ``idle_ttl``
+seconds and the oldest session is dropped once ``max_sessions`` is reached.
+
+Session ids come from clients, so they are limited to ``SESSION_ID_PATTERN``
+and each client (an address or socket, passed as ``client``) may only create
+``max_creations`` trackers per ``creation_window`` seconds. A client that keeps
+inventing ids gets ``SessionLimitError`` and falls back to the shared pool
+instead of evicting everyone else's trackers.
+"""
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from utils.hands_pool import _default_hands_factory
+
+logger = logging.getLogger(__name__)
+
+SESSION_ID_PATTERN = re.compile(r'[A-Za-z0-9_.:-]{1,64}')
+
+
+class SessionLimitError(RuntimeError):
+    """Raised when a client creates trackers faster than the registry allows."""
+
+
+def clean_session_id(value) -> Optional[str]:
+    """Return the stripped session id, or None if it is empty or not a valid id."""
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    return value if SESSION_ID_PATTERN.fullmatch(value) else None
+
+
+class _TrackerSession:
+    def __init__(self, hands):
+        self.hands = hands
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self.frames = 0
+        self.closed = False
+
+
+class HandsSessionRegistry:
+    """Registry of per-session ``Hands`` trackers with idle eviction.
+
+    Sessions are keyed by ``(session_id, max_num_hands)`` so the gesture and
+    letter paths of one client each get their own tracker.
+    """
+
+    def __init__(self, idle_ttl: float = 60.0, max_sessions: int = 64,
+                 min_detection_confidence: float = 0.7, min_tracking_confidence: float = 0.7,
+                 factory: Optional[Callable] = None, max_creations: int = 8, creation_window: float = 60.0):
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self.max_creations = max_creations
+        self.creation_window = creation_window
+        self.min_detection_confidence = min_detection_confidence
+        self.min_tracking_confidence = min_tracking_confidence
+        self._factory = factory or _default_hands_factory
+        self._sessions: "OrderedDict[tuple, _TrackerSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Keys whose graph is being built, so concurrent first frames build it once
+        self._creating: Dict[tuple, threading.Event] = {}
+        # client -> monotonic times of its recent creations
+        self._creations: Dict[str, deque] = {}
+
+        # Metrics
+        self._created = 0
+        self._evicted = 0
+        self._rate_limited = 0
+
+    def _close(self, session: _TrackerSession):
+        # Wait for an in-flight frame on this tracker before tearing it down
+        with session.lock:
+            session.closed = True
+            try:
+                session.hands.close()
+            except Exception:
+                pass
+
+    def evict_idle(self) -> int:
+        """Close sessions idle for longer than ``idle_ttl``. Returns how many were evicted."""
+        now = time.monotonic()
+        with self._lock:
+            stale = [k for k, s in self._sessions.items() if now - s.last_used > self.idle_ttl]
+            removed = [self._sessions.pop(k) for k in stale]
+            self._evicted += len(removed)
+            for client in list(self._creations):
+                self._recent_creations(client, now)
+        for session in removed:
+            self._close(session)
+        if removed:
+            logger.info("🧹 Evicted %d idle hand-tracking session(s)", len(removed))
+        return len(removed)
+
+    @contextmanager
+    def acquire(self, session_id: str, max_num_hands: int = 2, client: Optional[str] = None):
+        """Yield the tracker for ``session_id``, creating it on first use.
+
+        Frames for one session are processed one at a time so the tracker sees
+        them in order. Raises ValueError for an invalid id and SessionLimitError
+        when ``client`` has used up its creation budget.
+        """
+        if clean_session_id(session_id) != session_id:
+            raise ValueError("Invalid session_id")
+        self.evict_idle()
+        key = (session_id, max_num_hands)
+        while True:
+            session = self._get_or_create(key, max_num_hands, client)
+            with session.lock:
+                if session.closed:
+                    # Evicted between lookup and lock; look it up again
+                    continue
+                session.last_used = time.monotonic()
+                session.frames += 1
+                yield session.hands
+                return
+
+    def _recent_creations(self, client: str, now: float) -> deque:
+        # Caller holds self._lock
+        times = self._creations.setdefault(client, deque())
+        while times and now - times[0] > self.creation_window:
+            times.popleft()
+        if not times:
+            del self._creations[client]
+        return times
+
+    def _get_or_create(self, key: tuple, max_num_hands: int, client: Optional[str]) -> _TrackerSession:
+        while True:
+            with self._lock:
+                session = self._sessions.get(key)
+                if session is not None:
+                    self._sessions.move_to_end(key)
+                    return session
+                building = self._creating.get(key)
+                if building is None:
+                    if client is not None:
+                        now = time.monotonic()
+                        times = self._recent_creations(client, now)
+                        if len(times) >= self.max_creations:
+                            self._rate_limited += 1
+                            raise SessionLimitError(f"Too many new hand-tracking sessions from {client}")
+                        times.append(now)
+                        self._creations[client] = times
+                    building = self._creating[key] = threading.Event()
+                    break
+            # Another frame of this session is building the graph; use its result
+            building.wait()
+
+        # Graph construction takes a while, so it runs without the registry lock
+        try:
+            session = _TrackerSession(self._factory(max_num_hands, False,
+                                                    self.min_detection_confidence,
+                                                    self.min_tracking_confidence))
+        except BaseException:
+            with self._lock:
+                self._creating.pop(key).set()
+            raise
+        overflow = []
+        with self._lock:
+            self._sessions[key] = session
+            self._created += 1
+            while len(self._sessions) > self.max_sessions:
+                overflow.append(self._sessions.popitem(last=False)[1])
+                self._evicted += 1
+            self._creating.pop(key).set()
+        for old in overflow:
+            self._close(old)
+        return session
+
+    def close_session(self, session_id: str) -> int:
+        """Close every tracker belonging to ``session_id``."""
+        with self._lock:
+            keys = [k for k in self._sessions if k[0] == str(session_id)]
+            removed = [self._sessions.pop(k) for k in keys]
+        for session in removed:
+            self._close(session)
+        return len(removed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'active_sessions': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                'idle_ttl_seconds': self.idle_ttl,
+                'created': self._created,
+                'evicted': self._evicted,
+                'rate_limited': self._rate_limited,
+                'max_creations_per_client': self.max_creations,
+                'creation_window_seconds': self.creation_window,
+            }
+
+    def close(self):
+        with self._lock:
+            removed = list(self._sessions.values())
+            self._sessions.clear()
+        for session in removed:
+            self._close(session)
@@ -0,0 +1,89 @@
+"""Bounded worker pool for CPU-bound inference called from async handlers.
+
+Image decoding, MediaPipe and sklearn are synchronous and hold the CPU for tens
+of milliseconds; running them inside a coroutine stalls the event loop (and every
+WebSocket on it). ``BoundedExecutor.run`` hands the work to a fixed thread pool
+and rejects new work once ``max_workers + max_queue`` jobs are already admitted,
+so callers can answer 503 + Retry-After instead of queueing without limit.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ExecutorSaturated(RuntimeError):
+    """Raised when the executor queue is full."""
+
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(f"Inference queue '{name}' is full")
+        self.retry_after = retry_after
+
+
+class BoundedExecutor:
+    def __init__(self, max_workers: int = 4, max_queue: int = 16, retry_after: int = 1,
+                 name: str = "inference"):
+        self.name = name
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue = max(0, int(max_queue))
+        self.retry_after = retry_after
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def _call(self, enqueued_at: float, fn, args, kwargs):
+        with self._lock:
+            self._in_flight += 1
+            self._wait_total += time.monotonic() - enqueued_at
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    async def run(self, fn, *args, **kwargs):
+        """Run ``fn(*args, **kwargs)`` on the pool; raise ExecutorSaturated if the queue is full."""
+        with self._lock:
+            if self._admitted >= self.capacity:
+                self._rejected += 1
+                raise ExecutorSaturated(self.name, self.retry_after)
+            self._admitted += 1
+        job = self._pool.submit(self._call, time.monotonic(), fn, args, kwargs)
+        # Release the slot when the job really finishes (or is cancelled before starting),
+        # not when an impatient caller stops awaiting it
+        job.add_done_callback(self._release)
+        return await asyncio.wrap_future(job)
+
+    def _release(self, job):
+        with self._lock:
+            self._admitted -= 1
+            if job.cancelled() or job.exception() is not None:
+                self._failed += 1
+            else:
+                self._completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            started = self._completed + self._failed + self._in_flight
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'in_flight': self._in_flight,
+                'queue_depth': max(0, self._admitted - self._in_flight),
+                'completed': self._completed,
+                'failed': self._failed,
+                'rejected': self._rejected,
+                'avg_queue_wait_ms': (self._wait_total / started * 1000) if started else 0.0,
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
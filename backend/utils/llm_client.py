@@ -0,0 +1,201 @@
+"""Async chat-completion client with bounded concurrency, retries and a circuit breaker.
+
+The blocking OpenAI calls in revtrans held a FastAPI event loop (and every
+websocket on it) for the whole LLM round trip, with no timeout. ``AsyncLLMClient``
+wraps an async ``transport(prompt, max_tokens, temperature) -> str`` and adds
+the following:
+
+- a semaphore, so at most ``max_concurrency`` requests are in flight;
+- a per-attempt ``timeout``, and up to ``retries`` extra attempts with full
+  jitter backoff (a random delay up to ``backoff * 2**attempt``, capped at
+  ``max_backoff``);
+- request coalescing, so identical in-flight prompts share one request; if
+  the caller that issued it is cancelled, the next waiter re-issues it;
+- a circuit breaker: after ``failure_threshold`` consecutive failed requests
+  every call raises ``CircuitOpenError`` at once for ``reset_after`` seconds,
+  then a single trial request decides whether to close it again.
+
+Only transient failures (timeouts, connection errors, HTTP 429 and 5xx; see
+``is_transient_error``) are retried and count towards the breaker. A 400 or an
+authentication error fails straight away, and it shows the service is up.
+
+Callers treat ``CircuitOpenError`` like any other LLM failure and fall back to
+heuristic tokenisation, so an outage costs nothing but gloss quality.
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Transport exceptions without a status code that still mean "try again later"
+# (openai 0.28 / 1.x and aiohttp names; matched anywhere in the class hierarchy)
+_TRANSIENT_NAMES = {
+    'APIConnectionError', 'APITimeoutError', 'Timeout', 'ServiceUnavailableError', 'RateLimitError',
+    'TryAgain', 'ClientConnectionError', 'ServerDisconnectedError', 'ClientPayloadError',
+}
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class _LeaderCancelled(RuntimeError):
+    """Set on a coalesced request whose issuing caller was cancelled."""
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """True for timeouts, connection failures, HTTP 429 and 5xx."""
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    if any(cls.__name__ in _TRANSIENT_NAMES for cls in type(exc).__mro__):
+        return True
+    for attr in ('http_status', 'status_code', 'status'):
+        status = getattr(exc, attr, None)
+        if isinstance(status, int):
+            return status == 429 or status >= 500
+    return False
+
+
+class AsyncLLMClient:
+    def __init__(self, transport: Callable[[str, int, float], Awaitable[str]], max_concurrency: int = 8,
+                 timeout: float = 20.0, retries: int = 2, backoff: float = 0.5, max_backoff: float = 8.0,
+                 failure_threshold: int = 5, reset_after: float = 30.0,
+                 is_transient: Callable[[BaseException], bool] = is_transient_error):
+        self.transport = transport
+        self.is_transient = is_transient
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.timeout = timeout
+        self.retries = max(0, int(retries))
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_after = reset_after
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop = None
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+        self._active = 0
+        self._counters = {'requests': 0, 'coalesced': 0, 'attempts': 0, 'retries': 0, 'timeouts': 0,
+                          'failures': 0, 'rejected': 0, 'short_circuited': 0, 'circuit_opened': 0,
+                          'reissued': 0}
+
+    def _bind_loop(self):
+        # Semaphores and futures belong to one event loop; rebuild them if the loop changed
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._inflight = {}
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return 'closed'
+        if self._trial or time.monotonic() - self._opened_at >= self.reset_after:
+            return 'half_open'
+        return 'open'
+
+    def _admit(self):
+        """Raise CircuitOpenError unless a request may go out now."""
+        if self._opened_at is None:
+            return
+        if time.monotonic() - self._opened_at < self.reset_after or self._trial:
+            self._counters['short_circuited'] += 1
+            raise CircuitOpenError(f"LLM circuit open after {self._failures} consecutive failures")
+        self._trial = True
+
+    def _record(self, ok: bool):
+        self._trial = False
+        if ok:
+            if self._opened_at is not None:
+                logger.info("✅ LLM circuit closed")
+            self._failures = 0
+            self._opened_at = None
+            return
+        self._failures += 1
+        self._counters['failures'] += 1
+        if self._opened_at is not None or self._failures >= self.failure_threshold:
+            if self._opened_at is None:
+                self._counters['circuit_opened'] += 1
+                logger.warning(f"⚠️ LLM circuit opened after {self._failures} consecutive failures")
+            self._opened_at = time.monotonic()
+
+    async def complete(self, prompt: str, max_tokens: int, temperature: float) -> str:
+        self._bind_loop()
+        key = (prompt, max_tokens, round(float(temperature), 3))
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._counters['coalesced'] += 1
+            try:
+                return await asyncio.shield(pending)
+            except _LeaderCancelled:
+                # Whoever issued the request went away; this caller still wants the answer
+                self._counters['reissued'] += 1
+                return await self.complete(prompt, max_tokens, temperature)
+
+        self._admit()
+        self._counters['requests'] += 1
+        future = self._loop.create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._call(prompt, max_tokens, temperature)
+        except asyncio.CancelledError:
+            self._trial = False
+            # Waiters must not see CancelledError (a BaseException their fallbacks do not catch)
+            future.set_exception(_LeaderCancelled("coalesced LLM request was cancelled"))
+            future.exception()
+            raise
+        except Exception as e:
+            if self.is_transient(e):
+                self._record(False)
+            else:
+                # The service answered; a bad request says nothing about its health
+                self._counters['rejected'] += 1
+                self._record(True)
+            future.set_exception(e)
+            # Mark retrieved so an uncoalesced failure is not logged as "never retrieved"
+            future.exception()
+            raise
+        else:
+            self._record(True)
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _call(self, prompt: str, max_tokens: int, temperature: float) -> str:
+        attempt = 0
+        while True:
+            self._counters['attempts'] += 1
+            try:
+                async with self._semaphore:
+                    self._active += 1
+                    try:
+                        return await asyncio.wait_for(self.transport(prompt, max_tokens, temperature), self.timeout)
+                    finally:
+                        self._active -= 1
+            except asyncio.TimeoutError:
+                self._counters['timeouts'] += 1
+                if attempt >= self.retries:
+                    raise
+            except Exception as e:
+                if attempt >= self.retries or not self.is_transient(e):
+                    raise
+            self._counters['retries'] += 1
+            await asyncio.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+            attempt += 1
+
+    def stats(self) -> dict:
+        return {
+            **self._counters,
+            'state': self.state,
+            'consecutive_failures': self._failures,
+            'active': self._active,
+            'max_concurrency': self.max_concurrency,
+            'timeout_seconds': self.timeout,
+        }
@@ -0,0 +1,205 @@
+"""Background retention for generated videos in the outputs directory.
+
+Every reverse translation writes a new ``reverse_<timestamp>.mp4`` and nothing
+removed them. ``OutputJanitor`` sweeps the directory every ``interval`` seconds
+and applies one rule per filename prefix:
+
+- ``reverse_*`` are one-off results: short TTL plus a total size cap;
+- ``seg_*`` are content-addressed segment renders that later requests reuse,
+  so they get a longer TTL and their own cap.
+
+Entries may also be directories (``hls_*`` streaming playlists); their size
+is the total of their files and their age runs from the newest file. A rule
+with an empty prefix covers the whole directory (the prepared-clip cache)
+except hidden entries, which are files still being written.
+
+Age is measured from the last time the file was written or served, so a
+popular segment keeps living. Size caps drop the oldest files first. Files
+younger than ``min_age`` (a URL may just have been handed out) and files held
+by ``lease()`` (an open download in ``serve_output_file``) are never removed.
+"""
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RetentionRule:
+    def __init__(self, prefix: str, ttl: float, max_bytes: int):
+        self.prefix = prefix
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+
+class OutputJanitor:
+    def __init__(self, output_dir: str, rules, interval: float = 300.0, min_age: float = 120.0):
+        self.output_dir = output_dir
+        self.rules = list(rules)
+        self.interval = interval
+        self.min_age = min_age
+        self._leases: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._sweeps = 0
+        self._removed = 0
+        self._removed_bytes = 0
+        self._skipped_in_use = 0
+
+    @contextmanager
+    def lease(self, filename: str):
+        """Protect ``filename`` from deletion while the block runs."""
+        self.acquire(filename)
+        try:
+            yield
+        finally:
+            self.release(filename)
+
+    @staticmethod
+    def _entry_name(filename: str) -> str:
+        # Leases apply to the top-level entry, e.g. "hls_x" for "hls_x/part_001.ts"
+        return filename.replace('\\', '/').lstrip('/').split('/', 1)[0]
+
+    def acquire(self, filename: str):
+        name = self._entry_name(filename)
+        with self._lock:
+            self._leases[name] = self._leases.get(name, 0) + 1
+        # Serving counts as use, so TTLs run from the last access
+        try:
+            os.utime(os.path.join(self.output_dir, filename))
+        except OSError:
+            pass
+
+    def release(self, filename: str):
+        name = self._entry_name(filename)
+        with self._lock:
+            count = self._leases.get(name, 0) - 1
+            if count > 0:
+                self._leases[name] = count
+            else:
+                self._leases.pop(name, None)
+
+    def _in_use(self, name: str) -> bool:
+        with self._lock:
+            return name in self._leases
+
+    def _remove(self, name: str, size: int) -> bool:
+        # Re-check right before deleting; a download may have started since the scan
+        if self._in_use(name):
+            self._skipped_in_use += 1
+            return False
+        path = os.path.join(self.output_dir, name)
+        try:
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logger.warning(f"⚠️ Could not remove output {name}: {e}")
+            return False
+        self._removed += 1
+        self._removed_bytes += size
+        return True
+
+    @staticmethod
+    def _entry_stat(path: str):
+        """(mtime, size) of a file, or of the newest file / total size of a directory."""
+        st = os.stat(path)
+        if not os.path.isdir(path):
+            return st.st_mtime, st.st_size
+        mtime, size = st.st_mtime, 0
+        for root, _, names in os.walk(path):
+            for n in names:
+                try:
+                    fst = os.stat(os.path.join(root, n))
+                except FileNotFoundError:
+                    continue
+                mtime = max(mtime, fst.st_mtime)
+                size += fst.st_size
+        return mtime, size
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Apply every rule once. Returns the number of files removed."""
+        now = time.time() if now is None else now
+        try:
+            names = os.listdir(self.output_dir)
+        except FileNotFoundError:
+            return 0
+
+        removed = 0
+        for rule in self.rules:
+            files = []
+            for name in names:
+                if not name.startswith(rule.prefix) or (not rule.prefix and name.startswith('.')):
+                    continue
+                try:
+                    mtime, size = self._entry_stat(os.path.join(self.output_dir, name))
+                except FileNotFoundError:
+                    continue
+                files.append((mtime, name, size))
+            files.sort()
+
+            kept, total = [], 0
+            for mtime, name, size in files:
+                age = now - mtime
+                if age > rule.ttl and age > self.min_age and self._remove(name, size):
+                    removed += 1
+                    continue
+                kept.append((mtime, name, size))
+                total += size
+
+            for mtime, name, size in kept:
+                if total <= rule.max_bytes:
+                    break
+                if now - mtime > self.min_age and self._remove(name, size):
+                    removed += 1
+                    total -= size
+
+        self._sweeps += 1
+        if removed:
+            logger.info(f"🧹 Removed {removed} expired output file(s) from {self.output_dir}")
+        return removed
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.warning(f"⚠️ Output sweep failed: {e}")
+
+    def start(self):
+        """Sweep once now, then keep sweeping on a daemon thread."""
+        if self._thread is not None:
+            return
+        try:
+            self.sweep()
+        except Exception as e:
+            logger.warning(f"⚠️ Output sweep failed: {e}")
+        self._thread = threading.Thread(target=self._run, name="output-janitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_use = sum(self._leases.values())
+        return {
+            'sweeps': self._sweeps,
+            'removed': self._removed,
+            'removed_bytes': self._removed_bytes,
+            'skipped_in_use': self._skipped_in_use,
+            'in_use': in_use,
+            'interval_seconds': self.interval,
+            'rules': {r.prefix: {'ttl_seconds': r.ttl, 'max_bytes': r.max_bytes} for r in self.rules},
+        }
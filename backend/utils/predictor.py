@@ -0,0 +1,51 @@
+"""Single-pass prediction adapter for the joblib-loaded sklearn classifiers.
+
+Calling ``predict`` and then ``predict_proba`` runs the estimator twice. The
+adapter calls ``predict_proba`` once, takes the label from ``classes_`` and keeps
+the top-k alternatives, falling back to plain ``predict`` (confidence 1.0) for
+estimators that expose no probabilities. The full probability row (aligned with
+``classes``) is kept too, for temporal smoothing.
+"""
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+
+class Prediction(NamedTuple):
+    label: object
+    confidence: float
+    candidates: List[dict]  # [{"class": label, "confidence": score}, ...] best first
+    probabilities: Optional[np.ndarray] = None  # one score per entry of ClassifierAdapter.classes
+
+
+def _plain(value):
+    # numpy scalars -> builtin types so candidates serialise as JSON
+    return value.item() if hasattr(value, 'item') else value
+
+
+class ClassifierAdapter:
+    def __init__(self, estimator, top_k: int = 3):
+        self.estimator = estimator
+        self.top_k = max(1, int(top_k))
+        self.classes = getattr(estimator, 'classes_', None)
+        self.has_proba = hasattr(estimator, 'predict_proba') and self.classes is not None
+
+    def predict_batch(self, features: np.ndarray) -> List[Prediction]:
+        """Predict every row of ``features`` with a single estimator call."""
+        if not self.has_proba:
+            labels = self.estimator.predict(features)
+            return [Prediction(label, 1.0, [{'class': _plain(label), 'confidence': 1.0}]) for label in labels]
+
+        proba = self.estimator.predict_proba(features)
+        # Stable sort so ties resolve to the lowest class index, exactly like predict()'s argmax
+        top = np.argsort(-proba, axis=1, kind='stable')[:, :self.top_k]
+        predictions = []
+        for row, idx in zip(proba, top):
+            best = idx[0]
+            candidates = [{'class': _plain(self.classes[i]), 'confidence': float(row[i])} for i in idx]
+            predictions.append(Prediction(self.classes[best], float(row[best]), candidates, row))
+        return predictions
+
+    def predict_one(self, features: np.ndarray) -> Prediction:
+        """Predict a single (1, n_features) row."""
+        return self.predict_batch(features)[0]
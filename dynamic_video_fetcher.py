@@ -1,13 +1,30 @@
 # Dynamic Video Fetcher using WLASL JSON Mapper
 # Fetches ASL videos from URLs instead of local storage
+import atexit
 import os
+import sys
 import json
 import logging
+import mmap
 import subprocess
 import tempfile
+import threading
+import time
+import numpy as np
 import requests
+import shutil
+from collections.abc import Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process single-flight applies
+    fcntl = None
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -16,6 +33,811 @@ logger = logging.getLogger(__name__)
 # Path to WLASL mapper
 MAPPER_PATH = os.path.join(os.path.dirname(__file__), "mapper", "WLASL_v0.3.json")
 TEMP_VIDEO_DIR = tempfile.gettempdir()  # Use system temp directory for fetched videos
+# Set WLASL_USE_INDEX=0 to always parse the JSON mapper
+USE_COMPILED_INDEX = os.getenv("WLASL_USE_INDEX", "1") != "0"
+# Concurrent clip downloads: total workers and simultaneous downloads per host
+DOWNLOAD_WORKERS = int(os.getenv("WLASL_DOWNLOAD_WORKERS", "8"))
+DOWNLOAD_PER_HOST = int(os.getenv("WLASL_DOWNLOAD_PER_HOST", "4"))
+# Clip cache byte budget (default 2 GB) and eviction policy ("lru" or "lfu")
+CACHE_MAX_BYTES = int(os.getenv("WLASL_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+CACHE_POLICY = os.getenv("WLASL_CACHE_POLICY", "lru").lower()
+# Ingest: transcode each clip once to a canonical profile so compositions are pure stream copies
+CANONICALIZE = os.getenv("WLASL_CANONICALIZE", "1") != "0"
+CANONICAL_WIDTH = int(os.getenv("WLASL_CANONICAL_WIDTH", "640"))
+CANONICAL_HEIGHT = int(os.getenv("WLASL_CANONICAL_HEIGHT", "480"))
+CANONICAL_FPS = int(os.getenv("WLASL_CANONICAL_FPS", "25"))
+CANONICAL_WORKERS = int(os.getenv("WLASL_CANONICAL_WORKERS", "2"))
+
+# ============================================================================
+# Compiled mapper index
+# ============================================================================
+# Lookups only need gloss -> (source, video_id, url), but the JSON mapper also carries
+# bbox/fps/signer/split for every instance. The compiled index keeps just the lookup
+# fields in a single little-endian file that is memory-mapped on open:
+#
+#   magic (8 bytes) | header length (uint32) | JSON header | padding to 8 bytes
+#   gloss table    : GLOSS_DTYPE rows sorted by UTF-8 gloss name
+#   instance table : INSTANCE_DTYPE rows, grouped per gloss in mapper order
+#   string blob    : gloss names, video ids and URLs
+#
+# The header records the mapper's size and mtime; an index that no longer matches
+# the mapper is treated as stale and the fetcher falls back to the JSON file.
+
+INDEX_MAGIC = b"WLASLIX1"
+INDEX_VERSION = 1
+GLOSS_DTYPE = np.dtype([("name_off", "<u4"), ("name_len", "<u4"),
+                        ("inst_start", "<u4"), ("inst_count", "<u4")])
+INSTANCE_DTYPE = np.dtype([("source", "<u2"), ("vid_off", "<u4"), ("vid_len", "<u4"),
+                           ("url_off", "<u4"), ("url_len", "<u4")])
+
+
+def index_path_for(mapper_path: str) -> str:
+    """Default compiled-index location: next to the mapper with an .idx extension."""
+    return os.path.splitext(mapper_path)[0] + ".idx"
+
+
+def _mapper_signature(mapper_path: str) -> Optional[Dict]:
+    try:
+        st = os.stat(mapper_path)
+    except OSError:
+        return None
+    return {"mapper_size": st.st_size, "mapper_mtime_ns": st.st_mtime_ns}
+
+
+def write_gloss_index(gloss_index: Dict[str, List[Dict]], index_path: str,
+                      mapper_path: Optional[str] = None) -> str:
+    """Write a compiled index for an in-memory gloss -> instances mapping (atomic rename)."""
+    strings = bytearray()
+
+    def intern(value) -> Tuple[int, int]:
+        data = str(value if value is not None else "").encode("utf-8")
+        off = len(strings)
+        strings.extend(data)
+        return off, len(data)
+
+    sources: Dict[str, int] = {}
+    names = sorted(gloss_index, key=lambda g: g.encode("utf-8"))
+    glosses = np.zeros(len(names), dtype=GLOSS_DTYPE)
+    rows = []
+    for gi, name in enumerate(names):
+        instances = gloss_index[name]
+        glosses[gi] = (*intern(name), len(rows), len(instances))
+        for inst in instances:
+            src = sources.setdefault(inst.get("source") or "", len(sources))
+            rows.append((src, *intern(inst.get("video_id")), *intern(inst.get("url"))))
+    table = np.array(rows, dtype=INSTANCE_DTYPE)
+
+    header = {
+        "version": INDEX_VERSION,
+        "sources": list(sources),
+        "glosses": len(names),
+        "instances": len(rows),
+        "strings": len(strings),
+        **((_mapper_signature(mapper_path) if mapper_path else None) or {}),
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    prefix = len(INDEX_MAGIC) + 4 + len(header_bytes)
+    padding = b"\0" * (-prefix % 8)
+
+    fd, tmp_path = tempfile.mkstemp(prefix=".wlasl-index-", dir=os.path.dirname(os.path.abspath(index_path)))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(INDEX_MAGIC)
+            f.write(np.uint32(len(header_bytes)).astype("<u4").tobytes())
+            f.write(header_bytes)
+            f.write(padding)
+            f.write(glosses.tobytes())
+            f.write(table.tobytes())
+            f.write(bytes(strings))
+        os.replace(tmp_path, index_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return index_path
+
+
+def compile_mapper(mapper_path: str = MAPPER_PATH, index_path: Optional[str] = None) -> str:
+    """Build step: parse the JSON mapper once and write its compiled index."""
+    index_path = index_path or index_path_for(mapper_path)
+    with open(mapper_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    gloss_index = {}
+    for entry in data:
+        gloss = entry.get("gloss", "").lower()
+        if gloss:
+            gloss_index[gloss] = entry.get("instances", [])
+    write_gloss_index(gloss_index, index_path, mapper_path)
+    logger.info(f"✅ Compiled WLASL index {index_path} ({len(gloss_index)} glosses)")
+    return index_path
+
+
+class CompiledGlossIndex(Mapping):
+    """Read-only gloss -> instances mapping backed by a memory-mapped compiled index.
+
+    Instances come back as small dicts with ``source``, ``video_id`` and ``url``;
+    the other mapper fields are not stored.
+    """
+
+    def __init__(self, path: str, mm: mmap.mmap, header: Dict, data_offset: int):
+        self.path = path
+        self.header = header
+        self.sources: List[str] = header["sources"]
+        self._mm = mm
+        n_gloss, n_inst = header["glosses"], header["instances"]
+        self._glosses = np.frombuffer(mm, dtype=GLOSS_DTYPE, count=n_gloss, offset=data_offset)
+        inst_offset = data_offset + GLOSS_DTYPE.itemsize * n_gloss
+        self._instances = np.frombuffer(mm, dtype=INSTANCE_DTYPE, count=n_inst, offset=inst_offset)
+        self._strings_offset = inst_offset + INSTANCE_DTYPE.itemsize * n_inst
+        self._names: Optional[List[str]] = None
+
+    @classmethod
+    def open(cls, index_path: str, mapper_path: Optional[str] = None) -> Optional["CompiledGlossIndex"]:
+        """Map ``index_path``; return None if it is missing, corrupt or stale for ``mapper_path``."""
+        try:
+            with open(index_path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            if mm[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+                raise ValueError("bad magic")
+            pos = len(INDEX_MAGIC)
+            header_len = int(np.frombuffer(mm, dtype="<u4", count=1, offset=pos)[0])
+            pos += 4
+            header = json.loads(bytes(mm[pos:pos + header_len]).decode("utf-8"))
+            pos += header_len
+            pos += -pos % 8
+            if header.get("version") != INDEX_VERSION:
+                raise ValueError(f"unsupported version {header.get('version')}")
+            expected = (pos + GLOSS_DTYPE.itemsize * header["glosses"]
+                        + INSTANCE_DTYPE.itemsize * header["instances"] + header["strings"])
+            if len(mm) != expected:
+                raise ValueError("truncated index")
+        except (ValueError, KeyError) as e:
+            mm.close()
+            logger.warning(f"⚠️ Ignoring corrupt WLASL index {index_path}: {e}")
+            return None
+
+        signature = _mapper_signature(mapper_path) if mapper_path else None
+        if signature and any(header.get(k) != v for k, v in signature.items()):
+            mm.close()
+            logger.info(f"ℹ️ WLASL index {index_path} is stale, using the JSON mapper")
+            return None
+        return cls(index_path, mm, header, pos)
+
+    def _str(self, off: int, length: int) -> str:
+        start = self._strings_offset + int(off)
+        return self._mm[start:start + int(length)].decode("utf-8")
+
+    def _find(self, gloss: str) -> int:
+        key = gloss.encode("utf-8")
+        lo, hi = 0, len(self._glosses)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            row = self._glosses[mid]
+            start = self._strings_offset + int(row["name_off"])
+            name = self._mm[start:start + int(row["name_len"])]
+            if name < key:
+                lo = mid + 1
+            elif name > key:
+                hi = mid
+            else:
+                return mid
+        return -1
+
+    def _instance(self, row) -> Dict:
+        return {
+            "source": self.sources[int(row["source"])],
+            "video_id": self._str(row["vid_off"], row["vid_len"]),
+            "url": self._str(row["url_off"], row["url_len"]),
+        }
+
+    def __getitem__(self, gloss: str) -> List[Dict]:
+        i = self._find(gloss) if isinstance(gloss, str) else -1
+        if i < 0:
+            raise KeyError(gloss)
+        row = self._glosses[i]
+        start, count = int(row["inst_start"]), int(row["inst_count"])
+        return [self._instance(r) for r in self._instances[start:start + count]]
+
+    def __contains__(self, gloss) -> bool:
+        return isinstance(gloss, str) and self._find(gloss) >= 0
+
+    def instances_for(self, gloss: str, source: str) -> List[Dict]:
+        """Instances of ``gloss`` from ``source``, decoding only the matching rows."""
+        i = self._find(gloss)
+        if i < 0 or source not in self.sources:
+            return []
+        row = self._glosses[i]
+        start, count = int(row["inst_start"]), int(row["inst_count"])
+        block = self._instances[start:start + count]
+        return [self._instance(r) for r in block[block["source"] == self.sources.index(source)]]
+
+    def source_glosses(self) -> Dict[str, frozenset]:
+        """Per source, the glosses with at least one instance from it (computed over the packed table)."""
+        owner = np.repeat(np.arange(len(self._glosses)), self._glosses["inst_count"].astype(np.int64))
+        names = list(self)
+        return {
+            source: frozenset(names[i] for i in np.unique(owner[self._instances["source"] == sid]))
+            for sid, source in enumerate(self.sources)
+        }
+
+    def __iter__(self):
+        if self._names is None:
+            self._names = [self._str(r["name_off"], r["name_len"]) for r in self._glosses]
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._glosses)
+
+    def close(self):
+        self._glosses = self._instances = None
+        self._mm.close()
+
+
+
+# ============================================================================
+# Concurrent download manager
+# ============================================================================
+
+# First-box types an MP4/ISO-BMFF file can start with
+MP4_BOX_TYPES = {b"ftyp", b"moov", b"mdat", b"free", b"skip", b"wide", b"pdin", b"styp"}
+STALE_PART_SECONDS = 3600
+
+
+def looks_like_mp4(path: str) -> bool:
+    """Cheap integrity check: non-empty file whose first box header is a known MP4 box."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(8)
+    except OSError:
+        return False
+    return len(head) == 8 and head[4:8] in MP4_BOX_TYPES
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Exclusive advisory lock on ``path`` shared by all worker processes on this host."""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _fsync_dir(path: str):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # not supported on this platform
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class VideoCacheManager:
+    """
+    Byte-budgeted bookkeeping for the clip cache directory.
+    
+    Tracks size, last access and hit count per cached video_id in an on-disk
+    manifest (``.manifest.json`` in the cache dir) so the state survives restarts,
+    and evicts the least recently used (or, with policy "lfu", least frequently
+    used) clips once the cache grows past ``max_bytes``. Clips accessed within the
+    last ``grace_seconds`` are never evicted, since a composition may be about
+    to read them.
+    
+    The manifest is reconciled with the directory on load, so files added or
+    removed by other processes are picked up on the next start. ``on_evict`` is
+    called with each evicted video_id so derived files (canonical clips) go too.
+    Those files count against the same budget: ``derived_path(video_id)`` names
+    a clip's derived copy, and its size is stored in the entry as ``derived``.
+    """
+    
+    MANIFEST_NAME = ".manifest.json"
+    
+    def __init__(self, cache_dir: str, max_bytes: int = CACHE_MAX_BYTES, policy: str = CACHE_POLICY,
+                 grace_seconds: float = 60.0, save_interval: float = 5.0,
+                 on_evict: Optional[Callable[[str], None]] = None,
+                 derived_path: Optional[Callable[[str], str]] = None):
+        self.cache_dir = cache_dir
+        self.on_evict = on_evict
+        self.derived_path = derived_path
+        self.max_bytes = int(max_bytes)
+        self.policy = policy if policy in ("lru", "lfu") else "lru"
+        self.grace_seconds = grace_seconds
+        self.save_interval = save_interval
+        self.manifest_path = os.path.join(cache_dir, self.MANIFEST_NAME)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "evicted_bytes": 0}
+        self._dirty = False
+        self._last_save = 0.0
+        self._load()
+        atexit.register(self.save, True)
+    
+    def _load(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                entries = json.load(f).get("entries", {})
+        except (OSError, ValueError):
+            entries = {}
+        
+        on_disk = {}
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".mp4") and not name.startswith("."):
+                try:
+                    st = os.stat(os.path.join(self.cache_dir, name))
+                except OSError:
+                    continue
+                on_disk[name[:-4]] = st
+        
+        for video_id, st in on_disk.items():
+            entry = entries.get(video_id) or {"last_access": st.st_mtime, "hits": 0}
+            entry["size"] = st.st_size
+            entry["derived"] = self._derived_size(video_id)
+            self._entries[video_id] = entry
+        self._dirty = True
+        self.evict()
+    
+    def _derived_size(self, video_id: str) -> int:
+        if self.derived_path is None:
+            return 0
+        try:
+            return os.path.getsize(self.derived_path(video_id))
+        except OSError:
+            return 0
+    
+    @property
+    def total_bytes(self) -> int:
+        return sum(e["size"] + e.get("derived", 0) for e in self._entries.values())
+    
+    def hit(self, video_id: str):
+        """A request was answered from the cache."""
+        with self._lock:
+            self._counters["hits"] += 1
+            entry = self._entries.get(video_id)
+            if entry is not None:
+                entry["last_access"] = time.time()
+                entry["hits"] += 1
+                self._dirty = True
+        self.save()
+    
+    def miss(self):
+        with self._lock:
+            self._counters["misses"] += 1
+    
+    def add(self, video_id: str, path: str):
+        """Record a freshly downloaded clip, then evict down to the byte budget."""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        with self._lock:
+            self._entries[video_id] = {"size": size, "last_access": time.time(), "hits": 0}
+            self._dirty = True
+        self.evict()
+    
+    def add_derived(self, video_id: str):
+        """Count the derived copy of ``video_id`` (just written), then evict down to the byte budget."""
+        size = self._derived_size(video_id)
+        with self._lock:
+            entry = self._entries.get(video_id)
+            if entry is None or entry.get("derived") == size:
+                return
+            entry["derived"] = size
+            entry["last_access"] = time.time()
+            self._dirty = True
+        self.evict()
+    
+    def discard(self, video_id: str):
+        with self._lock:
+            if self._entries.pop(video_id, None) is not None:
+                self._dirty = True
+    
+    def evict(self) -> int:
+        """Remove clips until the cache fits ``max_bytes``. Returns the number evicted."""
+        removed = []
+        with self._lock:
+            total = self.total_bytes
+            if total > self.max_bytes:
+                if self.policy == "lfu":
+                    order = sorted(self._entries.items(), key=lambda kv: (kv[1]["hits"], kv[1]["last_access"]))
+                else:
+                    order = sorted(self._entries.items(), key=lambda kv: kv[1]["last_access"])
+                cutoff = time.time() - self.grace_seconds
+                for video_id, entry in order:
+                    if total <= self.max_bytes:
+                        break
+                    if entry["last_access"] > cutoff:
+                        continue
+                    del self._entries[video_id]
+                    size = entry["size"] + entry.get("derived", 0)
+                    total -= size
+                    removed.append((video_id, size))
+                self._counters["evictions"] += len(removed)
+                self._counters["evicted_bytes"] += sum(size for _, size in removed)
+                self._dirty = self._dirty or bool(removed)
+        
+        for video_id, _ in removed:
+            try:
+                os.remove(os.path.join(self.cache_dir, f"{video_id}.mp4"))
+            except OSError:
+                pass
+            if self.on_evict is not None:
+                self.on_evict(video_id)
+        if removed:
+            logger.info(f"🧹 Evicted {len(removed)} cached video(s) to stay under {self.max_bytes / (1024 * 1024):.0f} MB")
+            self.save(force=True)
+        return len(removed)
+    
+    def save(self, force: bool = False):
+        """Write the manifest (atomically), at most every ``save_interval`` seconds unless forced."""
+        with self._lock:
+            if not self._dirty or (not force and time.monotonic() - self._last_save < self.save_interval):
+                return
+            payload = json.dumps({"version": 1, "entries": self._entries})
+            self._dirty = False
+            self._last_save = time.monotonic()
+        try:
+            fd, tmp_path = tempfile.mkstemp(prefix=".manifest.", suffix=".part", dir=self.cache_dir)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write cache manifest {self.manifest_path}: {e}")
+    
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+        self.save(force=True)
+    
+    def close(self):
+        """Write the manifest now and drop the exit hook that would write it later."""
+        self.save(force=True)
+        atexit.unregister(self.save)
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_rate": (self._counters["hits"] / lookups) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "derived_bytes": sum(e.get("derived", 0) for e in self._entries.values()),
+                "max_bytes": self.max_bytes,
+                "policy": self.policy,
+            }
+
+
+class DownloadManager:
+    """
+    Concurrent clip downloader used by WLASLVideoFetcher.
+    
+    - a bounded worker pool sharing one keep-alive ``requests.Session``
+    - at most ``per_host_limit`` downloads at a time against any single host
+    - in-flight de-duplication: concurrent requests for the same video_id share one Future
+    - crash-safe writes: downloads go to a temp file that is fsynced, checked
+      (Content-Length, MP4 header) and renamed into place, under a per-video_id
+      file lock so several worker processes never fetch the same clip twice
+    
+    Futures resolve to the cached file path, or None if the download failed.
+    """
+    
+    def __init__(self, cache_dir: str, max_workers: int = 8, per_host_limit: int = 4,
+                 timeout: float = 30.0, session: Optional[requests.Session] = None,
+                 cache: Optional[VideoCacheManager] = None):
+        self.cache_dir = cache_dir
+        self.cache = cache
+        self.max_workers = max(1, int(max_workers))
+        self.per_host_limit = max(1, int(per_host_limit))
+        self.timeout = timeout
+        self.session = session or self._make_session(self.max_workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="wlasl-download")
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._counters = {"downloads": 0, "failures": 0, "deduplicated": 0, "already_cached": 0,
+                          "bytes": 0, "invalid_removed": 0}
+        self.lock_dir = os.path.join(cache_dir, ".locks")
+        os.makedirs(self.lock_dir, exist_ok=True)
+        self._remove_stale_parts()
+    
+    def _remove_stale_parts(self):
+        # Temp files left behind by a crashed process
+        cutoff = time.time() - STALE_PART_SECONDS
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".part"):
+                part = os.path.join(self.cache_dir, name)
+                try:
+                    if os.path.getmtime(part) < cutoff:
+                        os.remove(part)
+                except OSError:
+                    pass
+    
+    @staticmethod
+    def _make_session(pool_size: int) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+    
+    def cache_path(self, video_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{video_id}.mp4")
+    
+    def is_cached(self, path: str) -> bool:
+        """True if ``path`` holds a complete clip; a corrupt leftover is removed."""
+        if not os.path.exists(path):
+            return False
+        if looks_like_mp4(path):
+            return True
+        logger.warning(f"⚠️ Removing invalid cached video {path}")
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        if self.cache is not None:
+            self.cache.discard(os.path.splitext(os.path.basename(path))[0])
+        with self._lock:
+            self._counters["invalid_removed"] += 1
+        return False
+    
+    def submit(self, url: str, video_id: str, gloss: str) -> Future:
+        """Start (or join) the download of ``video_id``; returns a Future of the cached path."""
+        path = self.cache_path(video_id)
+        with self._lock:
+            future = self._in_flight.get(video_id)
+            if future is not None:
+                self._counters["deduplicated"] += 1
+                return future
+        
+        if self.is_cached(path):
+            with self._lock:
+                self._counters["already_cached"] += 1
+            if self.cache is not None:
+                self.cache.hit(video_id)
+            future = Future()
+            future.set_result(path)
+            return future
+        
+        with self._lock:
+            # Re-check: another thread may have started it while we looked at the disk
+            future = self._in_flight.get(video_id)
+            if future is not None:
+                self._counters["deduplicated"] += 1
+                return future
+            future = self._pool.submit(self._download, url, video_id, gloss, path)
+            self._in_flight[video_id] = future
+        if self.cache is not None:
+            self.cache.miss()
+        future.add_done_callback(lambda _f, vid=video_id: self._forget(vid))
+        return future
+    
+    def _forget(self, video_id: str):
+        with self._lock:
+            self._in_flight.pop(video_id, None)
+    
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return slot
+    
+    def _download(self, url: str, video_id: str, gloss: str, path: str) -> Optional[str]:
+        with _file_lock(os.path.join(self.lock_dir, f"{video_id}.lock")):
+            # Another worker process may have finished this clip while we waited for the lock
+            if self.is_cached(path):
+                return path
+            with self._host_slot(url):
+                tmp_path = None
+                try:
+                    logger.info(f"📥 Downloading {gloss} (ID: {video_id}) from {url}")
+                    fd, tmp_path = tempfile.mkstemp(prefix=f".{video_id}.", suffix=".part", dir=self.cache_dir)
+                    with os.fdopen(fd, 'wb') as f, \
+                            self.session.get(url, timeout=self.timeout, stream=True) as response:
+                        response.raise_for_status()
+                        for chunk in response.iter_content(chunk_size=65536):
+                            if chunk:
+                                f.write(chunk)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    
+                    size = os.path.getsize(tmp_path)
+                    expected = response.headers.get("Content-Length")
+                    if expected and not response.headers.get("Content-Encoding") and size != int(expected):
+                        raise IOError(f"incomplete download ({size} of {expected} bytes)")
+                    if not looks_like_mp4(tmp_path):
+                        raise IOError("response is not an MP4 file")
+                    
+                    os.replace(tmp_path, path)
+                    tmp_path = None
+                    _fsync_dir(self.cache_dir)
+                except (requests.RequestException, OSError, ValueError) as e:
+                    logger.error(f"❌ Failed to download {gloss} (ID: {video_id}): {e}")
+                    with self._lock:
+                        self._counters["failures"] += 1
+                    return None
+                finally:
+                    # Clean up partial file
+                    if tmp_path and os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+        
+        with self._lock:
+            self._counters["downloads"] += 1
+            self._counters["bytes"] += size
+        if self.cache is not None:
+            self.cache.add(video_id, path)
+        logger.info(f"✅ Downloaded {gloss} to cache ({size / (1024 * 1024):.2f} MB)")
+        return path
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                **self._counters,
+                "in_flight": len(self._in_flight),
+                "max_workers": self.max_workers,
+                "per_host_limit": self.per_host_limit,
+            }
+    
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+
+class ClipNormalizer:
+    """
+    Ingest stage: transcode each downloaded clip once into a canonical profile.
+    
+    WLASL clips come in many resolutions, frame rates and codecs. Every clip is
+    re-encoded once to the same H.264 layout: fixed size (letterboxed), fixed
+    fps, yuv420p, a closed GOP of one second, a fixed track timescale and no
+    audio. The result is stored under ``cache_dir/canonical/<profile>/<video_id>.mp4``.
+    Any sequence of canonical clips can then be joined with ``ffmpeg -c copy``.
+    
+    Jobs run on a small pool, are de-duplicated per video_id and hold the same
+    kind of per-file lock as downloads. A clip that fails to transcode falls back
+    to its raw path. ``on_ready(video_id)`` is called once a canonical copy is on
+    disk, before its Future resolves, so the cache can count its bytes.
+    """
+    
+    def __init__(self, cache_dir: str, width: int = CANONICAL_WIDTH, height: int = CANONICAL_HEIGHT,
+                 fps: int = CANONICAL_FPS, max_workers: int = CANONICAL_WORKERS, crf: int = 23,
+                 preset: str = "veryfast", timeout: float = 120.0,
+                 on_ready: Optional[Callable[[str], None]] = None):
+        self.on_ready = on_ready
+        self.width = width - width % 2
+        self.height = height - height % 2
+        self.fps = int(fps)
+        self.crf = crf
+        self.preset = preset
+        self.timeout = timeout
+        self.profile = f"{self.width}x{self.height}p{self.fps}"
+        self.dir = os.path.join(cache_dir, "canonical", self.profile)
+        self.lock_dir = os.path.join(cache_dir, ".locks")
+        os.makedirs(self.dir, exist_ok=True)
+        os.makedirs(self.lock_dir, exist_ok=True)
+        self.enabled = shutil.which("ffmpeg") is not None
+        if not self.enabled:
+            logger.warning("⚠️ ffmpeg not found; clips will not be normalised at ingest")
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix="wlasl-ingest")
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self._counters = {"normalized": 0, "failures": 0, "reused": 0, "removed": 0}
+    
+    def path_for(self, video_id: str) -> str:
+        return os.path.join(self.dir, f"{video_id}.mp4")
+    
+    def is_ready(self, video_id: str) -> bool:
+        return looks_like_mp4(self.path_for(video_id))
+    
+    def submit(self, video_id: str, download: Future) -> Future:
+        """Normalise ``video_id`` once ``download`` (a Future of the raw path) resolves.
+        
+        Returns a Future of the canonical path, or of the raw path if it could not
+        be normalised, or None if the download failed.
+        """
+        with self._lock:
+            future = self._in_flight.get(video_id)
+            if future is not None:
+                return future
+            future = self._in_flight[video_id] = Future()
+        
+        def run(raw_path):
+            try:
+                future.set_result(self._normalize(video_id, raw_path) if raw_path else None)
+            except Exception as e:  # never leave a waiter hanging
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._in_flight.pop(video_id, None)
+        
+        def on_downloaded(f: Future):
+            raw_path = f.result() if not f.exception() else None
+            if raw_path and not self.is_ready(video_id):
+                self._pool.submit(run, raw_path)
+            else:
+                run(raw_path)
+        
+        download.add_done_callback(on_downloaded)
+        return future
+    
+    def _normalize(self, video_id: str, raw_path: str) -> str:
+        path = self.path_for(video_id)
+        if not self.enabled:
+            return raw_path
+        with _file_lock(os.path.join(self.lock_dir, f"{video_id}.canonical.lock")):
+            if looks_like_mp4(path):
+                with self._lock:
+                    self._counters["reused"] += 1
+                self._ready(video_id)
+                return path
+            fd, tmp_path = tempfile.mkstemp(prefix=f".{video_id}.", suffix=".part", dir=self.dir)
+            os.close(fd)
+            w, h, fps = self.width, self.height, self.fps
+            cmd = [
+                "ffmpeg", "-y", "-v", "error", "-i", raw_path,
+                "-map", "0:v:0", "-an", "-sn", "-dn",
+                "-vf", f"scale={w}:{h}:force_original_aspect_ratio=decrease,"
+                       f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2,setsar=1,fps={fps},format=yuv420p",
+                "-c:v", "libx264", "-preset", self.preset, "-crf", str(self.crf), "-profile:v", "high",
+                "-g", str(fps), "-keyint_min", str(fps), "-sc_threshold", "0", "-flags", "+cgop",
+                "-video_track_timescale", str(fps * 512), "-movflags", "+faststart",
+                "-f", "mp4", tmp_path,
+            ]
+            try:
+                result = subprocess.run(cmd, capture_output=True, text=True, timeout=self.timeout)
+                if result.returncode != 0 or not looks_like_mp4(tmp_path):
+                    raise RuntimeError(result.stderr.strip()[-500:] or "no output")
+                os.replace(tmp_path, path)
+            except (OSError, RuntimeError, subprocess.TimeoutExpired) as e:
+                logger.warning(f"⚠️ Could not normalise {video_id}, using the raw clip: {e}")
+                with self._lock:
+                    self._counters["failures"] += 1
+                return raw_path
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        with self._lock:
+            self._counters["normalized"] += 1
+        logger.info(f"🎞️ Normalised {video_id} to {self.profile}")
+        self._ready(video_id)
+        return path
+    
+    def _ready(self, video_id: str):
+        if self.on_ready is not None:
+            try:
+                self.on_ready(video_id)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not record canonical clip {video_id}: {e}")
+    
+    def discard(self, video_id: str):
+        """Drop the canonical copy (its raw clip was evicted)."""
+        try:
+            os.remove(self.path_for(video_id))
+        except OSError:
+            return
+        with self._lock:
+            self._counters["removed"] += 1
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return {**self._counters, "profile": self.profile, "enabled": self.enabled,
+                    "in_flight": len(self._in_flight)}
+    
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
 
 class WLASLVideoFetcher:
     """
@@ -23,22 +845,57 @@ class WLASLVideoFetcher:
     Supports filtering by source (e.g., "aslbrick") and caching.
     """
     
-    def __init__(self, mapper_path: str = MAPPER_PATH, cache_dir: Optional[str] = None):
+    def __init__(self, mapper_path: str = MAPPER_PATH, cache_dir: Optional[str] = None,
+                 use_index: bool = USE_COMPILED_INDEX, max_downloads: int = DOWNLOAD_WORKERS,
+                 per_host_limit: int = DOWNLOAD_PER_HOST, cache_max_bytes: int = CACHE_MAX_BYTES,
+                 canonicalize: bool = CANONICALIZE):
         """
         Initialize the fetcher with WLASL mapper.
         
         Args:
             mapper_path: Path to WLASL_v0.3.json file
             cache_dir: Directory for caching downloaded videos (default: temp dir)
+            use_index: Open the compiled index next to the mapper when it is up to date
+                       (and write one after a JSON load), instead of keeping the JSON in memory
+            max_downloads: Size of the concurrent download pool
+            per_host_limit: Maximum simultaneous downloads from one host
+            cache_max_bytes: Byte budget for the clip cache; older clips are evicted beyond it
+            canonicalize: Transcode clips once to the canonical profile when asked for
+                          ``canonical=True`` paths (see ClipNormalizer)
         """
         self.mapper_path = mapper_path
         self.cache_dir = cache_dir or os.path.join(TEMP_VIDEO_DIR, "asl_video_cache")
         os.makedirs(self.cache_dir, exist_ok=True)
+        self.normalizer = ClipNormalizer(self.cache_dir) if canonicalize else None
+        self.cache = VideoCacheManager(self.cache_dir, max_bytes=cache_max_bytes,
+                                       on_evict=self.normalizer.discard if self.normalizer else None,
+                                       derived_path=self.normalizer.path_for if self.normalizer else None)
+        if self.normalizer is not None:
+            # Canonical copies share the raw clips' byte budget
+            self.normalizer.on_ready = self.cache.add_derived
+        self.downloads = DownloadManager(self.cache_dir, max_workers=max_downloads, per_host_limit=per_host_limit,
+                                         cache=self.cache)
         
-        self.mapper_data = self._load_mapper()
-        self.gloss_index = self._build_gloss_index()
+        t0 = time.perf_counter()
+        self.mapper_mtime = os.path.getmtime(self.mapper_path) if os.path.exists(self.mapper_path) else None
+        self.index_path = index_path_for(self.mapper_path) if use_index else None
+        compiled = CompiledGlossIndex.open(self.index_path, self.mapper_path) if use_index else None
+        if compiled is not None:
+            self.mapper_data = None
+            self.gloss_index = compiled
+            # (gloss, source) -> instances is filled lazily from the mmap; the per-source sets are eager
+            self.source_index: Dict[Tuple[str, str], List[Dict]] = {}
+            self.source_glosses: Dict[str, frozenset] = compiled.source_glosses()
+        else:
+            self.mapper_data = self._load_mapper()
+            self.gloss_index = self._build_gloss_index()
+            if use_index:
+                self._write_index()
+        self.load_seconds = time.perf_counter() - t0
         
-        logger.info(f"✅ WLASL Fetcher initialized with {len(self.gloss_index)} glosses")
+        logger.info(f"✅ WLASL Fetcher initialized with {len(self.gloss_index)} glosses "
+                    f"in {self.load_seconds * 1000:.0f} ms "
+                    f"({'compiled index' if compiled is not None else 'JSON mapper'})")
         logger.info(f"📁 Cache directory: {self.cache_dir}")
     
     def _load_mapper(self) -> List[Dict]:
@@ -56,14 +913,49 @@ class WLASLVideoFetcher:
             raise
     
     def _build_gloss_index(self) -> Dict[str, List[Dict]]:
-        """Build an index mapping gloss -> list of instances."""
+        """
+        Build an index mapping gloss -> list of instances.
+        
+        Also fills the secondary indexes: ``source_index`` maps (gloss, source) -> instances
+        and ``source_glosses`` maps source -> set of glosses that have a clip from it.
+        """
         index = {}
         for entry in self.mapper_data:
             gloss = entry.get("gloss", "").lower()
             if gloss:
                 index[gloss] = entry.get("instances", [])
+        
+        source_index: Dict[Tuple[str, str], List[Dict]] = {}
+        for gloss, instances in index.items():
+            for inst in instances:
+                source_index.setdefault((gloss, inst.get("source")), []).append(inst)
+        source_glosses: Dict[str, set] = {}
+        for gloss, source in source_index:
+            source_glosses.setdefault(source, set()).add(gloss)
+        
+        self.source_index = source_index
+        self.source_glosses = {source: frozenset(glosses) for source, glosses in source_glosses.items()}
         return index
     
+    def glosses_for_source(self, source: str = "aslbrick") -> frozenset:
+        """Glosses that have at least one clip from ``source`` (O(1) lookup, no rescanning)."""
+        return self.source_glosses.get(source, frozenset())
+    
+    def has_gloss(self, gloss: str, source: Optional[str] = "aslbrick") -> bool:
+        """True if ``gloss`` exists (and, when ``source`` is given, has a clip from that source)."""
+        gloss_lower = gloss.lower()
+        if source:
+            return gloss_lower in self.glosses_for_source(source)
+        return gloss_lower in self.gloss_index
+    
+    def _write_index(self):
+        """Best effort: compile the freshly parsed mapper so the next start can mmap it."""
+        try:
+            write_gloss_index(self.gloss_index, self.index_path, self.mapper_path)
+            logger.info(f"✅ Wrote compiled WLASL index {self.index_path}")
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write compiled WLASL index {self.index_path}: {e}")
+    
     def get_gloss_instances(self, gloss: str, source: str = "aslbrick") -> List[Dict]:
         """
         Get video instances for a gloss, optionally filtered by source.
@@ -77,25 +969,31 @@ class WLASLVideoFetcher:
         """
         gloss_lower = gloss.lower()
         
-        if gloss_lower not in self.gloss_index:
-            logger.warning(f"⚠️ Gloss '{gloss}' not found in mapper")
-            return []
-        
-        instances = self.gloss_index[gloss_lower]
+        if not source:
+            if gloss_lower not in self.gloss_index:
+                logger.debug(f"Gloss '{gloss}' not found in mapper")
+                return []
+            return list(self.gloss_index[gloss_lower])
         
-        # Filter by source if specified
-        if source:
-            filtered = [i for i in instances if i.get("source") == source]
-            logger.info(f"📹 Found {len(filtered)}/{len(instances)} '{gloss}' instances from source '{source}'")
-            return filtered
-        
-        logger.info(f"📹 Found {len(instances)} instances for gloss '{gloss}'")
-        return instances
+        # Secondary index: (gloss, source) -> instances, no per-call filtering
+        if gloss_lower not in self.glosses_for_source(source):
+            logger.debug(f"No '{gloss}' instances from source '{source}'")
+            return []
+        key = (gloss_lower, source)
+        instances = self.source_index.get(key)
+        if instances is None:
+            instances = self.gloss_index.instances_for(gloss_lower, source)
+            self.source_index[key] = instances
+        logger.debug(f"Found {len(instances)} '{gloss}' instances from source '{source}'")
+        return list(instances)
     
     def download_video(self, url: str, video_id: str, gloss: str) -> Optional[str]:
         """
         Download a video from URL and cache it.
         
+        Goes through the shared download manager, so a concurrent request for the
+        same video_id waits for the download already in progress.
+        
         Args:
             url: Video URL
             video_id: Unique video identifier
@@ -104,38 +1002,42 @@ class WLASLVideoFetcher:
         Returns:
             Path to cached video file, or None if download failed
         """
-        # Create cache filename based on video_id
-        cache_file = os.path.join(self.cache_dir, f"{video_id}.mp4")
+        return self.downloads.submit(url, video_id, gloss).result()
+    
+    def _submit(self, url: str, video_id: str, gloss: str, canonical: bool = False) -> Future:
+        """Start the download (and, with ``canonical``, the ingest transcode) of one clip."""
+        if canonical and self.normalizer is not None:
+            if self.normalizer.is_ready(video_id):
+                # Keep the raw clip's LRU entry warm; evicting it drops the canonical copy too
+                self.cache.hit(video_id)
+                future = Future()
+                future.set_result(self.normalizer.path_for(video_id))
+                return future
+            return self.normalizer.submit(video_id, self.downloads.submit(url, video_id, gloss))
+        return self.downloads.submit(url, video_id, gloss)
+    
+    def prefetch(self, gloss_tokens: List[str], source: str = "aslbrick",
+                 max_per_gloss: int = 1, canonical: bool = False) -> Dict[str, List[Future]]:
+        """
+        Start downloading clips for all tokens at once and return immediately.
         
-        # Return cached file if it exists
-        if os.path.exists(cache_file):
-            logger.info(f"✅ Using cached video: {cache_file}")
-            return cache_file
+        With ``canonical=True`` each clip is also normalised as soon as it arrives.
         
-        try:
-            logger.info(f"📥 Downloading {gloss} (ID: {video_id}) from {url}")
-            response = requests.get(url, timeout=30, stream=True)
-            response.raise_for_status()
-            
-            # Write to cache
-            with open(cache_file, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-            
-            file_size_mb = os.path.getsize(cache_file) / (1024 * 1024)
-            logger.info(f"✅ Downloaded {gloss} to cache ({file_size_mb:.2f} MB)")
-            return cache_file
-            
-        except requests.RequestException as e:
-            logger.error(f"❌ Failed to download {gloss} (ID: {video_id}): {e}")
-            # Clean up partial file
-            if os.path.exists(cache_file):
-                os.remove(cache_file)
-            return None
+        Returns:
+            Dictionary mapping gloss -> list of Futures resolving to cached paths (or None)
+        """
+        futures: Dict[str, List[Future]] = {}
+        for token in dict.fromkeys(gloss_tokens):
+            for instance in self.get_gloss_instances(token, source)[:max_per_gloss]:
+                url = instance.get("url")
+                video_id = instance.get("video_id")
+                if url and video_id:
+                    futures.setdefault(token, []).append(self._submit(url, video_id, token, canonical))
+        return futures
     
     def get_videos_for_gloss(self, gloss: str, source: str = "aslbrick", 
-                            max_videos: int = 1, download: bool = True) -> List[str]:
+                            max_videos: int = 1, download: bool = True,
+                            canonical: bool = False) -> List[str]:
         """
         Get and optionally download videos for a gloss.
         
@@ -144,6 +1046,7 @@ class WLASLVideoFetcher:
             source: Video source filter
             max_videos: Maximum number of videos to fetch
             download: Whether to download videos (True) or just return URLs (False)
+            canonical: Return the normalised copies (raw path if normalisation is unavailable)
         
         Returns:
             List of video file paths (if download=True) or URLs (if download=False)
@@ -167,12 +1070,13 @@ class WLASLVideoFetcher:
                 continue
             
             if download:
-                video_path = self.download_video(url, video_id, gloss)
-                if video_path:
-                    results.append(video_path)
+                # Start every download before waiting on any of them
+                results.append(self._submit(url, video_id, gloss, canonical))
             else:
                 results.append(url)
         
+        if download:
+            results = [path for path in (f.result() for f in results) if path]
         return results
     
     def get_video_urls_for_gloss(self, gloss: str, source: str = "aslbrick",
@@ -191,7 +1095,7 @@ class WLASLVideoFetcher:
         return self.get_videos_for_gloss(gloss, source, max_videos, download=False)
     
     def get_video_paths_for_gloss(self, gloss: str, source: str = "aslbrick",
-                                 max_videos: int = 1) -> List[str]:
+                                 max_videos: int = 1, canonical: bool = False) -> List[str]:
         """
         Get video file paths for a gloss, downloading if necessary.
         
@@ -199,11 +1103,24 @@ class WLASLVideoFetcher:
             gloss: The sign word
             source: Video source filter
             max_videos: Maximum number of videos to download
+            canonical: Return the normalised copies (see ClipNormalizer)
         
         Returns:
             List of video file paths
         """
-        return self.get_videos_for_gloss(gloss, source, max_videos, download=True)
+        return self.get_videos_for_gloss(gloss, source, max_videos, download=True, canonical=canonical)
+    
+    def cached_clip_path(self, video_id: str, canonical: bool = True) -> Optional[str]:
+        """
+        Local file for an already fetched clip, preferring its canonical copy
+        unless ``canonical`` is False.
+        
+        Never downloads; returns None if the clip is not cached.
+        """
+        if canonical and self.normalizer is not None and self.normalizer.is_ready(video_id):
+            return self.normalizer.path_for(video_id)
+        path = self.downloads.cache_path(video_id)
+        return path if looks_like_mp4(path) else None
     
     def get_videos_for_gloss_tokens(self, gloss_tokens: List[str], source: str = "aslbrick",
                                     max_per_gloss: int = 1, skip_missing: bool = True) -> Dict[str, List[str]]:
@@ -220,9 +1137,10 @@ class WLASLVideoFetcher:
             Dictionary mapping gloss -> list of video file paths
         """
         result = {}
+        futures = self.prefetch(gloss_tokens, source, max_per_gloss)
         
         for token in gloss_tokens:
-            videos = self.get_video_paths_for_gloss(token, source, max_per_gloss)
+            videos = [path for path in (f.result() for f in futures.get(token, [])) if path]
             
             if not videos and not skip_missing:
                 raise ValueError(f"No videos found for gloss '{token}'")
@@ -335,6 +1253,21 @@ class WLASLVideoFetcher:
             logger.error("❌ Failed to generate video")
             return None
     
+    def cache_stats(self) -> Dict:
+        """
+        Clip cache counters.
+        
+        Returns:
+            Dictionary with hits, misses, hit_rate, evictions, evicted_bytes, entries,
+            bytes, derived_bytes (canonical copies, included in bytes), max_bytes, policy,
+            the download manager's counters under "downloads"
+            and the ingest counters under "canonical"
+        """
+        stats = {**self.cache.stats(), "downloads": self.downloads.stats()}
+        if self.normalizer is not None:
+            stats["canonical"] = self.normalizer.stats()
+        return stats
+    
     def clear_cache(self) -> int:
         """
         Clear all cached videos.
@@ -352,12 +1285,72 @@ class WLASLVideoFetcher:
             except Exception as e:
                 logger.error(f"❌ Failed to delete {file_path}: {e}")
         
+        if self.normalizer is not None:
+            for file in os.listdir(self.normalizer.dir):
+                try:
+                    os.remove(os.path.join(self.normalizer.dir, file))
+                    count += 1
+                except OSError as e:
+                    logger.error(f"❌ Failed to delete {file}: {e}")
+        
+        self.cache.reset()
         logger.info(f"✅ Cleared cache: {count} files deleted")
         return count
+    
+    def close(self):
+        """Stop the download and ingest pools and write the cache manifest; the fetcher is unusable afterwards."""
+        self.downloads.close()
+        if self.normalizer is not None:
+            self.normalizer.close()
+        self.cache.close()
+
+
+# Process-wide fetchers, one per (mapper_path, cache_dir). Loading the mapper parses the whole
+# WLASL JSON, so request handlers share one instance and only reload when the file changes.
+_fetchers: Dict[Tuple[str, str], WLASLVideoFetcher] = {}
+_fetchers_lock = threading.Lock()
+
+
+def get_fetcher(mapper_path: str = MAPPER_PATH, cache_dir: Optional[str] = None) -> WLASLVideoFetcher:
+    """
+    Return the shared fetcher for a mapper, creating it on first use.
+    
+    The mapper's mtime is checked on every call; if the file changed since it was
+    loaded, a fresh fetcher replaces the old one. Thread-safe: concurrent first
+    calls load the mapper once.
+    """
+    key = (os.path.abspath(mapper_path), cache_dir or "")
+    try:
+        mtime = os.path.getmtime(mapper_path)
+    except OSError:
+        mtime = None
+    
+    fetcher = _fetchers.get(key)
+    if fetcher is not None and fetcher.mapper_mtime == mtime:
+        return fetcher
+    
+    with _fetchers_lock:
+        fetcher = _fetchers.get(key)
+        if fetcher is not None and fetcher.mapper_mtime == mtime:
+            return fetcher
+        old = fetcher
+        if old is not None:
+            logger.info(f"🔄 WLASL mapper changed on disk, reloading {mapper_path}")
+        fetcher = WLASLVideoFetcher(mapper_path, cache_dir)
+        _fetchers[key] = fetcher
+        if old is not None:
+            # Release the old instance's pools, HTTP session and exit hook
+            old.close()
+        return fetcher
 
 
 # Standalone usage example
 if __name__ == "__main__":
+    # Build step: python dynamic_video_fetcher.py --build-index [mapper_path]
+    if len(sys.argv) > 1 and sys.argv[1] == "--build-index":
+        print(f"✅ Wrote {compile_mapper(sys.argv[2] if len(sys.argv) > 2 else MAPPER_PATH)}")
+        sys.exit(0)
+    
     try:
         # Initialize fetcher
         fetcher = WLASLVideoFetcher()
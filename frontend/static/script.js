@@ -19,6 +19,11 @@ let letterInferInterval = null;
 
 let inferInterval = null;
 
+// Stable id for this page so the server can keep a hand tracker alive between our frames
+const inferSessionId = (window.crypto && crypto.randomUUID)
+    ? crypto.randomUUID()
+    : `s-${Date.now()}-${Math.random().toString(36).slice(2)}`;
+
 async function startRealtimeInfer(videoEl) {
     // Reduce inference rate significantly for better performance
     const FPS = 2;  // Reduced from 3 to 2 - only 2 inferences per second
@@ -49,6 +54,7 @@ async function startRealtimeInfer(videoEl) {
 
             const form = new FormData();
             form.append('frame', blob, 'frame.jpg');
+            form.append('session_id', inferSessionId);
             // Remove annotated frame request to reduce processing time
             // form.append('return_annotated', 'true'); 
 
@@ -66,12 +72,21 @@ async function startRealtimeInfer(videoEl) {
                 const label = data.detected_sign;
                 const rawConf = data.confidence || 0;
                 
-                if (label && rawConf >= 0.7) { // Reduced threshold from 0.8 to 0.7
+                if (data.smoothed) {
+                    // The server smooths our session and reports each stable sign once
+                    if (data.smoothed.confirmed) {
+                        confirmedWords.push(data.smoothed.confirmed);
+                        console.log('✅ Confirmed words so far:', confirmedWords);
+                    }
+                    if (data.smoothed.label) {
+                        document.getElementById('detectedText').textContent = data.smoothed.label;
+                    }
+                } else if (label && rawConf >= 0.7) { // Reduced threshold from 0.8 to 0.7
                     frameDetections.push(label);
                 }
                 
                 // When we have enough frames, pick the majority word
-                if (frameDetections.length >= WINDOW_SIZE) {
+                if (!data.smoothed && frameDetections.length >= WINDOW_SIZE) {
                     const freq = {};
                     frameDetections.forEach(w => { freq[w] = (freq[w] || 0) + 1; });
                     const majority = Object.keys(freq).reduce((a, b) => freq[a] > freq[b] ? a : b);
@@ -81,7 +96,7 @@ async function startRealtimeInfer(videoEl) {
                     // Update displayed text to the majority vote
                     document.getElementById('detectedText').textContent = majority;
                     frameDetections = [];
-                } else {
+                } else if (!data.smoothed) {
                     // For intermediate frames, still show live detection
                     if (data.detected_sign) {
                         document.getElementById('detectedText').textContent = data.detected_sign;
@@ -1486,6 +1501,7 @@ async function startRealtimeLetterInfer(videoEl) {
 
             const form = new FormData();
             form.append('frame', blob, 'frame.jpg');
+            form.append('session_id', inferSessionId);
 
             const resp = await fetch(`${API_BASE_URL}/infer-letter`, { 
                 method: 'POST', 
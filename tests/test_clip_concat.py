@@ -0,0 +1,75 @@
+from utils.clip_concat import ClipConcatenator, ClipInfo, parse_probe, plan_concat
+
+PROBE = """codec_name=h264
+profile=High
+width=640
+height=480
+pix_fmt=yuv420p
+level=30
+refs=4
+r_frame_rate=30000/1001
+avg_frame_rate=30000/1001
+time_base=1/30000
+nb_frames=N/A
+duration=2.002000
+extradata_hash=SHA256:0a1b2c
+"""
+
+
+def clip(codec="h264", width=640, height=480, fps=25.0, pix_fmt="yuv420p", profile="high", extradata="SHA256:aa"):
+    return ClipInfo(codec, profile, width, height, fps, pix_fmt, "1/12800", 50, 30, 4, extradata)
+
+
+def test_parse_probe():
+    info = parse_probe(PROBE)
+
+    assert info.signature == ("h264", "high", 640, 480, 29.97, "yuv420p", "1/30000", 30, 4, "SHA256:0a1b2c")
+    # nb_frames is missing, so frames come from the duration
+    assert info.frames == 60
+    assert info.playable
+
+
+def test_matching_clips_are_copied_as_is():
+    target, mismatched = plan_concat([clip(), clip(), clip()])
+
+    assert target == clip().signature
+    assert mismatched == [False, False, False]
+
+
+def test_only_mismatched_clips_are_prepared():
+    odd = clip(width=1280, height=720)
+    target, mismatched = plan_concat([odd, clip(), clip(fps=30.0), clip()])
+
+    assert target == clip().signature
+    assert mismatched == [True, False, True, False]
+
+
+def test_unplayable_clips_are_all_reencoded():
+    target, mismatched = plan_concat([clip(codec="mpeg4", width=321), clip(codec="hevc")])
+
+    assert target[:3] == ("h264", "high", 320)
+    assert mismatched == [True, True]
+
+
+def test_different_parameter_sets_are_not_copied_together():
+    target, mismatched = plan_concat([clip(), clip(extradata="SHA256:bb"), clip()])
+
+    assert target == clip().signature
+    assert mismatched == [False, True, False]
+
+
+def test_probe_cache_is_bounded(tmp_path, monkeypatch):
+    concat = ClipConcatenator(str(tmp_path / "prepared"), max_probes=2)
+    calls = []
+    monkeypatch.setattr(concat, "_run", lambda cmd: calls.append(cmd[-1]) or PROBE)
+    paths = []
+    for name in "abc":
+        path = tmp_path / f"{name}.mp4"
+        path.write_bytes(b"clip")
+        paths.append(str(path))
+
+    for path in paths + paths[-1:]:
+        concat.probe(path)
+
+    assert concat.stats()["probe_cache"] == 2
+    assert calls == paths
@@ -0,0 +1,105 @@
+import os
+
+from utils.composition_cache import CompositionCache
+
+
+def make_clips(tmp_path, *names):
+    clip_dir = tmp_path / "clips"
+    clip_dir.mkdir(exist_ok=True)
+    paths = []
+    for name in names:
+        path = clip_dir / f"{name}.mp4"
+        path.write_bytes(name.encode() * 10)
+        paths.append(str(path))
+    return paths
+
+
+def compose(cache, out_dir, key, clips):
+    name = cache.content_name(key, clips)
+    (out_dir / name).write_bytes(b"video")
+    cache.store(key, name, clips, {"frames": 10, "missing": []})
+    return name
+
+
+def test_same_request_is_served_from_memory(tmp_path):
+    out_dir = tmp_path / "outputs"
+    out_dir.mkdir()
+    cache = CompositionCache(str(out_dir))
+    clips = make_clips(tmp_path, "hello", "world")
+    key = cache.request_key([" Hello", "WORLD", ""], "aslbrick", "avc1")
+
+    assert cache.lookup(key) is None
+    name = compose(cache, out_dir, key, clips)
+
+    assert name.startswith("comp_") and name.endswith(".mp4")
+    assert cache.lookup(cache.request_key(["hello", "world"], "aslbrick", "avc1")) == \
+        (name, {"frames": 10, "missing": [], "cached": True})
+    # Codec and speed are part of the key
+    assert cache.lookup(cache.request_key(["hello", "world"], "aslbrick", "copy")) is None
+    assert cache.lookup(cache.request_key(["hello", "world"], "aslbrick", "avc1", speed=1.5)) is None
+
+
+def test_changed_clip_invalidates_and_changes_the_name(tmp_path):
+    out_dir = tmp_path / "outputs"
+    out_dir.mkdir()
+    cache = CompositionCache(str(out_dir))
+    clips = make_clips(tmp_path, "hello")
+    key = cache.request_key(["hello"], "aslbrick", "avc1")
+    name = compose(cache, out_dir, key, clips)
+
+    with open(clips[0], "ab") as f:
+        f.write(b"re-encoded")
+
+    assert cache.lookup(key) is None
+    assert cache.content_name(key, clips) != name
+    assert cache.stats()["stale"] == 1
+
+
+def test_disk_output_is_adopted_after_restart(tmp_path):
+    out_dir = tmp_path / "outputs"
+    out_dir.mkdir()
+    clips = make_clips(tmp_path, "hello")
+    key = CompositionCache.request_key(["hello"], "aslbrick", "avc1")
+    name = compose(CompositionCache(str(out_dir)), out_dir, key, clips)
+
+    restarted = CompositionCache(str(out_dir))
+    assert restarted.lookup(key) is None
+    assert restarted.load(key, restarted.content_name(key, clips), clips) == \
+        (name, {"frames": 10, "missing": [], "cached": True})
+    assert restarted.lookup(key)[0] == name
+
+
+def test_deleted_output_is_a_miss(tmp_path):
+    out_dir = tmp_path / "outputs"
+    out_dir.mkdir()
+    cache = CompositionCache(str(out_dir))
+    clips = make_clips(tmp_path, "hello")
+    key = cache.request_key(["hello"], "aslbrick", "avc1")
+    name = compose(cache, out_dir, key, clips)
+
+    os.remove(out_dir / name)
+
+    assert cache.lookup(key) is None
+
+
+def test_output_with_missing_tokens_is_not_remembered(tmp_path):
+    out_dir = tmp_path / "outputs"
+    out_dir.mkdir()
+    cache = CompositionCache(str(out_dir))
+    key = cache.request_key(["hello", "world"], "aslbrick", "avc1")
+
+    # First call: the "world" clip failed to download
+    clips = make_clips(tmp_path, "hello")
+    partial = cache.content_name(key, clips)
+    (out_dir / partial).write_bytes(b"video")
+    cache.store(key, partial, clips, {"frames": 5, "missing": ["world"]})
+    assert cache.lookup(key) is None
+    # Adopting the partial file from disk does not remember it either
+    assert cache.load(key, partial, clips)[0] == partial
+    assert cache.lookup(key) is None
+
+    # Second call: the clip is there now, so the full sequence is composed and cached
+    clips = make_clips(tmp_path, "hello", "world")
+    name = compose(cache, out_dir, key, clips)
+    assert name != partial
+    assert cache.lookup(key)[0] == name
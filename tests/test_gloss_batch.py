@@ -0,0 +1,99 @@
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from utils.gloss_batch import BatchGlossTranslator, parse_batch_response
+
+SINGLE = re.compile(r'Sentence: "(.*)"')
+NUMBERED = re.compile(r"^\s*(\d+)\. (.*)$", re.M)
+
+
+class _FakeLLM:
+    """Local stand-in for the chat completions API: glosses are the upper-cased sentence."""
+
+    def __init__(self):
+        self.prompts = []
+        self.mode = "ok"
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                prompt = body["messages"][-1]["content"]
+                server.prompts.append(prompt)
+                single = SINGLE.search(prompt)
+                if single:
+                    content = single.group(1).upper()
+                else:
+                    glosses = {n: s.upper() for n, s in NUMBERED.findall(prompt)}
+                    if server.mode == "drop_one":
+                        glosses.pop(max(glosses, key=int))
+                    content = "```json\n" + json.dumps(glosses) + "\n```"
+                payload = json.dumps({"choices": [{"message": {"role": "assistant", "content": content}}]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1/chat/completions"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def complete(self, prompt, max_tokens=50):
+        resp = requests.post(self.url, json={"model": "gpt-4o-mini", "max_tokens": max_tokens,
+                                             "messages": [{"role": "user", "content": prompt}]}, timeout=5)
+        return resp.json()["choices"][0]["message"]["content"]
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def llm():
+    server = _FakeLLM()
+    yield server
+    server.close()
+
+
+def make_translator(llm, batch_size=20):
+    return BatchGlossTranslator(llm.complete, lambda s: llm.complete(f'Sentence: "{s}"'), batch_size=batch_size)
+
+
+def test_many_sentences_take_one_request_per_batch(llm):
+    sentences = [f"sentence number {i}" for i in range(45)]
+
+    glosses = make_translator(llm).translate(sentences)
+
+    assert glosses == [s.upper() for s in sentences]
+    assert len(llm.prompts) == 3
+
+
+def test_malformed_batch_falls_back_to_single_calls(llm):
+    translator = make_translator(llm)
+    llm.mode = "drop_one"
+
+    glosses = translator.translate(["good morning", "see you later", "thank you"])
+
+    # A missing number must not shift the other glosses, so the whole batch is redone
+    assert glosses == ["GOOD MORNING", "SEE YOU LATER", "THANK YOU"]
+    assert len(llm.prompts) == 4
+    assert translator.stats()["fallback_batches"] == 1
+
+
+def test_parse_rejects_prose_and_wrong_numbering():
+    with pytest.raises(ValueError):
+        parse_batch_response("Sure! Here are the glosses.", 2)
+    with pytest.raises(ValueError):
+        parse_batch_response('{"1": "HELLO", "3": "BYE"}', 2)
+    with pytest.raises(ValueError):
+        parse_batch_response('{"1": "HELLO", "2": ""}', 2)
+    assert parse_batch_response('{"2": "BYE  NOW", "1": "HELLO"}', 2) == ["HELLO", "BYE NOW"]
@@ -0,0 +1,54 @@
+import os
+import time
+
+import pytest
+
+from utils.gloss_playlist import build_playlist, clip_version, find_clip
+
+
+@pytest.fixture
+def clips(tmp_path):
+    paths = {}
+    for name in ("v1", "v2"):
+        path = tmp_path / f"{name}.mp4"
+        path.write_bytes(name.encode() * 10)
+        paths[name] = str(path)
+    return paths
+
+
+def test_playlist_shape_keeps_token_order_and_reports_missing(clips):
+    mapping = {"hello": clips["v1"], "world": clips["v2"], "again": clips["v1"]}
+    playlist = build_playlist(["hello", "ghost", "world", "again"], mapping.get, lambda path: 1.25)
+
+    assert sorted(playlist) == ["clips", "duration_seconds", "missing"]
+    assert [c["token"] for c in playlist["clips"]] == ["hello", "world", "again"]
+    assert all(sorted(c) == ["duration", "token", "url"] for c in playlist["clips"])
+    assert playlist["clips"][0]["url"] == f"/gloss-clip/v1?v={clip_version(clips['v1'])}"
+    assert playlist["clips"][0]["url"] == playlist["clips"][2]["url"]
+    assert playlist["missing"] == ["ghost"]
+    assert playlist["duration_seconds"] == pytest.approx(3.75)
+
+
+def test_playlist_without_any_clip_raises():
+    with pytest.raises(FileNotFoundError):
+        build_playlist(["ghost"], lambda token: None, lambda path: 1.0)
+
+
+def test_version_changes_with_the_bytes(clips):
+    before = clip_version(clips["v1"])
+    time.sleep(0.01)
+    with open(clips["v1"], "wb") as f:
+        f.write(b"canonical bytes")
+    assert clip_version(clips["v1"]) != before
+
+
+def test_find_clip_serves_the_versioned_file(clips, tmp_path):
+    raw, canonical = clips["v1"], clips["v2"]
+    missing = str(tmp_path / "gone.mp4")
+
+    assert find_clip([None, raw, canonical], clip_version(canonical)) == (canonical, True)
+    assert find_clip([missing, raw, canonical], clip_version(raw)) == (raw, True)
+    # Stale or absent versions get the preferred file, but not as a cacheable answer
+    assert find_clip([raw, canonical], "0" * 12) == (raw, False)
+    assert find_clip([raw, canonical]) == (raw, False)
+    assert find_clip([None, missing], clip_version(raw)) == (None, False)
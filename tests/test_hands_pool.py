@@ -0,0 +1,80 @@
+import pytest
+
+from utils.hands_pool import HandsPool
+
+
+class FakeHands:
+    def __init__(self):
+        self.closed = False
+        self.fail = False
+
+    def process(self, image):
+        if self.fail:
+            raise RuntimeError("graph failure")
+        return "results"
+
+    def close(self):
+        self.closed = True
+
+
+class Factory:
+    def __init__(self):
+        self.made = []
+        self.broken = False
+
+    def __call__(self, *args):
+        if self.broken:
+            raise RuntimeError("cannot build graph")
+        self.made.append(FakeHands())
+        return self.made[-1]
+
+
+def make_pool(factory):
+    return HandsPool(size=1, factory=factory, warmup=False)
+
+
+def test_caller_errors_keep_the_graph():
+    factory = Factory()
+    pool = make_pool(factory)
+
+    with pytest.raises(ValueError):
+        with pool.acquire(timeout=1) as hands:
+            hands.process(None)
+            raise ValueError("classifier failed")
+
+    assert len(factory.made) == 1 and not factory.made[0].closed
+    assert pool.stats()["replaced"] == 0
+
+
+def test_graph_errors_replace_the_graph():
+    factory = Factory()
+    pool = make_pool(factory)
+    factory.made[0].fail = True
+
+    with pytest.raises(RuntimeError):
+        with pool.acquire(timeout=1) as hands:
+            hands.process(None)
+
+    assert factory.made[0].closed and len(factory.made) == 2
+    with pool.acquire(timeout=1) as hands:
+        assert hands.process(None) == "results"
+
+
+def test_failed_replacement_keeps_the_slot():
+    factory = Factory()
+    pool = make_pool(factory)
+    factory.made[0].fail = True
+    factory.broken = True
+
+    with pytest.raises(RuntimeError):
+        with pool.acquire(timeout=1) as hands:
+            hands.process(None)
+    # Still broken: the checkout fails but the slot is not lost
+    with pytest.raises(RuntimeError, match="cannot build"):
+        with pool.acquire(timeout=1):
+            pass
+
+    factory.broken = False
+    with pool.acquire(timeout=1) as hands:
+        assert hands.process(None) == "results"
+    assert pool.stats()["available"] == 1
@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+from utils.hands_sessions import HandsSessionRegistry, SessionLimitError, clean_session_id
+
+
+class SlowFactory:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self, *args):
+        self.calls += 1
+        time.sleep(self.delay)
+        return type("FakeHands", (), {"close": lambda self: None})()
+
+
+def test_session_ids_are_bounded():
+    assert clean_session_id("  student-1  ") == "student-1"
+    assert clean_session_id("ws-lm-0a1b:2") == "ws-lm-0a1b:2"
+    for bad in ("", "   ", "x" * 65, "../etc", "a b", "ünicode", None, 42):
+        assert clean_session_id(bad) is None
+
+    registry = HandsSessionRegistry(factory=SlowFactory())
+    with pytest.raises(ValueError):
+        with registry.acquire("a b"):
+            pass
+
+
+def test_concurrent_first_frames_build_one_graph_outside_the_lock():
+    factory = SlowFactory(delay=0.2)
+    registry = HandsSessionRegistry(factory=factory)
+    seen = []
+
+    def frame(session_id):
+        with registry.acquire(session_id) as hands:
+            seen.append((session_id, hands))
+
+    threads = [threading.Thread(target=frame, args=("s1",)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    # While s1 is being built, other sessions are still looked up without waiting on it
+    time.sleep(0.05)
+    t0 = time.monotonic()
+    assert registry.stats()["active_sessions"] == 0
+    assert time.monotonic() - t0 < 0.1
+    for t in threads:
+        t.join()
+
+    assert factory.calls == 1
+    assert len({id(hands) for _, hands in seen}) == 1
+
+
+def test_creation_rate_is_limited_per_client():
+    registry = HandsSessionRegistry(factory=SlowFactory(), max_creations=2, creation_window=0.2)
+
+    for sid in ("a", "b"):
+        with registry.acquire(sid, client="10.0.0.1"):
+            pass
+    with pytest.raises(SessionLimitError):
+        with registry.acquire("c", client="10.0.0.1"):
+            pass
+    # Existing sessions and other clients are unaffected
+    with registry.acquire("a", client="10.0.0.1"):
+        pass
+    with registry.acquire("d", client="10.0.0.2"):
+        pass
+    assert registry.stats()["rate_limited"] == 1
+
+    time.sleep(0.25)
+    with registry.acquire("c", client="10.0.0.1"):
+        pass
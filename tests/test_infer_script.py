@@ -0,0 +1,76 @@
+import os
+import runpy
+import sys
+import types
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+from utils.predictor import Prediction
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "04.infer.py")
+
+
+def fake_cv2(shown):
+    cv2 = types.ModuleType("cv2")
+    frames = [np.zeros((4, 4, 3), dtype=np.uint8)]
+
+    class Capture:
+        def __init__(self, index):
+            pass
+
+        def isOpened(self):
+            return True
+
+        def read(self):
+            return (True, frames.pop()) if frames else (False, None)
+
+        def release(self):
+            pass
+
+    cv2.VideoCapture = Capture
+    cv2.flip = lambda frame, code: frame
+    cv2.cvtColor = lambda frame, code: frame
+    cv2.COLOR_BGR2RGB = cv2.FONT_HERSHEY_SIMPLEX = 0
+    cv2.putText = lambda frame, text, *args: shown.append(text)
+    cv2.imshow = lambda name, frame: None
+    cv2.waitKey = lambda delay: ord("q")
+    cv2.destroyAllWindows = lambda: None
+    return cv2
+
+
+def fake_mediapipe():
+    point = types.SimpleNamespace
+    hand = point(landmark=[point(x=i * 0.01, y=i * 0.02, z=0.0) for i in range(21)])
+    results = point(multi_hand_landmarks=[hand],
+                    multi_handedness=[point(classification=[point(label="Right", score=0.9)])])
+
+    class Hands:
+        def __init__(self, **kwargs):
+            pass
+
+        def process(self, image):
+            return results
+
+    mp = types.ModuleType("mediapipe")
+    mp.solutions = point(hands=point(Hands=Hands, HAND_CONNECTIONS=()),
+                         drawing_utils=point(draw_landmarks=lambda *args: None))
+    return mp
+
+
+def test_prediction_fields():
+    assert Prediction._fields == ("label", "confidence", "candidates", "probabilities")
+
+
+def test_webcam_loop_labels_a_frame_with_a_hand(monkeypatch):
+    rng = np.random.default_rng(0)
+    model = LogisticRegression().fit(rng.normal(size=(20, 126)), ["hello", "thanks"] * 10)
+    shown = []
+    monkeypatch.setitem(sys.modules, "cv2", fake_cv2(shown))
+    monkeypatch.setitem(sys.modules, "mediapipe", fake_mediapipe())
+    monkeypatch.setitem(sys.modules, "joblib", types.SimpleNamespace(load=lambda path: model))
+
+    runpy.run_path(SCRIPT)
+
+    assert len(shown) == 1 and shown[0].startswith("Gesture: ")
+    assert shown[0].split()[1] in ("hello", "thanks")
@@ -0,0 +1,90 @@
+import math
+import random
+from types import SimpleNamespace
+
+import numpy as np
+
+import pytest
+
+from utils.landmarks import (landmarks_to_array, normalize_landmarks, empty_hands, hand_features,
+                             parse_landmarks, parse_landmark_bytes)
+
+
+def legacy_normalize_landmarks(landmarks):
+    # Original per-landmark implementation the classifiers were trained against
+    wrist = landmarks[0]
+    translated = [(lm.x - wrist.x, lm.y - wrist.y, lm.z - wrist.z) for lm in landmarks]
+    scale = math.sqrt(translated[9][0]**2 + translated[9][1]**2 + translated[9][2]**2)
+    if scale < 1e-6:
+        scale = 1.0
+    normalized = [(x/scale, y/scale, z/scale) for (x, y, z) in translated]
+    return [coord for triple in normalized for coord in triple]
+
+
+def random_hand(rng):
+    return [SimpleNamespace(x=rng.random(), y=rng.random(), z=rng.uniform(-0.2, 0.2)) for _ in range(21)]
+
+
+def test_single_hand_matches_legacy_bit_for_bit():
+    rng = random.Random(1234)
+    for _ in range(200):
+        hand = random_hand(rng)
+        expected = np.array(legacy_normalize_landmarks(hand))
+        got = normalize_landmarks(hand)
+        assert got.shape == (63,)
+        assert got.tobytes() == expected.tobytes()
+
+
+def test_two_hand_features_match_legacy_bit_for_bit():
+    rng = random.Random(99)
+    for present_left, present_right in [(True, True), (True, False), (False, True), (False, False)]:
+        left = random_hand(rng) if present_left else None
+        right = random_hand(rng) if present_right else None
+
+        raw = empty_hands(2)
+        if left:
+            landmarks_to_array(left, out=raw[0])
+        if right:
+            landmarks_to_array(right, out=raw[1])
+        features, present = hand_features(raw)
+
+        left_legacy = legacy_normalize_landmarks(left) if left else [0.0] * 63
+        right_legacy = legacy_normalize_landmarks(right) if right else [0.0] * 63
+        expected = np.array([left_legacy + right_legacy])
+
+        assert features.shape == (1, 126)
+        assert features.tobytes() == expected.tobytes()
+        assert present.tolist() == [present_left, present_right]
+        assert bool(present.any()) == any(v != 0.0 for v in expected[0])
+
+
+def test_degenerate_hand_uses_unit_scale():
+    hand = [SimpleNamespace(x=0.5, y=0.5, z=0.0) for _ in range(21)]
+    assert normalize_landmarks(hand).tobytes() == np.array(legacy_normalize_landmarks(hand)).tobytes()
+
+
+def test_parse_landmarks_json_and_binary_agree_with_frame_path():
+    rng = random.Random(7)
+    hand = random_hand(rng)
+    raw = landmarks_to_array(hand).astype(np.float32)
+
+    # Single hand into the right slot, as the frame path does for a "Right" detection
+    from_json = parse_landmarks(raw.tolist(), num_hands=2, hand="right")
+    from_bytes = parse_landmark_bytes(raw.astype('<f4').tobytes(), num_hands=2, hand="right")
+    assert from_json.shape == (2, 21, 3)
+    assert not from_json[0].any()
+    assert from_json.tobytes() == from_bytes.tobytes()
+
+    letter = parse_landmarks(raw.reshape(-1).tolist(), num_hands=1)
+    features, present = hand_features(letter)
+    assert present.tolist() == [True]
+    assert np.allclose(features[0], normalize_landmarks(hand), atol=1e-6)
+
+
+def test_parse_landmarks_rejects_bad_shapes():
+    with pytest.raises(ValueError):
+        parse_landmarks([[0.0, 0.0, 0.0]] * 20)
+    with pytest.raises(ValueError):
+        parse_landmarks(np.zeros((2, 21, 3)), num_hands=1)
+    with pytest.raises(ValueError):
+        parse_landmark_bytes(b"\x00" * 10)
@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+
+from utils.llm_client import AsyncLLMClient, CircuitOpenError
+
+
+class StubTransport:
+    """Async stand-in for the chat completions API."""
+
+    def __init__(self, delay=0.05, fail=0):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def __call__(self, prompt, max_tokens, temperature):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail:
+                self.fail -= 1
+                raise ConnectionError("upstream unavailable")
+            return prompt.upper()
+        finally:
+            self.active -= 1
+
+
+def make_client(transport, **kwargs):
+    kwargs.setdefault("backoff", 0.001)
+    return AsyncLLMClient(transport, **kwargs)
+
+
+def test_concurrency_is_bounded():
+    transport = StubTransport()
+    client = make_client(transport, max_concurrency=3)
+
+    async def run():
+        return await asyncio.gather(*(client.complete(f"caption {i}", 50, 0.2) for i in range(10)))
+
+    assert asyncio.run(run()) == [f"CAPTION {i}" for i in range(10)]
+    assert transport.max_active == 3
+
+
+def test_identical_prompts_share_one_request():
+    transport = StubTransport()
+    client = make_client(transport)
+
+    async def run():
+        return await asyncio.gather(*(client.complete("hello class", 50, 0.2) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["HELLO CLASS"] * 5
+    assert transport.calls == 1
+    assert client.stats()["coalesced"] == 4
+
+
+def test_transient_failures_and_timeouts_are_retried():
+    transport = StubTransport(fail=2)
+    client = make_client(transport, retries=2)
+    assert asyncio.run(client.complete("again", 50, 0.2)) == "AGAIN"
+    assert transport.calls == 3
+
+    slow = make_client(StubTransport(delay=1.0), timeout=0.05, retries=1)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(slow.complete("too slow", 50, 0.2))
+    assert slow.stats()["timeouts"] == 2
+
+
+def test_circuit_opens_then_recovers():
+    transport = StubTransport(delay=0, fail=2)
+    client = make_client(transport, retries=0, failure_threshold=2, reset_after=0.1)
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await client.complete("hi", 50, 0.2)
+        # Open: callers fail fast without reaching the transport
+        with pytest.raises(CircuitOpenError):
+            await client.complete("hi", 50, 0.2)
+        assert transport.calls == 2 and client.state == "open"
+
+        await asyncio.sleep(0.15)
+        assert await client.complete("hi", 50, 0.2) == "HI"
+
+    asyncio.run(run())
+    assert client.state == "closed"
+    assert client.stats()["short_circuited"] == 1
+
+
+class BadRequest(Exception):
+    http_status = 400
+
+
+def test_cancelled_leader_does_not_cancel_coalesced_waiters():
+    transport = StubTransport(delay=0.1)
+    client = make_client(transport)
+
+    async def run():
+        leader = asyncio.create_task(client.complete("hello class", 50, 0.2))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(client.complete("hello class", 50, 0.2))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await waiter
+
+    assert asyncio.run(run()) == "HELLO CLASS"
+    assert transport.calls == 2
+    assert client.stats()["reissued"] == 1
+
+
+def test_client_errors_are_not_retried_and_do_not_trip_the_breaker():
+    calls = []
+
+    async def transport(prompt, max_tokens, temperature):
+        calls.append(prompt)
+        raise BadRequest("invalid request")
+
+    client = make_client(transport, retries=3, failure_threshold=1)
+
+    async def run():
+        for _ in range(3):
+            with pytest.raises(BadRequest):
+                await client.complete("hi", 50, 0.2)
+
+    asyncio.run(run())
+    assert len(calls) == 3
+    assert client.state == "closed"
+    assert client.stats()["rejected"] == 3
@@ -0,0 +1,100 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from utils.microbatch import MicroBatcher
+from utils.predictor import Prediction
+
+
+class StubPredictor:
+    """predict_batch echoes each row's first value; a NaN row makes the whole call fail."""
+
+    has_proba = True
+    classes = np.array(["a", "b"])
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def predict_batch(self, features):
+        self.gate.wait(5)
+        self.calls.append(len(features))
+        time.sleep(self.delay)
+        if np.isnan(features).any():
+            raise ValueError("NaN in features")
+        return [Prediction(float(row[0]), 1.0, []) for row in features]
+
+
+def row(value):
+    return np.full((1, 4), value, dtype=float)
+
+
+def test_concurrent_rows_share_one_call():
+    predictor = StubPredictor()
+    batcher = MicroBatcher(predictor, max_batch=8, max_wait_ms=50)
+    predictor.gate.clear()
+    # The first row is taken on its own while the gate is shut; the next eight queue up behind it
+    first = batcher.submit(row(-1))
+    time.sleep(0.05)
+    futures = [batcher.submit(row(i)) for i in range(8)]
+    predictor.gate.set()
+
+    assert first.result(timeout=5).label == -1
+    assert [f.result(timeout=5).label for f in futures] == list(range(8))
+    assert predictor.calls == [1, 8]
+    assert batcher.stats()["largest_batch"] == 8
+    batcher.close()
+
+
+def test_a_lone_row_is_flushed_after_max_wait():
+    batcher = MicroBatcher(StubPredictor(), max_batch=8, max_wait_ms=20)
+
+    t0 = time.monotonic()
+    assert batcher.predict_one(row(3), timeout=5).label == 3
+    elapsed = time.monotonic() - t0
+
+    assert 0.015 <= elapsed < 1.0
+    batcher.close()
+
+
+def test_a_bad_row_fails_only_its_own_request():
+    predictor = StubPredictor()
+    batcher = MicroBatcher(predictor, max_batch=4, max_wait_ms=50)
+    predictor.gate.clear()
+    blocker = batcher.submit(row(0))
+    time.sleep(0.05)
+    futures = [batcher.submit(row(v)) for v in (1, np.nan, 2)]
+    predictor.gate.set()
+
+    blocker.result(timeout=5)
+    assert futures[0].result(timeout=5).label == 1
+    assert futures[2].result(timeout=5).label == 2
+    with pytest.raises(ValueError):
+        futures[1].result(timeout=5)
+    assert batcher.stats()["split_batches"] == 1
+    batcher.close()
+
+
+def test_close_fails_queued_rows_and_rejects_new_ones():
+    predictor = StubPredictor()
+    batcher = MicroBatcher(predictor, max_batch=1, max_wait_ms=0)
+    predictor.gate.clear()
+    running = batcher.submit(row(1))
+    time.sleep(0.05)
+    queued = batcher.submit(row(2))
+
+    # The worker is stuck on the first row past close()'s join timeout
+    batcher.close()
+    predictor.gate.set()
+
+    with pytest.raises(RuntimeError, match="closed"):
+        queued.result(timeout=5)
+    assert running.result(timeout=5).label == 1
+    batcher._worker.join(timeout=5)
+    assert not batcher._worker.is_alive()
+    with pytest.raises(RuntimeError, match="closed"):
+        batcher.predict_one(row(3), timeout=1)
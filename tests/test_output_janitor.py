@@ -0,0 +1,83 @@
+import os
+import time
+
+from utils.output_janitor import OutputJanitor, RetentionRule
+
+
+def make_output(tmp_path, name, size=100, age=0.0):
+    path = tmp_path / name
+    path.write_bytes(b"x" * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def make_janitor(tmp_path, **kwargs):
+    rules = [RetentionRule("reverse_", ttl=60, max_bytes=250),
+             RetentionRule("seg_", ttl=3600, max_bytes=10_000)]
+    return OutputJanitor(str(tmp_path), rules, min_age=kwargs.pop("min_age", 5), **kwargs)
+
+
+def test_ttl_is_per_prefix(tmp_path):
+    make_output(tmp_path, "reverse_old.mp4", age=120)
+    make_output(tmp_path, "reverse_new.mp4", age=1)
+    make_output(tmp_path, "seg_abc.mp4", age=120)
+    make_output(tmp_path, "notes.txt", age=99999)
+
+    assert make_janitor(tmp_path).sweep() == 1
+    assert sorted(os.listdir(tmp_path)) == ["notes.txt", "reverse_new.mp4", "seg_abc.mp4"]
+
+
+def test_size_cap_removes_oldest_first(tmp_path):
+    for i, age in enumerate((50, 40, 30, 20)):
+        make_output(tmp_path, f"reverse_{i}.mp4", age=age)
+
+    make_janitor(tmp_path).sweep()
+
+    assert sorted(os.listdir(tmp_path)) == ["reverse_2.mp4", "reverse_3.mp4"]
+
+
+def test_files_being_served_are_kept(tmp_path):
+    make_output(tmp_path, "reverse_old.mp4", age=120)
+    janitor = make_janitor(tmp_path)
+
+    with janitor.lease("reverse_old.mp4"):
+        # Serving refreshes the access time, so backdate it again to force expiry
+        make_output(tmp_path, "reverse_old.mp4", age=120)
+        assert janitor.sweep() == 0
+        assert janitor.stats()["skipped_in_use"] == 1
+
+    assert janitor.sweep() == 1
+    assert janitor.stats()["in_use"] == 0
+
+
+def test_recent_files_survive_the_size_cap(tmp_path):
+    for i in range(4):
+        make_output(tmp_path, f"reverse_{i}.mp4", age=1)
+
+    assert make_janitor(tmp_path).sweep() == 0
+
+
+def test_streaming_directories_expire_as_a_whole(tmp_path):
+    hls = tmp_path / "hls_abc"
+    hls.mkdir()
+    for name in ("index.m3u8", "part_000.ts"):
+        make_output(hls, name, age=7200)
+    janitor = OutputJanitor(str(tmp_path), [RetentionRule("hls_", ttl=3600, max_bytes=10_000)], min_age=5)
+
+    with janitor.lease("hls_abc/part_000.ts"):
+        assert janitor.sweep() == 0
+
+    # Serving a segment refreshed the directory's age
+    assert janitor.sweep(now=time.time() + 3700) == 1
+    assert not hls.exists()
+
+
+def test_empty_prefix_covers_the_directory_but_not_partial_files(tmp_path):
+    for i, age in enumerate((50, 40, 30)):
+        make_output(tmp_path, f"{i}abc.mp4", age=age)
+    make_output(tmp_path, ".0abc.1234.mp4", age=500)
+
+    OutputJanitor(str(tmp_path), [RetentionRule("", ttl=3600, max_bytes=200)], min_age=5).sweep()
+
+    assert sorted(os.listdir(tmp_path)) == [".0abc.1234.mp4", "1abc.mp4", "2abc.mp4"]
@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from utils.inference_worker import load_predictors
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def model_files(tmp_path):
+    rng = np.random.default_rng(0)
+    paths = []
+    for name, width, classes in (("gesture", 126, "abcd"), ("letter", 63, "xyz")):
+        model = LogisticRegression(max_iter=200).fit(rng.random((40, width)), [classes[i % len(classes)]
+                                                                            for i in range(40)])
+        path = tmp_path / f"{name}.pkl"
+        joblib.dump(model, path)
+        paths.append(str(path))
+    return paths
+
+
+def test_workers_use_the_configured_top_k(model_files):
+    predictors = load_predictors(*model_files, top_k=2)
+
+    assert sorted(predictors) == ["gesture", "letter"]
+    assert predictors["gesture"].top_k == 2
+    assert len(predictors["gesture"].predict_one(np.zeros((1, 126))).candidates) == 2
+
+
+def test_pool_round_trip_does_not_reimport_the_app(tmp_path, model_files):
+    # The launching script stands in for app.py: importing it again in a worker would write a marker
+    marker = tmp_path / "imports.log"
+    script = tmp_path / "fake_app.py"
+    script.write_text(textwrap.dedent(f"""
+        import sys
+        sys.path.insert(0, {ROOT!r})
+        with open({str(marker)!r}, "a") as f:
+            f.write("imported\\n")
+
+        import numpy as np
+        from utils.process_inference import ProcessInferencePool
+
+        if __name__ == "__main__":
+            pool = ProcessInferencePool(2, {model_files[0]!r}, {model_files[1]!r}, timeout=60)
+            frame = np.full((48, 64, 3), 7, dtype=np.uint8)
+            for session_id in (None, "student-1", "student-1"):
+                for mode in ("gesture", "letter"):
+                    result = pool.infer(mode, frame, session_id=session_id)
+                    assert result["confidence"] == 0.0 and result["detections"] == [], result
+                    assert (result["annotated_frame"] == frame).all()
+            assert pool.stats()["jobs"] == 6 and pool.stats()["idle"] == 2
+            pool.close()
+            print("ok")
+    """))
+
+    proc = subprocess.run([sys.executable, str(script)], capture_output=True, text=True, timeout=300)
+
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert proc.stdout.strip().endswith("ok")
+    assert marker.read_text().splitlines() == ["imported"]
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from utils.smoothing import SmoothingRegistry, TemporalSmoother
+
+CLASSES = np.array(["hello", "thanks", "yes", "no"])
+
+
+def det(label, p=0.9):
+    return [{"class": label, "confidence": p}]
+
+
+def test_ema_tracks_the_full_probability_row():
+    smoother = TemporalSmoother(alpha=0.5, enter_threshold=0.0, confirm_frames=1)
+
+    smoother.update([], np.array([0.5, 0.3, 0.2, 0.0]), CLASSES)
+    out = smoother.update([], np.array([0.7, 0.1, 0.2, 0.0]), CLASSES)
+
+    # (0.5 * 0.5) * 0.5 + 0.5 * 0.7
+    assert out["label"] == "hello"
+    assert out["confidence"] == pytest.approx(0.475)
+    # "yes" never made a top-1 but keeps its real score instead of decaying from zero
+    assert smoother._score("yes") == pytest.approx(0.15)
+
+
+def test_classes_outside_the_top_k_are_not_treated_as_zero():
+    dense, sparse = TemporalSmoother(alpha=0.5), TemporalSmoother(alpha=0.5)
+    rows = [np.array([0.40, 0.35, 0.25, 0.0]), np.array([0.30, 0.45, 0.25, 0.0])]
+    for row in rows:
+        dense.update([], row, CLASSES)
+        top = np.argsort(-row)[:1]
+        sparse.update([{"class": str(CLASSES[i]), "confidence": float(row[i])} for i in top])
+
+    assert dense._score("hello") == pytest.approx(0.5 * 0.2 + 0.15)
+    assert sparse._score("hello") == pytest.approx(0.1)
+
+
+def test_majority_vote_blocks_a_single_spike():
+    smoother = TemporalSmoother(window=5, alpha=1.0, enter_threshold=0.5, confirm_frames=1)
+    for _ in range(3):
+        assert smoother.update(det("hello"))["label"] == "hello"
+
+    # One confident frame of "thanks" leads the EMA but not the window's vote
+    assert smoother.update(det("thanks", 0.95))["label"] is None
+    smoother.update(det("thanks", 0.95))
+    assert smoother.update(det("thanks", 0.95))["label"] == "thanks"
+
+
+def test_hysteresis_keeps_the_label_until_it_drops_below_exit():
+    smoother = TemporalSmoother(window=1, alpha=1.0, enter_threshold=0.6, exit_threshold=0.4, confirm_frames=1)
+
+    assert smoother.update(det("hello", 0.5))["label"] is None  # below enter
+    assert smoother.update(det("hello", 0.7))["label"] == "hello"
+    assert smoother.update(det("hello", 0.45))["label"] == "hello"  # between exit and enter
+    assert smoother.update(det("hello", 0.3))["label"] is None  # below exit
+
+
+def test_label_is_confirmed_once_after_k_frames():
+    smoother = TemporalSmoother(alpha=1.0, confirm_frames=3)
+
+    confirmed = [smoother.update(det("yes"))["confirmed"] for _ in range(6)]
+    assert confirmed == [None, None, "yes", None, None, None]
+
+    # Dropping out (no hand) and coming back confirms the sign again
+    for _ in range(3):
+        smoother.update([])
+    confirmed = [smoother.update(det("yes"))["confirmed"] for _ in range(3)]
+    assert confirmed == [None, None, "yes"]
+    assert smoother.confirmed_count == 2
+
+
+def test_registry_keeps_one_smoother_per_session_and_mode():
+    registry = SmoothingRegistry(alpha=1.0, confirm_frames=2)
+    for _ in range(2):
+        registry.update("s1", "gesture", det("hello"))
+    out = registry.update("s1", "letter", [], np.array([0.0, 0.0, 0.9, 0.1]), CLASSES)
+
+    assert out["label"] == "yes" and out["stable_frames"] == 1
+    assert registry.stats()["active_sessions"] == 2 and registry.stats()["confirmed"] == 1
+    assert registry.close_session("s1") == 2
@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+from collections import namedtuple
+
+import pytest
+
+from utils import stream_compose
+from utils.stream_compose import StreamingComposer
+
+Info = namedtuple("Info", "codec frames fps")
+
+FAKE_FFMPEG = """#!/bin/sh
+# Stand-in for ffmpeg: copy the -i input to the last argument
+while [ "$#" -gt 1 ]; do
+    if [ "$1" = "-i" ]; then src="$2"; fi
+    shift
+done
+cp "$src" "$1"
+"""
+
+
+@pytest.fixture
+def composer(tmp_path, monkeypatch):
+    script = tmp_path / "ffmpeg"
+    script.write_text(FAKE_FFMPEG)
+    script.chmod(0o755)
+    monkeypatch.setattr(stream_compose, "FFMPEG", str(script))
+    out = tmp_path / "outputs"
+    out.mkdir()
+    return StreamingComposer(str(out), probe=lambda path: Info("h264", 50, 25.0))
+
+
+def wait_done(composer, job_id):
+    for _ in range(200):
+        status = composer.status(job_id)
+        if status["done"]:
+            return status
+        time.sleep(0.01)
+    raise AssertionError("composition did not finish")
+
+
+def test_playlist_is_available_before_clips(tmp_path, composer):
+    clip = tmp_path / "hello.mp4"
+    clip.write_bytes(b"clip")
+    release = threading.Event()
+
+    def clip_for(token):
+        if token == "world":
+            release.wait(5)
+        return None if token == "unknown" else str(clip)
+
+    playlist = composer.start(["hello", "unknown", "world"], clip_for)
+    job_id = playlist.split("/")[0][len("hls_"):]
+    path = os.path.join(composer.output_dir, playlist)
+
+    # Announced immediately, and the first sign is playable while "world" is pending
+    assert os.path.isfile(path)
+    for _ in range(200):
+        if "part_000.ts" in open(path).read():
+            break
+        time.sleep(0.01)
+    text = open(path).read()
+    assert "part_000.ts" in text and "#EXT-X-ENDLIST" not in text
+
+    release.set()
+    status = wait_done(composer, job_id)
+    text = open(path).read()
+
+    assert status["ready"] == ["hello", "world"]
+    assert status["missing"] == ["unknown"]
+    assert status["duration_seconds"] == pytest.approx(4.0)
+    assert text.count("#EXTINF:2.000,") == 2
+    assert text.count("#EXT-X-DISCONTINUITY") == 1
+    assert text.rstrip().endswith("#EXT-X-ENDLIST")
+    assert sorted(os.listdir(os.path.dirname(path))) == ["index.m3u8", "part_000.ts", "part_002.ts"]
+
+
+SEGMENTING_FFMPEG = """#!/usr/bin/env python3
+# Stand-in for ffmpeg: copies the input, or with -f segment writes two pieces and a csv list
+import os, shutil, sys
+args = sys.argv[1:]
+src, out = args[args.index("-i") + 1], args[-1]
+if "segment" in args:
+    step = float(args[args.index("-segment_time") + 1])
+    with open(args[args.index("-segment_list") + 1], "w") as listing:
+        for k, (start, end) in enumerate([(0.0, step), (step, step + 2.0)]):
+            name = out % k
+            shutil.copy(src, name)
+            listing.write(f"{os.path.basename(name)},{start:.6f},{end:.6f}\\n")
+else:
+    shutil.copy(src, out)
+"""
+
+
+def _script(tmp_path, name, text):
+    script = tmp_path / name
+    script.write_text(text)
+    script.chmod(0o755)
+    return str(script)
+
+
+def test_long_clips_are_split_and_target_duration_is_fixed(tmp_path, monkeypatch):
+    monkeypatch.setattr(stream_compose, "FFMPEG", _script(tmp_path, "ffmpeg", SEGMENTING_FFMPEG))
+    out = tmp_path / "outputs"
+    out.mkdir()
+    lengths = {"short": 50, "long": 200}  # frames at 25 fps: 2 s and 8 s
+    composer = StreamingComposer(str(out), probe=lambda path: Info("h264", lengths[os.path.basename(path)], 25.0),
+                                 target_duration=6)
+    for name in lengths:
+        (tmp_path / name).write_bytes(b"clip")
+
+    playlist = composer.start(["short", "long"], lambda token: str(tmp_path / token))
+    status = wait_done(composer, playlist.split("/")[0][len("hls_"):])
+    text = open(os.path.join(str(out), playlist)).read()
+
+    assert status["ready"] == ["short", "long"]
+    assert status["duration_seconds"] == pytest.approx(10.0)
+    assert "#EXT-X-TARGETDURATION:6" in text
+    assert ["part_000.ts", "part_001_000.ts", "part_001_001.ts"] == [l for l in text.splitlines() if l.endswith(".ts")]
+    # Pieces of one clip share a timeline; only the clip boundary is a discontinuity
+    assert text.count("#EXT-X-DISCONTINUITY") == 1
+    assert "#EXTINF:6.000," in text and "#EXTINF:2.000," in text
+
+
+def test_duration_falls_back_to_the_container(tmp_path, composer, monkeypatch):
+    monkeypatch.setattr(stream_compose, "FFPROBE", _script(tmp_path, "ffprobe", "#!/bin/sh\necho 3.250000\n"))
+    composer.probe = lambda path: Info("h264", 0, 25.0)
+    clip = tmp_path / "clip.mp4"
+    clip.write_bytes(b"clip")
+
+    playlist = composer.start(["hello"], lambda token: str(clip))
+    status = wait_done(composer, playlist.split("/")[0][len("hls_"):])
+
+    assert status["duration_seconds"] == pytest.approx(3.25)
+    assert "#EXTINF:3.250," in open(os.path.join(composer.output_dir, playlist)).read()
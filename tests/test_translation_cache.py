@@ -0,0 +1,102 @@
+import asyncio
+
+from utils.translation_cache import TranslationCache
+
+
+class StubClient:
+    """Counts completions like a chat client would be billed."""
+
+    def __init__(self):
+        self.calls = []
+
+    def gloss(self, text):
+        self.calls.append(text)
+        return text.upper()
+
+
+def key(text, model="gpt-4o-mini", version=1, temperature=0.2):
+    return TranslationCache.make_key("text_to_gloss", text, model, version, temperature)
+
+
+def test_identical_captions_call_the_llm_once(tmp_path):
+    cache = TranslationCache(str(tmp_path / "llm.sqlite3"))
+    client = StubClient()
+
+    for text in ("Hello  world", "hello world", " HELLO WORLD "):
+        assert cache.memoize(key(text), lambda: client.gloss("hello world")) == "HELLO WORLD"
+
+    assert client.calls == ["hello world"]
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+
+def test_key_includes_model_prompt_and_temperature():
+    keys = {key("hi"), key("hi", model="gpt-4o"), key("hi", version=2), key("hi", temperature=0.3)}
+    assert len(keys) == 4
+
+
+def test_translations_survive_a_restart(tmp_path):
+    path = str(tmp_path / "llm.sqlite3")
+    client = StubClient()
+    TranslationCache(path).memoize(key("good morning"), lambda: client.gloss("good morning"))
+
+    restarted = TranslationCache(path)
+    assert restarted.memoize(key("good morning"), lambda: client.gloss("good morning")) == "GOOD MORNING"
+    assert len(client.calls) == 1
+    assert restarted.stats()["disk_hits"] == 1
+
+
+def test_expired_entries_are_recomputed(tmp_path):
+    cache = TranslationCache(str(tmp_path / "llm.sqlite3"), ttl=60)
+    cache.put(key("thank you"), "THANK YOU", now=0)
+
+    assert cache.get(key("thank you")) is None
+    assert cache.stats()["expired"] == 1
+    assert cache.purge() == 0
+
+
+def test_bypass_refreshes_the_entry(tmp_path):
+    cache = TranslationCache(None)
+    cache.put(key("see you"), "SEE YOU LATER")
+
+    assert cache.memoize(key("see you"), lambda: "SEE YOU", bypass=True) == "SEE YOU"
+    assert cache.get(key("see you")) == "SEE YOU"
+    assert cache.stats()["bypassed"] == 1
+
+
+def test_async_memoize_awaits_only_on_a_miss():
+    cache = TranslationCache(None)
+    client = StubClient()
+
+    async def compute():
+        return client.gloss("good night")
+
+    async def run():
+        return [await cache.amemoize(key("good night"), compute) for _ in range(3)]
+
+    assert asyncio.run(run()) == ["GOOD NIGHT"] * 3
+    assert client.calls == ["good night"]
+
+
+def test_async_lookups_do_not_wait_on_disk(tmp_path):
+    path = str(tmp_path / "llm.sqlite3")
+    TranslationCache(path).put(key("on disk"), "ON DISK")
+    cache = TranslationCache(path)
+    cache.put(key("in memory"), "IN MEMORY")
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(1)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        # A sync thread is busy with SQLite: memory hits still answer and the loop keeps running
+        with cache._db_lock:
+            assert await cache.aget(key("in memory")) == "IN MEMORY"
+            lookup = asyncio.ensure_future(cache.aget(key("on disk")))
+            await ticker()
+            assert not lookup.done()
+        return await lookup
+
+    assert asyncio.run(run()) == "ON DISK"
+    assert len(ticks) == 5
@@ -0,0 +1,274 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from dynamic_video_fetcher import VideoCacheManager, WLASLVideoFetcher
+
+DELAY = 0.2
+MP4_HEADER = b"\x00\x00\x00\x18ftypisom\x00\x00\x02\x00isomiso2"
+
+
+class _ClipServer:
+    """Local stand-in for the WLASL video hosts: /<video_id>.mp4 -> bytes after a short delay."""
+
+    def __init__(self):
+        self.hits = {}
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server.lock:
+                    server.hits[self.path] = server.hits.get(self.path, 0) + 1
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                try:
+                    time.sleep(DELAY)
+                    if self.path.startswith("/missing"):
+                        self.send_error(404)
+                        return
+                    body = MP4_HEADER + self.path.encode() * 100
+                    length = len(body)
+                    if self.path.startswith("/html"):
+                        body = b"<html>not a video</html>"
+                        length = len(body)
+                    elif self.path.startswith("/short"):
+                        # Connection drops before the advertised length is sent
+                        length = len(body) * 2
+                    self.send_response(200)
+                    self.send_header("Content-Length", str(length))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with server.lock:
+                        server.active -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def clip_server():
+    server = _ClipServer()
+    yield server
+    server.close()
+
+
+def make_fetcher(tmp_path, base_url, glosses, **kwargs):
+    mapper = [
+        {"gloss": g, "instances": [{"source": "aslbrick", "video_id": vid, "url": f"{base_url}/{vid}.mp4"}]}
+        for g, vid in glosses.items()
+    ]
+    mapper_path = tmp_path / "WLASL_v0.3.json"
+    mapper_path.write_text(json.dumps(mapper))
+    return WLASLVideoFetcher(str(mapper_path), cache_dir=str(tmp_path / "cache"), use_index=False, **kwargs)
+
+
+def test_tokens_download_concurrently(tmp_path, clip_server):
+    glosses = {f"word{i}": f"v{i}" for i in range(8)}
+    fetcher = make_fetcher(tmp_path, clip_server.url, glosses, max_downloads=8, per_host_limit=8)
+
+    t0 = time.monotonic()
+    result = fetcher.get_videos_for_gloss_tokens(list(glosses))
+    elapsed = time.monotonic() - t0
+
+    assert sorted(result) == sorted(glosses)
+    assert all(open(paths[0], "rb").read().startswith(MP4_HEADER) for paths in result.values())
+    # Sequential downloads would take 8 * DELAY
+    assert elapsed < 4 * DELAY
+    assert fetcher.downloads.stats()["downloads"] == 8
+
+
+def test_per_host_limit(tmp_path, clip_server):
+    glosses = {f"word{i}": f"v{i}" for i in range(6)}
+    fetcher = make_fetcher(tmp_path, clip_server.url, glosses, max_downloads=6, per_host_limit=2)
+
+    fetcher.get_videos_for_gloss_tokens(list(glosses))
+
+    assert clip_server.max_active <= 2
+    assert len(clip_server.hits) == 6
+
+
+def test_concurrent_requests_share_one_download(tmp_path, clip_server):
+    fetcher = make_fetcher(tmp_path, clip_server.url, {"apple": "v1"})
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(fetcher.get_video_paths_for_gloss("apple")))
+               for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert clip_server.hits == {"/v1.mp4": 1}
+    assert len({tuple(r) for r in results}) == 1
+    assert fetcher.downloads.stats()["deduplicated"] == 4
+
+    # Later calls are served from the cache without another request
+    assert fetcher.get_video_paths_for_gloss("apple") == results[0]
+    assert clip_server.hits == {"/v1.mp4": 1}
+
+
+def test_failed_download_returns_nothing(tmp_path, clip_server):
+    fetcher = make_fetcher(tmp_path, clip_server.url, {"ghost": "missing1"})
+
+    assert fetcher.get_video_paths_for_gloss("ghost") == []
+    assert not (tmp_path / "cache" / "missing1.mp4").exists()
+    assert fetcher.downloads.stats()["failures"] == 1
+
+
+@pytest.mark.parametrize("video_id", ["short1", "html1"])
+def test_incomplete_or_invalid_download_is_not_cached(tmp_path, clip_server, video_id):
+    fetcher = make_fetcher(tmp_path, clip_server.url, {"word": video_id})
+
+    assert fetcher.get_video_paths_for_gloss("word") == []
+    cache = tmp_path / "cache"
+    assert not (cache / f"{video_id}.mp4").exists()
+    assert not list(cache.glob("*.part"))
+
+
+def test_corrupt_cache_entry_is_replaced(tmp_path, clip_server):
+    fetcher = make_fetcher(tmp_path, clip_server.url, {"apple": "v1"})
+    (tmp_path / "cache" / "v1.mp4").write_bytes(b"truncated")
+
+    paths = fetcher.get_video_paths_for_gloss("apple")
+
+    assert paths and open(paths[0], "rb").read().startswith(MP4_HEADER)
+    assert clip_server.hits == {"/v1.mp4": 1}
+    assert fetcher.downloads.stats()["invalid_removed"] == 1
+
+
+def test_cache_manager_evicts_least_recently_used_and_persists(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    manager = VideoCacheManager(str(cache_dir), max_bytes=250, grace_seconds=0)
+
+    for i in range(2):
+        (cache_dir / f"v{i}.mp4").write_bytes(b"x" * 100)
+        manager.add(f"v{i}", str(cache_dir / f"v{i}.mp4"))
+        time.sleep(0.01)
+    manager.hit("v0")
+    (cache_dir / "v2.mp4").write_bytes(b"x" * 100)
+    manager.add("v2", str(cache_dir / "v2.mp4"))
+
+    # v1 is the least recently used once v0 has been read again
+    assert sorted(p.name for p in cache_dir.glob("*.mp4")) == ["v0.mp4", "v2.mp4"]
+    stats = manager.stats()
+    assert (stats["evictions"], stats["hits"], stats["bytes"]) == (1, 1, 200)
+
+    manager.save(force=True)
+    reloaded = VideoCacheManager(str(cache_dir), max_bytes=250, grace_seconds=0)
+    assert reloaded.stats()["entries"] == 2
+
+
+FAKE_FFMPEG = """#!/bin/sh
+# Stand-in for ffmpeg: copy the -i input to the last argument and log the call
+echo "$@" >> "$(dirname "$0")/calls.log"
+while [ "$#" -gt 1 ]; do
+    if [ "$1" = "-i" ]; then src="$2"; fi
+    shift
+done
+cp "$src" "$1"
+"""
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "ffmpeg"
+    script.write_text(FAKE_FFMPEG)
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}:{os.environ['PATH']}")
+    return bin_dir / "calls.log"
+
+
+def test_canonical_clips_are_transcoded_once(tmp_path, clip_server, fake_ffmpeg):
+    fetcher = make_fetcher(tmp_path, clip_server.url, {"apple": "v1", "pear": "v2"})
+
+    first = fetcher.get_videos_for_gloss_tokens(["apple", "pear"])
+    paths = [fetcher.get_video_paths_for_gloss(g, canonical=True)[0] for g in ("apple", "pear")]
+    again = [fetcher.get_video_paths_for_gloss(g, canonical=True)[0] for g in ("apple", "pear")]
+
+    canonical_dir = os.path.join(str(tmp_path / "cache"), "canonical", fetcher.normalizer.profile)
+    assert paths == again == [os.path.join(canonical_dir, f"{v}.mp4") for v in ("v1", "v2")]
+    assert open(paths[0], "rb").read() == open(first["apple"][0], "rb").read()
+    assert len(fake_ffmpeg.read_text().splitlines()) == 2
+    assert fetcher.cache_stats()["canonical"]["normalized"] == 2
+
+
+def test_evicting_a_clip_drops_its_canonical_copy(tmp_path, clip_server, fake_ffmpeg):
+    fetcher = make_fetcher(tmp_path, clip_server.url, {"apple": "v1"})
+    canonical = fetcher.get_video_paths_for_gloss("apple", canonical=True)[0]
+
+    fetcher.cache.max_bytes = 0
+    fetcher.cache.grace_seconds = 0
+    fetcher.cache.evict()
+
+    assert not os.path.exists(canonical)
+    assert fetcher.cache_stats()["canonical"]["removed"] == 1
+
+
+def test_cached_clip_path_never_downloads(tmp_path, clip_server, fake_ffmpeg):
+    fetcher = make_fetcher(tmp_path, clip_server.url, {"apple": "v1", "pear": "v2"})
+    raw = fetcher.get_video_paths_for_gloss("apple")[0]
+
+    assert fetcher.cached_clip_path("v1") == raw
+    assert fetcher.cached_clip_path("v2") is None
+
+    canonical = fetcher.get_video_paths_for_gloss("apple", canonical=True)[0]
+    assert fetcher.cached_clip_path("v1") == canonical
+    assert fetcher.cached_clip_path("v1", canonical=False) == raw
+
+
+def test_canonical_copies_count_against_the_budget(tmp_path, clip_server, fake_ffmpeg):
+    fetcher = make_fetcher(tmp_path, clip_server.url, {"apple": "v1", "pear": "v2"})
+    raw = fetcher.get_video_paths_for_gloss("apple")[0]
+    size = os.path.getsize(raw)
+    fetcher.get_video_paths_for_gloss("apple", canonical=True)
+
+    stats = fetcher.cache_stats()
+    assert (stats["bytes"], stats["derived_bytes"]) == (2 * size, size)
+
+    # Three clip files fit; v2's canonical copy is the fourth and pushes out v1 and its copy
+    fetcher.cache.grace_seconds = 0
+    fetcher.cache.max_bytes = 3 * size
+    time.sleep(0.01)
+    fetcher.get_video_paths_for_gloss("pear", canonical=True)
+    assert not os.path.exists(raw) and fetcher.cache_stats()["bytes"] <= 3 * size
+
+    reloaded = VideoCacheManager(str(tmp_path / "cache"), max_bytes=10 * size,
+                                 derived_path=fetcher.normalizer.path_for)
+    assert reloaded.stats()["derived_bytes"] == size
+
+
+def test_reloading_the_mapper_closes_the_old_fetcher(tmp_path, clip_server, monkeypatch):
+    import dynamic_video_fetcher
+
+    old = make_fetcher(tmp_path, clip_server.url, {"apple": "v1"})
+    mapper_path = old.mapper_path
+    key = (os.path.abspath(mapper_path), old.cache_dir)
+    monkeypatch.setitem(dynamic_video_fetcher._fetchers, key, old)
+
+    assert dynamic_video_fetcher.get_fetcher(mapper_path, old.cache_dir) is old
+    os.utime(mapper_path, (time.time() + 5, time.time() + 5))
+    new = dynamic_video_fetcher.get_fetcher(mapper_path, old.cache_dir)
+
+    assert new is not old
+    assert old.downloads._pool._shutdown and old.normalizer._pool._shutdown
+    new.close()
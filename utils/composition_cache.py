@@ -0,0 +1,187 @@
+"""Content-addressed cache for composed gloss videos.
+
+A composed video depends only on the normalised token list, the clip source,
+the exact clip files that were concatenated, the output codec and the
+playback speed. ``CompositionCache`` names each output
+``comp_<sha1 of those inputs>.mp4`` with a small ``.json`` meta sidecar, so an
+identical request always maps to the same file, including after a restart.
+
+On top of that, an in-memory LRU maps the request (tokens, source, codec,
+speed) straight to its last output. A repeated sentence is then answered with
+a dict lookup and a couple of ``stat`` calls, without resolving clips again.
+A hit is only served while the output file exists and every local clip it
+was built from still has the recorded size and mtime. A clip that has since
+been evicted from the download cache does not invalidate the output.
+
+An output with missing tokens (``meta['missing']``) is written to disk but
+never remembered. A clip can be missing only for now, for example after a
+failed download or a fetch timeout, so such a request resolves its clips
+again every time and picks up the clip once it exists.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'comp_'
+
+
+def normalize_gloss_tokens(tokens) -> List[str]:
+    """Lower-case, strip and drop empty tokens; the form used for cache keys."""
+    return [n for n in (str(t).strip().lower() for t in tokens or []) if n]
+
+
+def clip_version(path: str) -> list:
+    """[basename, size, mtime_ns] identifying one clip's content."""
+    st = os.stat(path)
+    return [os.path.basename(path), st.st_size, st.st_mtime_ns]
+
+
+class _Entry:
+    __slots__ = ('filename', 'clips', 'meta')
+
+    def __init__(self, filename: str, clips: List[Tuple[str, list]], meta: dict):
+        self.filename = filename
+        self.clips = clips
+        self.meta = meta
+
+
+class CompositionCache:
+    def __init__(self, output_dir: str, max_entries: int = 1024):
+        self.output_dir = output_dir
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights: Dict[tuple, list] = {}
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._stale = 0
+
+    @staticmethod
+    def request_key(tokens, source: str, codec: str, speed: float = 1.0) -> tuple:
+        return (tuple(normalize_gloss_tokens(tokens)), source, codec, float(speed))
+
+    def content_name(self, key: tuple, clip_paths: List[str]) -> str:
+        """Deterministic output filename for ``key`` built from ``clip_paths``."""
+        tokens, source, codec, speed = key
+        payload = json.dumps({
+            'tokens': list(tokens), 'source': source, 'codec': codec, 'speed': speed,
+            'clips': [clip_version(p) for p in clip_paths],
+        }, sort_keys=True)
+        return f"{PREFIX}{hashlib.sha1(payload.encode('utf-8')).hexdigest()}.mp4"
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.output_dir, filename)
+
+    def _valid(self, entry: _Entry) -> bool:
+        if not os.path.isfile(self._path(entry.filename)):
+            return False
+        for path, version in entry.clips:
+            try:
+                if clip_version(path) != version:
+                    return False
+            except FileNotFoundError:
+                # Evicted from the clip cache; the composed output is still correct
+                continue
+        return True
+
+    def lookup(self, key: tuple) -> Optional[Tuple[str, dict]]:
+        """Return (filename, meta) for a previously composed ``key``, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None:
+            with self._lock:
+                self._misses += 1
+            return None
+        if not self._valid(entry):
+            with self._lock:
+                self._entries.pop(key, None)
+                self._stale += 1
+                self._misses += 1
+            return None
+        with self._lock:
+            self._hits += 1
+        return entry.filename, {**entry.meta, 'cached': True}
+
+    def load(self, key: tuple, filename: str, clip_paths: List[str]) -> Optional[Tuple[str, dict]]:
+        """Adopt an output already on disk (e.g. composed before a restart)."""
+        path = self._path(filename)
+        if not os.path.isfile(path) or os.path.getsize(path) == 0:
+            return None
+        try:
+            with open(path[:-len('.mp4')] + '.json', 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = {}
+        self._remember(key, filename, clip_paths, meta)
+        with self._lock:
+            self._disk_hits += 1
+        return filename, {**meta, 'cached': True}
+
+    def store(self, key: tuple, filename: str, clip_paths: List[str], meta: dict):
+        """Record a freshly composed output and write its meta sidecar."""
+        sidecar = self._path(filename)[:-len('.mp4')] + '.json'
+        tmp = f"{sidecar}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.replace(tmp, sidecar)
+        except (OSError, TypeError, ValueError) as e:
+            logger.debug(f"Could not write composition meta {sidecar}: {e}")
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+        self._remember(key, filename, clip_paths, meta)
+
+    def _remember(self, key: tuple, filename: str, clip_paths: List[str], meta: dict):
+        if meta.get('missing'):
+            return
+        clips = []
+        for p in clip_paths:
+            try:
+                clips.append((p, clip_version(p)))
+            except FileNotFoundError:
+                continue
+        with self._lock:
+            self._entries[key] = _Entry(filename, clips, dict(meta))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @contextmanager
+    def single_flight(self, key: tuple):
+        """Serialise composition per key so concurrent identical requests build one file."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = [threading.Lock(), 0]
+            flight[1] += 1
+        try:
+            with flight[0]:
+                yield
+        finally:
+            with self._lock:
+                flight[1] -= 1
+                if flight[1] == 0:
+                    self._flights.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self._hits,
+                'disk_hits': self._disk_hits,
+                'misses': self._misses,
+                'stale': self._stale,
+            }
@@ -0,0 +1,110 @@
+"""English -> ASL gloss for many sentences in one LLM request.
+
+A transcript used to cost one chat completion per segment, made one after
+another. ``BatchGlossTranslator`` packs up to ``batch_size`` sentences into a
+single prompt. The sentences are numbered, and the model is asked for a JSON
+object mapping each number to its gloss. The answer is validated strictly:
+every number must be present exactly once and map to a non-empty string.
+Anything else (bad JSON, missing or extra numbers, a failed request) makes the
+translator fall back to one ``translate_one`` call per sentence in that batch,
+so one malformed answer never shifts glosses onto the wrong segment.
+
+``complete(prompt, max_tokens)`` returns the model's text. It is injected, so
+the same code runs against OpenAI or a local fake server in tests.
+"""
+import json
+import logging
+import re
+import threading
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+_FENCE = re.compile(r'^```(?:json)?\s*|\s*```$')
+
+
+def build_batch_prompt(sentences: List[str]) -> str:
+    numbered = '\n'.join(f"{i}. {' '.join(str(s).split())}" for i, s in enumerate(sentences, 1))
+    return f"""
+    You are a sign language gloss generator.
+    Convert each numbered English sentence into simplified ASL gloss (UPPERCASE keywords only, drop articles like 'the', 'is').
+    Reply with one JSON object that maps every sentence number (as a string) to its gloss, and nothing else.
+    Example: {{"1": "ME GO SCHOOL", "2": "YOU HUNGRY"}}
+
+    Sentences:
+    {numbered}
+    """
+
+
+def parse_batch_response(content: str, count: int) -> List[str]:
+    """Glosses for sentences 1..count, in order. Raises ValueError unless all of them are present."""
+    text = _FENCE.sub('', (content or '').strip())
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"batch response is not JSON: {e}") from None
+    if not isinstance(data, dict):
+        raise ValueError("batch response is not a JSON object")
+    expected = {str(i) for i in range(1, count + 1)}
+    keys = {str(k).strip() for k in data}
+    if keys != expected or len(data) != count:
+        raise ValueError(f"batch response numbers {sorted(keys)} do not match 1..{count}")
+    glosses = {str(k).strip(): v for k, v in data.items()}
+    result = []
+    for i in range(1, count + 1):
+        gloss = glosses[str(i)]
+        if not isinstance(gloss, str) or not gloss.strip():
+            raise ValueError(f"empty gloss for sentence {i}")
+        result.append(' '.join(gloss.split()))
+    return result
+
+
+class BatchGlossTranslator:
+    def __init__(self, complete: Callable[[str, int], str], translate_one: Callable[[str], str],
+                 batch_size: int = 20, tokens_per_sentence: int = 50, max_tokens: int = 4000):
+        self.complete = complete
+        self.translate_one = translate_one
+        self.batch_size = max(1, int(batch_size))
+        self.tokens_per_sentence = tokens_per_sentence
+        self.max_tokens = max_tokens
+        self._lock = threading.Lock()
+        self._counters = {'batches': 0, 'sentences': 0, 'fallback_batches': 0, 'single_calls': 0,
+                          'failed': 0}
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self._counters[name] += n
+
+    def translate(self, sentences: List[str]) -> List[str]:
+        """One gloss per sentence, in order; '' where even the per-item call failed."""
+        results: List[str] = []
+        for start in range(0, len(sentences), self.batch_size):
+            results.extend(self._translate_batch(sentences[start:start + self.batch_size]))
+        return results
+
+    def _translate_batch(self, batch: List[str]) -> List[str]:
+        self._count('batches')
+        self._count('sentences', len(batch))
+        if len(batch) > 1:
+            max_tokens = min(self.max_tokens, self.tokens_per_sentence * len(batch) + 20)
+            try:
+                return parse_batch_response(self.complete(build_batch_prompt(batch), max_tokens), len(batch))
+            except Exception as e:
+                logger.warning(f"⚠️ Batch gloss translation of {len(batch)} sentences failed, "
+                               f"translating one by one: {e}")
+                self._count('fallback_batches')
+
+        glosses = []
+        for sentence in batch:
+            self._count('single_calls')
+            try:
+                glosses.append(self.translate_one(sentence) or '')
+            except Exception as e:
+                logger.warning(f"⚠️ Gloss translation failed for '{sentence}': {e}")
+                self._count('failed')
+                glosses.append('')
+        return glosses
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._counters, 'batch_size': self.batch_size}
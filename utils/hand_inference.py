@@ -0,0 +1,134 @@
+"""Per-frame gesture / letter inference on an already-acquired MediaPipe graph.
+
+These are the bodies of ``run_inference_on_frame`` and
+``run_letter_inference_on_frame`` without any app state, so the Flask app and
+the inference worker processes (utils/process_inference.py) run the exact
+same code.
+"""
+import cv2 as cv
+import mediapipe as mp
+import numpy as np
+
+from utils.landmarks import landmarks_to_array, normalize_landmarks, empty_hands, hand_features
+
+mp_drawing = mp.solutions.drawing_utils
+mp_hands = mp.solutions.hands
+
+
+def infer_gesture_frame(frame_bgr: np.ndarray, hands, predictor) -> dict:
+    """Detect up to two hands and classify the gesture.
+
+    Returns dict: {detected_sign, confidence, detections: [...], probabilities, annotated_frame}.
+    """
+    # Convert BGR to RGB for MediaPipe
+    rgb_frame = cv.cvtColor(frame_bgr, cv.COLOR_BGR2RGB)
+    results = hands.process(rgb_frame)
+
+    # Create a copy of the frame for annotation
+    annotated_frame = frame_bgr.copy()
+
+    # Raw landmarks for [left, right]; a missing hand stays all-zero
+    raw_hands = empty_hands(2)
+
+    if results.multi_hand_landmarks and results.multi_handedness:
+        for hand_landmarks, handedness in zip(results.multi_hand_landmarks,
+                                              results.multi_handedness):
+            label = handedness.classification[0].label  # "Left" or "Right"
+            score = handedness.classification[0].score
+
+            if score < 0.7:
+                continue  # skip low-confidence
+
+            mp_drawing.draw_landmarks(
+                annotated_frame,
+                hand_landmarks,
+                mp_hands.HAND_CONNECTIONS,
+                mp_drawing.DrawingSpec(color=(0, 0, 255), thickness=2, circle_radius=2),
+                mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2)
+            )
+
+            landmarks_to_array(hand_landmarks.landmark, out=raw_hands[0 if label == "Left" else 1])
+
+    features, present = hand_features(raw_hands)
+
+    # Only predict if at least one hand is visible
+    if not present.any():
+        return {
+            "detected_sign": None,
+            "confidence": 0.0,
+            "detections": [],
+            "annotated_frame": annotated_frame
+        }
+
+    prediction = predictor.predict_one(features)
+    pred, confidence = prediction.label, prediction.confidence
+
+    if predictor.has_proba:
+        text = f"Gesture: {pred} ({confidence:.2f})"
+    else:
+        text = f"Gesture: {pred}"
+
+    # Add text overlay on the annotated frame
+    cv.putText(annotated_frame, text, (10, 40),
+               cv.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+
+    return {
+        "detected_sign": pred,
+        "confidence": confidence,
+        "detections": prediction.candidates,
+        "probabilities": prediction.probabilities,
+        "annotated_frame": annotated_frame
+    }
+
+
+def infer_letter_frame(frame_bgr: np.ndarray, hands, predictor) -> dict:
+    """Detect one hand and classify the fingerspelled letter.
+
+    Returns dict: {detected_letter, confidence, detections: [...], probabilities, annotated_frame}.
+    """
+    rgb_frame = cv.cvtColor(frame_bgr, cv.COLOR_BGR2RGB)
+    results = hands.process(rgb_frame)
+    annotated_frame = frame_bgr.copy()
+
+    if results.multi_hand_landmarks and results.multi_handedness:
+        hand_landmarks = results.multi_hand_landmarks[0]  # Use first hand
+        handedness = results.multi_handedness[0]
+
+        if handedness.classification[0].score >= 0.7:
+            mp_drawing.draw_landmarks(
+                annotated_frame,
+                hand_landmarks,
+                mp_hands.HAND_CONNECTIONS,
+                mp_drawing.DrawingSpec(color=(255, 0, 0), thickness=2, circle_radius=2),
+                mp_drawing.DrawingSpec(color=(0, 255, 255), thickness=2)
+            )
+
+            # Normalize landmarks for letter model
+            features = normalize_landmarks(hand_landmarks.landmark).reshape(1, -1)
+
+            # Predict letter (one predict_proba pass)
+            prediction = predictor.predict_one(features)
+            pred, confidence = prediction.label, prediction.confidence
+
+            if predictor.has_proba:
+                text = f"Letter: {pred} ({confidence:.2f})"
+            else:
+                text = f"Letter: {pred}"
+
+            cv.putText(annotated_frame, text, (10, 40),
+                       cv.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 0), 2)
+
+            return {
+                "detected_letter": pred,
+                "confidence": confidence,
+                "detections": prediction.candidates,
+                "probabilities": prediction.probabilities,
+                "annotated_frame": annotated_frame
+            }
+
+    return {
+        "detected_letter": None,
+        "confidence": 0.0,
+        "detections": [],
+        "annotated_frame": annotated_frame
+    }
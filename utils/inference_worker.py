@@ -0,0 +1,90 @@
+"""Entry point of the inference worker processes started by utils/process_inference.py.
+
+This module only imports the standard library and numpy at the top level,
+so the spawned interpreter does not run the web app's import-time setup
+(models, pools, batchers, janitors). ProcessInferencePool starts each worker
+with this module standing in for ``__main__``. Without that, spawn would
+re-import the launching script (app.py) as ``__mp_main__`` in every worker.
+"""
+import logging
+import os
+from collections import OrderedDict
+from multiprocessing import shared_memory
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def load_predictors(model_file: str, letter_model_file: str, top_k: int) -> dict:
+    """{'gesture': ClassifierAdapter, 'letter': ClassifierAdapter} for the models that load."""
+    import joblib
+    from utils.predictor import ClassifierAdapter
+
+    predictors = {}
+    for mode, path in (('gesture', model_file), ('letter', letter_model_file)):
+        try:
+            predictors[mode] = ClassifierAdapter(joblib.load(path), top_k=top_k)
+        except Exception as e:
+            logger.error(f"❌ Worker {os.getpid()} could not load {mode} model {path}: {e}")
+    return predictors
+
+
+def worker_main(conn, model_file: str, letter_model_file: str, top_k: int = 3, max_sessions: int = 64):
+    """Worker process loop: load models and graphs once, then serve (mode, slot, shape, session_id) jobs.
+
+    Frames without a session id use a static-image graph. Frames with one use
+    that session's own video-mode graph, so tracking works as it does
+    in-process. The pool always sends a session to the same worker.
+    """
+    from utils.hand_inference import infer_gesture_frame, infer_letter_frame
+    from utils.hands_pool import _default_hands_factory
+
+    predictors = load_predictors(model_file, letter_model_file, top_k)
+    max_hands = {'gesture': 2, 'letter': 1}
+    hands = {mode: _default_hands_factory(n, True, 0.7, 0.7) for mode, n in max_hands.items()}
+    trackers: "OrderedDict[tuple, object]" = OrderedDict()
+    infer = {'gesture': infer_gesture_frame, 'letter': infer_letter_frame}
+    slots = {}
+    conn.send(('ready', sorted(predictors)))
+
+    def tracker_for(session_id: str, mode: str):
+        key = (session_id, mode)
+        graph = trackers.get(key)
+        if graph is None:
+            graph = trackers[key] = _default_hands_factory(max_hands[mode], False, 0.7, 0.7)
+            while len(trackers) > max_sessions:
+                trackers.popitem(last=False)[1].close()
+        trackers.move_to_end(key)
+        return graph
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            break
+        if job is None:
+            break
+        mode, slot_name, shape, session_id = job
+        try:
+            if slot_name not in slots:
+                # The parent grew the slot; drop the old attachment
+                for old in slots.values():
+                    old.close()
+                slots.clear()
+                # Workers share the parent's resource tracker, and the parent unlinks the segment
+                slots[slot_name] = shared_memory.SharedMemory(name=slot_name)
+            frame = np.ndarray(shape, dtype=np.uint8, buffer=slots[slot_name].buf)
+            if mode not in predictors:
+                raise RuntimeError(f"{mode} model not loaded in worker")
+            graph = tracker_for(session_id, mode) if session_id else hands[mode]
+            result = infer[mode](frame, graph, predictors[mode])
+            frame[...] = result.pop('annotated_frame')
+            conn.send(('ok', result))
+        except Exception as e:
+            conn.send(('error', f"{type(e).__name__}: {e}"))
+
+    for h in list(hands.values()) + list(trackers.values()):
+        h.close()
+    for shm in slots.values():
+        shm.close()
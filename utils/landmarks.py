@@ -0,0 +1,109 @@
+"""Vectorised hand-landmark feature building shared by the inference scripts and servers.
+
+Features follow the training-time normalisation: each hand is translated so the
+wrist sits at the origin, then scaled by the wrist -> middle-finger MCP distance.
+A missing hand is an all-zero block, which the same normalisation leaves at zero.
+"""
+import numpy as np
+
+NUM_LANDMARKS = 21
+HAND_FEATURES = NUM_LANDMARKS * 3
+WRIST = 0
+MIDDLE_MCP = 9
+
+
+def landmarks_to_array(landmarks, out: np.ndarray = None) -> np.ndarray:
+    """Copy MediaPipe landmarks (objects with .x/.y/.z) into a (21, 3) float64 array.
+
+    If ``out`` is given (e.g. one row of a preallocated (2, 21, 3) buffer) it is filled in place.
+    """
+    flat = np.fromiter((c for lm in landmarks for c in (lm.x, lm.y, lm.z)),
+                       dtype=np.float64, count=HAND_FEATURES)
+    if out is None:
+        return flat.reshape(NUM_LANDMARKS, 3)
+    out[...] = flat.reshape(NUM_LANDMARKS, 3)
+    return out
+
+
+def normalize_hands(points: np.ndarray) -> np.ndarray:
+    """Normalise one (21, 3) hand or a stack of hands (..., 21, 3) in a single pass."""
+    translated = points - points[..., WRIST:WRIST + 1, :]
+    ref = translated[..., MIDDLE_MCP, :]
+    # Same operation order as the original per-landmark math.sqrt(x**2 + y**2 + z**2)
+    scale = np.sqrt(ref[..., 0] ** 2 + ref[..., 1] ** 2 + ref[..., 2] ** 2)
+    scale = np.where(scale < 1e-6, 1.0, scale)
+    return translated / scale[..., None, None]
+
+
+def normalize_landmarks(landmarks) -> np.ndarray:
+    """Normalise a single MediaPipe hand into a flat (63,) feature vector."""
+    return normalize_hands(landmarks_to_array(landmarks)).reshape(-1)
+
+
+def empty_hands(num_hands: int = 2) -> np.ndarray:
+    """Allocate a zeroed (num_hands, 21, 3) buffer for raw landmarks."""
+    return np.zeros((num_hands, NUM_LANDMARKS, 3), dtype=np.float64)
+
+
+def hand_features(points: np.ndarray):
+    """Turn a (num_hands, 21, 3) raw landmark buffer into a classifier row.
+
+    Returns ``(features, present)``: a (1, num_hands * 63) feature matrix and a
+    boolean (num_hands,) mask of hands with any non-zero coordinate.
+    """
+    normalized = normalize_hands(points)
+    present = np.any(normalized.reshape(normalized.shape[0], -1) != 0.0, axis=1)
+    return normalized.reshape(1, -1), present
+
+
+def parse_landmarks(values, num_hands: int = 2, hand: str = "right") -> np.ndarray:
+    """Turn client-supplied raw landmarks into a (num_hands, 21, 3) buffer.
+
+    ``values`` may be nested lists or a flat sequence of 63 (one hand) or 126
+    (left then right) numbers. For the two-hand layout a single hand is placed
+    in the ``hand`` slot ("left" or "right") and the other stays zero.
+    Raises ValueError for any other shape.
+    """
+    points = np.asarray(values, dtype=np.float64)
+    if points.size == HAND_FEATURES:
+        points = points.reshape(1, NUM_LANDMARKS, 3)
+    elif points.size == 2 * HAND_FEATURES:
+        points = points.reshape(2, NUM_LANDMARKS, 3)
+    else:
+        raise ValueError(f"Expected 21x3 or 2x21x3 landmarks, got {points.size} values")
+    if not np.all(np.isfinite(points)):
+        raise ValueError("Landmarks must be finite numbers")
+
+    if points.shape[0] == num_hands:
+        return points
+    if num_hands == 2:
+        out = empty_hands(2)
+        out[0 if str(hand).lower() == "left" else 1] = points[0]
+        return out
+    raise ValueError("Letter inference expects a single 21x3 hand")
+
+
+def parse_landmark_bytes(buf: bytes, num_hands: int = 2, hand: str = "right") -> np.ndarray:
+    """Parse a packed little-endian float32 payload (63 or 126 values).
+
+    MediaPipe stores landmarks as float32, so this is lossless.
+    """
+    if len(buf) % 4:
+        raise ValueError("Binary landmarks must be packed float32 values")
+    return parse_landmarks(np.frombuffer(buf, dtype='<f4'), num_hands=num_hands, hand=hand)
+
+
+def classify_landmarks(points: np.ndarray, mode: str, predictor) -> dict:
+    """Classify an already-parsed (num_hands, 21, 3) buffer without any image work.
+
+    Returns the same fields as the frame endpoints minus ``annotated_frame``:
+    {detected_sign | detected_letter, confidence, detections}, plus the ``probabilities`` row
+    for the caller's smoothing when a hand is present.
+    """
+    key = "detected_letter" if mode == "letter" else "detected_sign"
+    features, present = hand_features(points)
+    if not present.any():
+        return {key: None, "confidence": 0.0, "detections": []}
+    prediction = predictor.predict_one(features)
+    return {key: prediction.label, "confidence": prediction.confidence,
+            "detections": prediction.candidates, "probabilities": prediction.probabilities}
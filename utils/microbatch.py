@@ -0,0 +1,145 @@
+"""In-process micro-batching for the landmark classifiers.
+
+Concurrent requests each hold one (1, n_features) row. Instead of calling the
+estimator once per row, callers enqueue their row and a worker thread gathers
+up to ``max_batch`` rows (or whatever arrived within ``max_wait_ms`` of the
+first one), runs a single ``predict_proba`` over the stacked batch and resolves
+every caller's future. If the batched call raises, each row is retried on its
+own, so a malformed row fails only its own request.
+
+``MicroBatcher`` exposes the same ``predict_one`` / ``has_proba`` surface as
+``ClassifierAdapter`` so the inference paths can use either one.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional
+
+import numpy as np
+
+from utils.predictor import ClassifierAdapter, Prediction
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class MicroBatcher:
+    def __init__(self, predictor: ClassifierAdapter, max_batch: int = 8, max_wait_ms: float = 2.0,
+                 name: str = "classifier"):
+        self.predictor = predictor
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._rows = 0
+        self._largest = 0
+        self._split = 0
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name=f"microbatch-{name}", daemon=True)
+        self._worker.start()
+
+    @property
+    def has_proba(self) -> bool:
+        return self.predictor.has_proba
+
+    @property
+    def classes(self):
+        return self.predictor.classes
+
+    def submit(self, features: np.ndarray) -> Future:
+        """Queue one (1, n_features) row; the future resolves to a ``Prediction``."""
+        future: Future = Future()
+        if self._closed:
+            future.set_exception(RuntimeError(f"{self.name} micro-batcher is closed"))
+            return future
+        self._queue.put((features, future))
+        return future
+
+    def predict_one(self, features: np.ndarray, timeout: Optional[float] = None) -> Prediction:
+        return self.submit(features).result(timeout=timeout)
+
+    def _collect(self, first) -> list:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                # Let the outer loop see the stop marker after this batch
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = self._collect(first)
+            live = [(x, f) for x, f in batch if f.set_running_or_notify_cancel()]
+            if not live:
+                continue
+            rows = [x for x, _ in live]
+            futures = [f for _, f in live]
+            try:
+                predictions = self.predictor.predict_batch(np.vstack(rows))
+            except Exception as e:
+                if len(live) == 1:
+                    futures[0].set_exception(e)
+                    continue
+                logger.warning(f"⚠️ {self.name} batch of {len(live)} failed ({e}); retrying rows one by one")
+                with self._lock:
+                    self._split += 1
+                self._run_each(live)
+                continue
+            for f, p in zip(futures, predictions):
+                f.set_result(p)
+            with self._lock:
+                self._batches += 1
+                self._rows += len(rows)
+                self._largest = max(self._largest, len(rows))
+
+    def _run_each(self, live: list):
+        for x, f in live:
+            try:
+                f.set_result(self.predictor.predict_batch(x)[0])
+            except Exception as e:
+                f.set_exception(e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'max_batch': self.max_batch,
+                'max_wait_ms': self.max_wait * 1000,
+                'queued': self._queue.qsize(),
+                'batches': self._batches,
+                'rows': self._rows,
+                'avg_batch_size': (self._rows / self._batches) if self._batches else 0.0,
+                'largest_batch': self._largest,
+                'split_batches': self._split,
+            }
+
+    def close(self):
+        """Stop the worker; rows still queued fail with RuntimeError instead of waiting forever."""
+        self._closed = True
+        self._queue.put(_STOP)
+        self._worker.join(timeout=1.0)
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(RuntimeError(f"{self.name} micro-batcher is closed"))
+        if self._worker.is_alive():
+            # Still finishing a batch, and the stop marker may have been drained above
+            self._queue.put(_STOP)
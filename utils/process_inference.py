@@ -0,0 +1,233 @@
+"""Optional multi-process backend for frame inference.
+
+MediaPipe and the sklearn models hold the GIL for much of their work, so a
+threaded server cannot spread inference across cores. ``ProcessInferencePool``
+runs N worker processes; each loads ``gesture_model.pkl`` / ``letter_model.pkl``
+and its own MediaPipe graphs once. Frames are handed over through a per-worker
+``multiprocessing.shared_memory`` slot instead of pickling numpy arrays: the
+parent copies the BGR frame in, the worker writes the annotated frame back into
+the same slot, and only the small result dict crosses the pipe.
+
+Workers run utils/inference_worker.py, which does not re-import the web app.
+Sessions stick to one worker so their tracker state lives there. Workers that
+die or stop answering are replaced automatically.
+"""
+import atexit
+import logging
+import multiprocessing as mp
+import sys
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+from utils import inference_worker
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SLOT_BYTES = 1280 * 720 * 3
+_spawn_lock = threading.Lock()
+
+
+@contextmanager
+def _worker_as_main():
+    """Make the side-effect-free worker module ``__main__`` while a spawn worker starts.
+
+    spawn re-imports the parent's ``__main__`` in the child. For the web apps
+    that is app.py, which would load every model and start every pool again.
+    """
+    with _spawn_lock:
+        main = sys.modules.get('__main__')
+        sys.modules['__main__'] = inference_worker
+        try:
+            yield
+        finally:
+            sys.modules['__main__'] = main
+
+
+class _Worker:
+    def __init__(self, ctx, index: int, model_file: str, letter_model_file: str, slot_bytes: int,
+                 top_k: int, max_sessions: int):
+        self.ctx = ctx
+        self.index = index
+        self.model_file = model_file
+        self.letter_model_file = letter_model_file
+        self.top_k = top_k
+        self.max_sessions = max_sessions
+        self.busy = False
+        self.shm = shared_memory.SharedMemory(create=True, size=slot_bytes)
+        self.process = None
+        self.conn = None
+        self.ready = False
+        self.restarts = 0
+        self.jobs = 0
+        self.start()
+
+    def start(self):
+        parent_conn, child_conn = self.ctx.Pipe()
+        self.process = self.ctx.Process(target=inference_worker.worker_main, name=f"inference-worker-{self.index}",
+                                        args=(child_conn, self.model_file, self.letter_model_file,
+                                              self.top_k, self.max_sessions),
+                                        daemon=True)
+        with _worker_as_main():
+            self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        self.ready = False
+
+    def restart(self, reason: str):
+        logger.warning(f"♻️ Restarting inference worker {self.index}: {reason}")
+        self.stop(timeout=0.5)
+        self.restarts += 1
+        self.start()
+
+    def stop(self, timeout: float = 2.0):
+        try:
+            self.conn.send(None)
+        except Exception:
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout)
+        self.conn.close()
+
+    def _recv(self, timeout: float):
+        if not self.conn.poll(timeout):
+            self.restart(f"no reply within {timeout}s")
+            raise TimeoutError(f"Inference worker {self.index} timed out")
+        try:
+            return self.conn.recv()
+        except (EOFError, OSError) as e:
+            self.restart(f"pipe closed ({e})")
+            raise RuntimeError(f"Inference worker {self.index} crashed") from e
+
+    def run(self, mode: str, frame_bgr: np.ndarray, timeout: float, startup_timeout: float,
+            session_id: Optional[str] = None) -> dict:
+        if not self.process.is_alive():
+            self.restart(f"exit code {self.process.exitcode}")
+        if not self.ready:
+            status, _ = self._recv(startup_timeout)
+            self.ready = status == 'ready'
+
+        frame = np.ascontiguousarray(frame_bgr, dtype=np.uint8)
+        if frame.nbytes > self.shm.size:
+            old = self.shm
+            self.shm = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+            old.close()
+            old.unlink()
+        slot = np.ndarray(frame.shape, dtype=np.uint8, buffer=self.shm.buf)
+        slot[...] = frame
+
+        try:
+            self.conn.send((mode, self.shm.name, frame.shape, session_id))
+        except (BrokenPipeError, OSError) as e:
+            self.restart(f"send failed ({e})")
+            raise RuntimeError(f"Inference worker {self.index} crashed") from e
+        status, payload = self._recv(timeout)
+        self.jobs += 1
+        if status != 'ok':
+            raise RuntimeError(payload)
+        payload['annotated_frame'] = slot.copy()
+        return payload
+
+    def close(self):
+        self.stop()
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class ProcessInferencePool:
+    """Pool of inference worker processes with shared-memory frame slots.
+
+    Frames with a session id always go to the same worker, which keeps that
+    session's video-mode tracker. Other frames take any idle worker.
+    """
+
+    def __init__(self, num_workers: int, model_file: str, letter_model_file: str,
+                 slot_bytes: int = DEFAULT_SLOT_BYTES, timeout: float = 10.0,
+                 startup_timeout: float = 120.0, start_method: str = 'spawn',
+                 top_k: int = 3, max_sessions: int = 64):
+        ctx = mp.get_context(start_method)
+        self.timeout = timeout
+        self.startup_timeout = startup_timeout
+        self._workers = [_Worker(ctx, i, model_file, letter_model_file, slot_bytes, top_k, max_sessions)
+                         for i in range(max(1, int(num_workers)))]
+        self._cond = threading.Condition()
+        self._wait_total = 0.0
+        self._calls = 0
+        logger.info(f"✅ Started {len(self._workers)} inference worker process(es) ({start_method})")
+
+    def _checkout(self, session_id: Optional[str]) -> _Worker:
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if session_id:
+                    worker = self._workers[zlib.crc32(session_id.encode('utf-8')) % len(self._workers)]
+                    worker = None if worker.busy else worker
+                else:
+                    worker = next((w for w in self._workers if not w.busy), None)
+                if worker is not None:
+                    worker.busy = True
+                    return worker
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("No inference worker process available")
+                self._cond.wait(remaining)
+
+    def _checkin(self, worker: _Worker):
+        with self._cond:
+            worker.busy = False
+            self._cond.notify_all()
+
+    def infer(self, mode: str, frame_bgr: np.ndarray, session_id: Optional[str] = None) -> dict:
+        """Run the 'gesture' or 'letter' path on a worker; same result schema as the in-process path."""
+        t0 = time.perf_counter()
+        worker = self._checkout(session_id)
+        with self._cond:
+            self._calls += 1
+            self._wait_total += time.perf_counter() - t0
+        try:
+            return worker.run(mode, frame_bgr, self.timeout, self.startup_timeout, session_id)
+        finally:
+            self._checkin(worker)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                'workers': len(self._workers),
+                'idle': sum(1 for w in self._workers if not w.busy),
+                'alive': sum(1 for w in self._workers if w.process.is_alive()),
+                'restarts': sum(w.restarts for w in self._workers),
+                'jobs': sum(w.jobs for w in self._workers),
+                'avg_wait_ms': (self._wait_total / self._calls * 1000) if self._calls else 0.0,
+            }
+
+    def close(self):
+        for w in self._workers:
+            w.close()
+
+
+_pool: Optional[ProcessInferencePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool(num_workers: int, model_file: str, letter_model_file: str,
+                     top_k: int = 3) -> ProcessInferencePool:
+    """Create the process-wide pool on first use.
+
+    Creation is lazy so that importing the app does not start processes.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessInferencePool(num_workers, model_file, letter_model_file, top_k=top_k)
+            atexit.register(_pool.close)
+        return _pool
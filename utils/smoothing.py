@@ -0,0 +1,204 @@
+"""Per-session temporal smoothing of classifier output with debounced sign emission.
+
+Each frame is classified on its own, so the raw label flickers between
+neighbouring classes. ``TemporalSmoother`` keeps the last ``window`` frames'
+top labels for a majority vote and an exponential moving average (EMA) of the
+per-class probabilities, then applies hysteresis:
+
+- a new label is adopted only when its EMA reaches ``enter_threshold`` and it
+  also wins the majority vote over the window;
+- the current label is kept while its EMA stays above ``exit_threshold``.
+
+Once the smoothed label has been the same for ``confirm_frames`` consecutive
+frames, it is reported once as ``confirmed``. It is reported again only after the
+label changes or drops out, so holding one sign does not repeat the word.
+
+The EMA is a dense vector with one slot per class index. Callers pass the
+classifier's full ``probabilities`` row together with its ``classes``, so a
+class that drops out of the top-k still decays from its real probability
+rather than from zero. Estimators without probabilities fall back to the
+``detections`` lists (``[{"class": label, "confidence": p}, ...]``). A frame
+with neither, meaning no hand, decays every score towards zero.
+"""
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+def _plain(value):
+    return value.item() if hasattr(value, 'item') else value
+
+
+class TemporalSmoother:
+    def __init__(self, window: int = 8, alpha: float = 0.5, confirm_frames: int = 3,
+                 enter_threshold: float = 0.6, exit_threshold: float = 0.4):
+        self.window = max(1, int(window))
+        self.alpha = min(1.0, max(0.0, float(alpha)))
+        self.confirm_frames = max(1, int(confirm_frames))
+        self.enter_threshold = enter_threshold
+        self.exit_threshold = min(exit_threshold, enter_threshold)
+        self._votes: "deque[Optional[object]]" = deque(maxlen=self.window)
+        # Class label <-> slot of the dense EMA vector
+        self._labels: List[object] = []
+        self._slots: Dict[object, int] = {}
+        self._class_slots = (None, None)  # (classes array last seen, its slot indices)
+        self._ema = np.zeros(0)
+        self._label = None
+        self._stable = 0
+        self._emitted = False
+        self.frames = 0
+        self.confirmed_count = 0
+
+    def reset(self):
+        self._votes.clear()
+        self._ema[:] = 0.0
+        self._label = None
+        self._stable = 0
+        self._emitted = False
+
+    def _slot(self, label) -> int:
+        label = _plain(label)
+        slot = self._slots.get(label)
+        if slot is None:
+            slot = self._slots[label] = len(self._labels)
+            self._labels.append(label)
+        return slot
+
+    def _observe(self, detections, probabilities, classes) -> np.ndarray:
+        """This frame's scores as a vector over the EMA's slots."""
+        if probabilities is not None and classes is not None:
+            seen, slots = self._class_slots
+            if seen is not classes:
+                slots = np.array([self._slot(c) for c in classes], dtype=np.intp)
+                self._class_slots = (classes, slots)
+            obs = np.zeros(len(self._labels))
+            obs[slots] = probabilities
+        else:
+            pairs = [(self._slot(d['class']), float(d['confidence'])) for d in (detections or [])]
+            obs = np.zeros(len(self._labels))
+            for slot, p in pairs:
+                obs[slot] = p
+        if len(self._ema) < len(obs):
+            self._ema = np.concatenate([self._ema, np.zeros(len(obs) - len(self._ema))])
+        return obs
+
+    def _score(self, label) -> float:
+        slot = self._slots.get(label)
+        return float(self._ema[slot]) if slot is not None else 0.0
+
+    def update(self, detections, probabilities=None, classes=None) -> dict:
+        """Feed one frame's detections, or its full ``probabilities`` row over ``classes``.
+
+        Returns {label, confidence, stable_frames, confirmed}. ``confirmed`` is the
+        label on the frame it becomes confirmed and None otherwise.
+        """
+        self.frames += 1
+        obs = self._observe(detections, probabilities, classes)
+        self._ema *= 1.0 - self.alpha
+        self._ema += self.alpha * obs
+
+        self._votes.append(self._labels[int(obs.argmax())] if obs.any() else None)
+        votes = Counter(v for v in self._votes if v is not None)
+        majority = votes.most_common(1)[0][0] if votes else None
+
+        best = self._labels[int(self._ema.argmax())] if self._ema.any() else None
+        candidate = best if (best is not None and best == majority
+                             and self._score(best) >= self.enter_threshold) else None
+
+        current = self._label
+        if current is not None and self._score(current) >= self.exit_threshold \
+                and candidate in (None, current):
+            label = current
+        else:
+            label = candidate
+
+        if label is not None and label == current:
+            self._stable += 1
+        else:
+            self._stable = 1 if label is not None else 0
+            self._emitted = False
+        self._label = label
+
+        confirmed = None
+        if label is not None and self._stable >= self.confirm_frames and not self._emitted:
+            self._emitted = True
+            self.confirmed_count += 1
+            confirmed = label
+
+        return {
+            'label': label,
+            'confidence': self._score(label) if label is not None else 0.0,
+            'stable_frames': self._stable,
+            'confirmed': confirmed,
+        }
+
+
+class _SmootherSession:
+    def __init__(self, smoother: TemporalSmoother):
+        self.smoother = smoother
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+
+class SmoothingRegistry:
+    """One ``TemporalSmoother`` per (session_id, mode), evicted after ``idle_ttl`` seconds."""
+
+    def __init__(self, idle_ttl: float = 60.0, max_sessions: int = 256, **smoother_kwargs):
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self.smoother_kwargs = smoother_kwargs
+        self._sessions: "OrderedDict[tuple, _SmootherSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._evicted = 0
+        self._confirmed = 0
+
+    def _get(self, key: tuple) -> _SmootherSession:
+        now = time.monotonic()
+        with self._lock:
+            stale = [k for k, s in self._sessions.items() if now - s.last_used > self.idle_ttl]
+            for k in stale:
+                del self._sessions[k]
+            self._evicted += len(stale)
+
+            session = self._sessions.get(key)
+            if session is None:
+                session = _SmootherSession(TemporalSmoother(**self.smoother_kwargs))
+                self._sessions[key] = session
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    self._evicted += 1
+            else:
+                self._sessions.move_to_end(key)
+            session.last_used = now
+            return session
+
+    def update(self, session_id: str, mode: str, detections, probabilities=None, classes=None) -> dict:
+        """Smooth one frame for ``session_id`` on the ``mode`` ('gesture'/'letter') path; see TemporalSmoother.update."""
+        session = self._get((str(session_id), mode))
+        with session.lock:
+            result = session.smoother.update(detections, probabilities, classes)
+        if result['confirmed'] is not None:
+            with self._lock:
+                self._confirmed += 1
+        return result
+
+    def close_session(self, session_id: str) -> int:
+        with self._lock:
+            keys = [k for k in self._sessions if k[0] == str(session_id)]
+            for k in keys:
+                del self._sessions[k]
+        return len(keys)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'active_sessions': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                'idle_ttl_seconds': self.idle_ttl,
+                'evicted': self._evicted,
+                'confirmed': self._confirmed,
+                **self.smoother_kwargs,
+            }
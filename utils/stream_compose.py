@@ -0,0 +1,220 @@
+"""Progressive gloss video composition as an HLS playlist that grows one clip at a time.
+
+``compose_video_from_gloss`` returns only after every clip has been fetched
+and joined, so a classroom waits for the whole sentence. ``StreamingComposer``
+creates ``hls_<id>/index.m3u8`` under the outputs directory and returns its URL
+straight away. A worker thread then takes the tokens in order and waits for
+each clip (downloads were already started by the caller). Each clip is
+remuxed into one MPEG-TS segment, and the playlist is rewritten with it
+appended. Players start on the first sign while later ones are still
+downloading. When the last token is done the playlist gets ``#EXT-X-ENDLIST``.
+
+Canonical clips (H.264, see ClipNormalizer) are stream-copied; anything else
+is re-encoded for that segment only. Every clip boundary is marked
+``#EXT-X-DISCONTINUITY`` because each clip starts its own timeline.
+
+``#EXT-X-TARGETDURATION`` may not change while a playlist is live, so it is
+fixed at ``target_duration``. A clip longer than that is re-encoded with a
+keyframe every ``target_duration`` seconds and split into several segments.
+Clip durations come from the probe's frame count, or else from the container's
+duration (``ffprobe format=duration``).
+"""
+import csv
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FFMPEG = os.getenv('FFMPEG_BIN', 'ffmpeg')
+FFPROBE = os.getenv('FFPROBE_BIN', 'ffprobe')
+PREFIX = 'hls_'
+PLAYLIST = 'index.m3u8'
+
+
+class _Job:
+    def __init__(self, job_id: str, directory: str, tokens: List[str]):
+        self.id = job_id
+        self.dir = directory
+        self.tokens = tokens
+        self.segments: List[tuple] = []  # (filename, duration, token, first segment of its clip)
+        self.missing: List[str] = []
+        self.done = False
+        self.error: Optional[str] = None
+
+
+class StreamingComposer:
+    def __init__(self, output_dir: str, probe: Callable[[str], object], max_workers: int = 4,
+                 target_duration: int = 6, timeout: float = 60.0, max_jobs: int = 256):
+        """``probe(path)`` returns a ClipInfo-like object with ``codec``, ``frames`` and ``fps``."""
+        self.output_dir = output_dir
+        self.probe = probe
+        self.target_duration = target_duration
+        self.timeout = timeout
+        self.max_jobs = max_jobs
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix='hls-compose')
+        self._jobs: Dict[str, _Job] = {}
+        self._lock = threading.Lock()
+        self._counters = {'started': 0, 'segments': 0, 'copied': 0, 'reencoded': 0, 'failed': 0}
+
+    @staticmethod
+    def available() -> bool:
+        return shutil.which(FFMPEG) is not None
+
+    def start(self, tokens: List[str], clip_for: Callable[[str], Optional[str]]) -> str:
+        """Create the playlist and start filling it; returns its path relative to the outputs dir.
+
+        ``clip_for(token)`` is called on the worker thread, in token order, and
+        returns a clip path or None when the token has no clip.
+        """
+        job_id = uuid.uuid4().hex[:16]
+        name = f"{PREFIX}{job_id}"
+        job = _Job(job_id, os.path.join(self.output_dir, name), list(tokens))
+        os.makedirs(job.dir, exist_ok=True)
+        self._write_playlist(job)
+        with self._lock:
+            self._jobs[job_id] = job
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.pop(next(iter(self._jobs)))
+            self._counters['started'] += 1
+        self._pool.submit(self._run, job, clip_for)
+        return f"{name}/{PLAYLIST}"
+
+    def _run(self, job: _Job, clip_for: Callable[[str], Optional[str]]):
+        try:
+            for i, token in enumerate(job.tokens):
+                try:
+                    path = clip_for(token)
+                except Exception as e:
+                    logger.warning(f"⚠️ No clip for '{token}': {e}")
+                    path = None
+                if not path:
+                    job.missing.append(token)
+                    continue
+                try:
+                    pieces = self._segment(path, job.dir, i)
+                except (OSError, RuntimeError, ValueError, subprocess.TimeoutExpired) as e:
+                    logger.warning(f"⚠️ Could not segment clip for '{token}': {e}")
+                    job.missing.append(token)
+                    with self._lock:
+                        self._counters['failed'] += 1
+                    continue
+                job.segments.extend((name, duration, token, k == 0) for k, (name, duration) in enumerate(pieces))
+                self._write_playlist(job)
+        except Exception as e:
+            job.error = str(e)
+            logger.error(f"❌ Streaming composition {job.id} failed: {e}")
+        finally:
+            job.done = True
+            self._write_playlist(job)
+            logger.info(f"✅ Streaming composition {job.id}: {len(job.segments)} segment(s), "
+                        f"{len(job.missing)} missing")
+
+    def _format_duration(self, path: str) -> float:
+        """Container duration in seconds from ffprobe, or 0.0 if it is unknown."""
+        try:
+            result = subprocess.run([FFPROBE, '-v', 'error', '-show_entries', 'format=duration',
+                                     '-of', 'default=nw=1:nk=1', path],
+                                    capture_output=True, text=True, timeout=self.timeout)
+            return max(0.0, float(result.stdout.strip().splitlines()[0]))
+        except (OSError, ValueError, IndexError, subprocess.TimeoutExpired):
+            return 0.0
+
+    def _ffmpeg(self, cmd: List[str]):
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=self.timeout)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip()[-500:])
+
+    def _segment(self, clip: str, directory: str, index: int) -> List[tuple]:
+        """Cut ``clip`` into segments no longer than ``target_duration``; returns [(filename, duration)]."""
+        info = self.probe(clip)
+        duration = info.frames / info.fps if info.frames and info.fps else self._format_duration(clip)
+        if round(duration) > self.target_duration:
+            pieces = self._split(clip, directory, index)
+            counter = 'reencoded'
+        else:
+            name = f"part_{index:03d}.ts"
+            tmp = os.path.join(directory, f".{name}.tmp")
+            if info.codec == 'h264':
+                codec = ['-c', 'copy', '-bsf:v', 'h264_mp4toannexb']
+                counter = 'copied'
+            else:
+                codec = ['-c:v', 'libx264', '-preset', 'veryfast', '-pix_fmt', 'yuv420p']
+                counter = 'reencoded'
+            try:
+                self._ffmpeg([FFMPEG, '-y', '-v', 'error', '-i', clip, '-map', '0:v:0', '-an', *codec,
+                              '-f', 'mpegts', tmp])
+                os.replace(tmp, os.path.join(directory, name))
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+            pieces = [(name, duration)]
+        with self._lock:
+            self._counters['segments'] += len(pieces)
+            self._counters[counter] += 1
+        return pieces
+
+    def _split(self, clip: str, directory: str, index: int) -> List[tuple]:
+        # Keyframes exactly every target_duration seconds let the segment muxer cut there
+        step = self.target_duration
+        listing = os.path.join(directory, f".part_{index:03d}.csv")
+        pattern = os.path.join(directory, f"part_{index:03d}_%03d.ts")
+        try:
+            self._ffmpeg([FFMPEG, '-y', '-v', 'error', '-i', clip, '-map', '0:v:0', '-an',
+                          '-c:v', 'libx264', '-preset', 'veryfast', '-pix_fmt', 'yuv420p',
+                          '-force_key_frames', f"expr:gte(t,n_forced*{step})",
+                          '-f', 'segment', '-segment_time', str(step), '-segment_format', 'mpegts',
+                          '-segment_list', listing, '-segment_list_type', 'csv', pattern])
+            with open(listing, newline='', encoding='utf-8') as f:
+                pieces = [(name, float(end) - float(start)) for name, start, end in csv.reader(f)]
+        finally:
+            if os.path.exists(listing):
+                os.remove(listing)
+        if not pieces:
+            raise RuntimeError("segment muxer wrote no segments")
+        return pieces
+
+    def _write_playlist(self, job: _Job):
+        lines = [
+            '#EXTM3U',
+            '#EXT-X-VERSION:3',
+            f'#EXT-X-TARGETDURATION:{self.target_duration}',
+            '#EXT-X-MEDIA-SEQUENCE:0',
+            '#EXT-X-PLAYLIST-TYPE:EVENT',
+        ]
+        for i, (segment, duration, _, first) in enumerate(job.segments):
+            if i and first:
+                lines.append('#EXT-X-DISCONTINUITY')
+            lines.append(f'#EXTINF:{duration:.3f},')
+            lines.append(segment)
+        if job.done:
+            lines.append('#EXT-X-ENDLIST')
+        path = os.path.join(job.dir, PLAYLIST)
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp, path)
+
+    def status(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        return {
+            'tokens': job.tokens,
+            'ready': [t for _, _, t, first in job.segments if first],
+            'missing': list(job.missing),
+            'duration_seconds': sum(d for _, d, _, _ in job.segments),
+            'done': job.done,
+            'error': job.error,
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            active = sum(1 for j in self._jobs.values() if not j.done)
+            return {**self._counters, 'active': active, 'available': self.available()}
@@ -0,0 +1,239 @@
+"""Memoised LLM translations (English -> gloss, gloss -> English).
+
+The extension and the classroom send the same captions over and over, and
+every one of them used to cost a chat completion. ``TranslationCache`` keys
+each result by (kind, normalised text, model, prompt version, temperature).
+A change of model, prompt or temperature therefore never serves an old
+answer.
+
+Lookups go to an in-memory LRU first and then to a SQLite table. The table
+survives restarts and is shared by every process that points at the same
+file. Entries expire ``ttl`` seconds after they were written. Expired rows
+are removed when they are next read and by ``purge()``. The async methods
+answer memory hits inline and run SQLite in a worker thread.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text) -> str:
+    """Collapse whitespace and case-fold; token lists are joined with spaces first."""
+    if isinstance(text, (list, tuple)):
+        text = ' '.join(str(t) for t in text)
+    return ' '.join(str(text or '').split()).casefold()
+
+
+class TranslationCache:
+    def __init__(self, db_path: Optional[str], max_entries: int = 2048, ttl: float = 30 * 86400):
+        """``db_path=None`` keeps the cache in memory only."""
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[object, float]]" = OrderedDict()
+        # _lock guards the LRU and counters only; SQLite work happens under _db_lock, so a
+        # slow disk write never holds up memory hits (or an event loop waiting on one)
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._counters = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'expired': 0, 'bypassed': 0, 'stores': 0}
+        if db_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+                self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=5.0)
+                self._db.execute('PRAGMA journal_mode=WAL')
+                self._db.execute(
+                    'CREATE TABLE IF NOT EXISTS translations '
+                    '(key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)'
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Translation cache at {db_path} unavailable, using memory only: {e}")
+                self._db = None
+
+    @staticmethod
+    def make_key(kind: str, text, model: str, prompt_version, temperature: float) -> str:
+        raw = json.dumps([kind, normalize_text(text), model, str(prompt_version), round(float(temperature), 3)])
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _remember(self, key: str, value, created: float):
+        self._entries[key] = (value, created)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _memory_get(self, key: str, now: float):
+        """(value or None, expired) from the LRU; counts a hit."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+            value, created = entry
+            if now - created <= self.ttl:
+                self._entries.move_to_end(key)
+                self._counters['hits'] += 1
+                return value, False
+            del self._entries[key]
+            return None, True
+
+    def _disk_get(self, key: str, now: float):
+        """(value or None, created, expired) from SQLite; deletes an expired row."""
+        if self._db is None:
+            return None, 0.0, False
+        try:
+            with self._db_lock:
+                row = self._db.execute('SELECT value, created FROM translations WHERE key = ?',
+                                       (key,)).fetchone()
+                if row is None:
+                    return None, 0.0, False
+                if now - row[1] <= self.ttl:
+                    return json.loads(row[0]), row[1], False
+                self._db.execute('DELETE FROM translations WHERE key = ?', (key,))
+                self._db.commit()
+                return None, 0.0, True
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"⚠️ Translation cache read failed: {e}")
+            return None, 0.0, False
+
+    def _disk_put(self, key: str, value, now: float):
+        if self._db is None:
+            return
+        try:
+            with self._db_lock:
+                self._db.execute('INSERT OR REPLACE INTO translations (key, value, created) VALUES (?, ?, ?)',
+                                 (key, json.dumps(value), now))
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Translation cache write failed: {e}")
+
+    def _settle(self, key: str, value, created: float, expired: bool):
+        """Record the outcome of a lookup that missed memory."""
+        with self._lock:
+            if value is not None:
+                self._remember(key, value, created)
+                self._counters['hits'] += 1
+                self._counters['disk_hits'] += 1
+            else:
+                self._counters['expired' if expired else 'misses'] += 1
+        return value
+
+    def _store(self, key: str, value, now: float):
+        with self._lock:
+            self._remember(key, value, now)
+            self._counters['stores'] += 1
+
+    def get(self, key: str, now: Optional[float] = None):
+        """Cached value for ``key``, or None when absent or expired."""
+        now = time.time() if now is None else now
+        value, expired = self._memory_get(key, now)
+        if value is not None:
+            return value
+        value, created, disk_expired = self._disk_get(key, now)
+        return self._settle(key, value, created, expired or disk_expired)
+
+    async def aget(self, key: str, now: Optional[float] = None):
+        """``get`` for the event loop: memory hits return at once, SQLite runs in a worker thread."""
+        now = time.time() if now is None else now
+        value, expired = self._memory_get(key, now)
+        if value is not None:
+            return value
+        if self._db is None:
+            return self._settle(key, None, 0.0, expired)
+        value, created, disk_expired = await asyncio.to_thread(self._disk_get, key, now)
+        return self._settle(key, value, created, expired or disk_expired)
+
+    def put(self, key: str, value, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        self._store(key, value, now)
+        self._disk_put(key, value, now)
+
+    async def aput(self, key: str, value, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        self._store(key, value, now)
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_put, key, value, now)
+
+    def memoize(self, key: str, compute: Callable[[], object], bypass: bool = False):
+        """Return the cached value for ``key`` or store and return ``compute()``.
+
+        ``bypass=True`` always calls ``compute()`` and refreshes the entry.
+        Empty results are not stored.
+        """
+        if bypass:
+            with self._lock:
+                self._counters['bypassed'] += 1
+        else:
+            value = self.get(key)
+            if value is not None:
+                return value
+        value = compute()
+        if value:
+            self.put(key, value)
+        return value
+
+    async def amemoize(self, key: str, compute: Callable[[], Awaitable[object]], bypass: bool = False):
+        """``memoize`` for an async ``compute``; disk access never blocks the event loop."""
+        if bypass:
+            with self._lock:
+                self._counters['bypassed'] += 1
+        else:
+            value = await self.aget(key)
+            if value is not None:
+                return value
+        value = await compute()
+        if value:
+            await self.aput(key, value)
+        return value
+
+    def purge(self, now: Optional[float] = None) -> int:
+        """Drop expired entries from memory and disk. Returns the number of rows removed on disk."""
+        now = time.time() if now is None else now
+        with self._lock:
+            for key in [k for k, (_, created) in self._entries.items() if now - created > self.ttl]:
+                del self._entries[key]
+        if self._db is None:
+            return 0
+        try:
+            with self._db_lock:
+                cur = self._db.execute('DELETE FROM translations WHERE created < ?', (now - self.ttl,))
+                self._db.commit()
+                return cur.rowcount
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Translation cache purge failed: {e}")
+            return 0
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute('DELETE FROM translations')
+                self._db.commit()
+
+    def stats(self) -> dict:
+        stored = None
+        if self._db is not None:
+            try:
+                with self._db_lock:
+                    stored = self._db.execute('SELECT COUNT(*) FROM translations').fetchone()[0]
+            except sqlite3.Error:
+                pass
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses'] + self._counters['expired']
+            return {
+                **self._counters,
+                'hit_rate': round(self._counters['hits'] / lookups, 3) if lookups else 0.0,
+                'entries': len(self._entries),
+                'stored': stored,
+                'path': self.db_path,
+                'ttl_seconds': self.ttl,
+            }